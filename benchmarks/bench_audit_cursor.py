@@ -0,0 +1,56 @@
+"""Time deep /audit pages with offset and cursor paging on a synthetic audit database.
+
+Builds a database of 1M scan events (or the count given as the first
+argument) and fetches 50-event pages at growing depths, by offset and by
+the cursor of the page before.
+Run with: python benchmarks/bench_audit_cursor.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import audit_db
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.repository import encode_cursor
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+PAGE = 50
+
+
+async def best(query, repeat: int = 3) -> float:
+    """Best-of-*repeat* time of ``await query()`` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        audit_db(str(path), ROWS)
+        engine = get_engine(f"sqlite+aiosqlite:///{path}")
+        await init_db(engine)
+        repo = SQLAlchemyAuditRepository(get_session_factory(engine))
+
+        depths = [10 ** n for n in range(3, 7) if 10 ** n < ROWS] + [ROWS - PAGE]
+        for depth in depths:
+            # The cursor of the page before, as a client paging through would hold
+            before = await repo.query_events(limit=1, offset=depth - 1)
+            cursor = encode_cursor(before[0])
+            by_offset = await best(lambda: repo.query_events(limit=PAGE, offset=depth))
+            by_cursor = await best(lambda: repo.query_events(limit=PAGE, cursor=cursor))
+            print(f"page at {depth:>9,}   offset {by_offset:8.1f} ms   cursor {by_cursor:6.1f} ms")
+        await close_db(engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
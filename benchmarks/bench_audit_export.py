@@ -0,0 +1,72 @@
+"""Time a full audit export, and the same events paged through /audit, on a synthetic audit database.
+
+Builds a database of 1M scan events (or the count given as the first
+argument) and exports them all as NDJSON and as CSV, then reads them with
+500-event cursor pages, printing the time, events per second and the
+peak of memory allocated on the way (a separate, traced run).
+Run with: python benchmarks/bench_audit_export.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from payloads import audit_db
+
+from clawguard.api.audit import _export_lines
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.repository import encode_cursor
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+PAGE = 500
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        audit_db(str(path), ROWS)
+        engine = get_engine(f"sqlite+aiosqlite:///{path}")
+        await init_db(engine)
+        repo = SQLAlchemyAuditRepository(get_session_factory(engine))
+
+        async def export(format: str) -> int:
+            size = 0
+            async for chunk in _export_lines(repo.export_events(), format):
+                size += len(chunk)
+            return size
+
+        async def pages() -> int:
+            count, cursor = 0, None
+            while True:
+                page = await repo.query_events(limit=PAGE, cursor=cursor)
+                count += len(page)
+                if len(page) < PAGE:
+                    return count
+                cursor = encode_cursor(page[-1])
+
+        for name, run in [
+            ("export ndjson", lambda: export("ndjson")),
+            ("export csv", lambda: export("csv")),
+            (f"/audit pages of {PAGE}", pages),
+        ]:
+            start = time.perf_counter()
+            await run()
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            await run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{name:<20} {elapsed:7.1f} s   {ROWS / elapsed:9,.0f} events/s"
+                f"   peak {peak / 2 ** 20:6.1f} MiB"
+            )
+        await close_db(engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
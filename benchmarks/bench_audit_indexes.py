@@ -0,0 +1,93 @@
+"""Time audit queries on a synthetic audit database before and after its index migration.
+
+Builds a database of 5M scan events (or the count given as the first
+argument) without indexes, times the queries of query_events with each
+filter and of get_stats on its tables, runs init_db to migrate it (to the
+indexed, compact schema) and times query_events and get_stats.
+Run with: python benchmarks/bench_audit_indexes.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import AGENTS, DESTINATIONS, audit_db
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+QUERIES = {
+    "latest 50": {},
+    "agent_id": {"agent_id": AGENTS[7]},
+    "destination": {"destination": DESTINATIONS[42]},
+    "action": {"action": "BLOCK"},
+    "agent_id + action": {"agent_id": AGENTS[7], "action": "BLOCK"},
+}
+
+
+async def measure(repo: SQLAlchemyAuditRepository) -> dict[str, float]:
+    times: dict[str, float] = {}
+    for label, filters in QUERIES.items():
+        start = time.perf_counter()
+        await repo.query_events(**filters, limit=50, offset=1000)
+        times[label] = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    await repo.get_stats()
+    times["get_stats"] = (time.perf_counter() - start) * 1000
+    return times
+
+
+async def measure_before(engine: AsyncEngine) -> dict[str, float]:
+    """The same reads on the tables from before the migration, as the SQL
+    query_events and get_stats ran on them."""
+    times: dict[str, float] = {}
+    async with engine.connect() as conn:
+        for label, filters in QUERIES.items():
+            where = " AND ".join(f"{column} = :{column}" for column in filters) or "1"
+            start = time.perf_counter()
+            ids = (await conn.execute(text(
+                f"SELECT id FROM scan_events WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT 50 OFFSET 1000"
+            ), filters)).scalars().all()
+            await conn.execute(text(
+                f"SELECT * FROM findings WHERE scan_event_id IN ({', '.join(map(str, ids)) or 'NULL'})"
+            ))
+            times[label] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        await conn.execute(text("SELECT count(*) FROM scan_events"))
+        await conn.execute(text("SELECT action, count(*) FROM scan_events GROUP BY action"))
+        await conn.execute(text("SELECT severity, count(*) FROM findings GROUP BY severity"))
+        await conn.execute(text(
+            "SELECT finding_type, count(*) FROM findings GROUP BY finding_type ORDER BY count(*) DESC LIMIT 10"
+        ))
+        times["get_stats"] = (time.perf_counter() - start) * 1000
+    return times
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        start = time.perf_counter()
+        audit_db(str(path), ROWS)
+        print(f"built {ROWS:,} events in {time.perf_counter() - start:.1f} s")
+
+        engine = get_engine(f"sqlite+aiosqlite:///{path}")
+        repo = SQLAlchemyAuditRepository(get_session_factory(engine))
+        before = await measure_before(engine)
+        start = time.perf_counter()
+        await init_db(engine)
+        print(f"migrated in {time.perf_counter() - start:.1f} s")
+        after = await measure(repo)
+        await close_db(engine)
+
+    for label in before:
+        print(f"{label:<18} no indexes {before[label]:9.1f} ms   indexes {after[label]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Compare the size of the audit tables before and after the compact schema.
+
+Builds a database of 1M scan events (or the count given as the first
+argument) with the audit tables and indexes of earlier versions, measures
+them, migrates the database to the compact schema (timing ``init_db``)
+and measures the new tables, dictionary tables included, after a VACUUM
+each time.
+Run with: python benchmarks/bench_audit_schema.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import audit_db
+
+from clawguard.db.session import close_db, get_engine, init_db
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+# The indexes of the audit tables before the compact schema
+OLD_INDEXES = """
+    CREATE INDEX ix_scan_events_timestamp ON scan_events (timestamp);
+    CREATE INDEX ix_scan_events_agent_id_timestamp ON scan_events (agent_id, timestamp);
+    CREATE INDEX ix_scan_events_destination_timestamp ON scan_events (destination, timestamp);
+    CREATE INDEX ix_scan_events_action_timestamp ON scan_events (action, timestamp);
+    CREATE INDEX ix_findings_scan_event_id ON findings (scan_event_id);
+    CREATE INDEX ix_findings_severity ON findings (severity);
+    CREATE INDEX ix_findings_finding_type ON findings (finding_type);
+"""
+AUDIT_TABLES = ("scan_events", "findings", "agents", "destinations", "finding_types")
+
+
+def sizes(path: Path) -> dict[str, int]:
+    """Bytes of each audit table, with its indexes, after a VACUUM."""
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    totals = dict.fromkeys(AUDIT_TABLES, 0)
+    for table, size in conn.execute(
+        "SELECT coalesce(m.tbl_name, s.name), sum(s.pgsize) FROM dbstat s"
+        " LEFT JOIN sqlite_master m ON m.name = s.name GROUP BY 1"
+    ):
+        if table in totals:
+            totals[table] += size
+    conn.close()
+    return totals
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        audit_db(str(path), ROWS)
+        conn = sqlite3.connect(path)
+        conn.executescript(OLD_INDEXES)
+        conn.close()
+        before = sizes(path)
+
+        engine = get_engine(f"sqlite+aiosqlite:///{path}")
+        start = time.perf_counter()
+        await init_db(engine)
+        print(f"migrated {ROWS:,} events (rollup backfill, compact schema) in {time.perf_counter() - start:.1f} s")
+        await close_db(engine)
+        after = sizes(path)
+
+    for table in AUDIT_TABLES:
+        print(f"{table:<14} {before[table] / 2**20:9.1f} MiB -> {after[table] / 2**20:7.1f} MiB")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    print(
+        f"{'audit tables':<14} {total_before / 2**20:9.1f} MiB -> {total_after / 2**20:7.1f} MiB"
+        f"   ({total_before / ROWS:.0f} -> {total_after / ROWS:.0f} bytes per event)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Time dashboard stats from the stats rollups against grouping the audit tables.
+
+Builds a database of 1M scan events (or the count given as the first
+argument), times the GROUP BY queries stats used to run over the whole
+history, migrates the database (backfilling the rollups) and times
+get_stats, which reads the rollups.
+Run with: python benchmarks/bench_dashboard_stats.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import audit_db
+from sqlalchemy import func, select
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.models import FindingRecord, ScanEvent
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+async def best(query, repeat: int = 3) -> float:
+    """Best-of-*repeat* time of ``await query()`` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        audit_db(str(path), ROWS)
+        engine = get_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = get_session_factory(engine)
+
+        async def group_by() -> None:
+            async with session_factory() as session:
+                await session.execute(select(func.count()).select_from(ScanEvent))
+                await session.execute(select(ScanEvent.action, func.count()).group_by(ScanEvent.action))
+                await session.execute(select(FindingRecord.severity, func.count()).group_by(FindingRecord.severity))
+                await session.execute(
+                    select(FindingRecord.finding_type_ref, func.count()).group_by(FindingRecord.finding_type_ref)
+                    .order_by(func.count().desc()).limit(10)
+                )
+
+        start = time.perf_counter()
+        await init_db(engine)
+        elapsed = time.perf_counter() - start
+        print(f"migrated {ROWS:,} events (indexes, rollup backfill, compact schema) in {elapsed:.1f} s")
+        repo = SQLAlchemyAuditRepository(session_factory)
+        print(f"GROUP BY over the audit tables {await best(group_by):9.1f} ms")
+        print(f"get_stats from the rollups     {await best(repo.get_stats):9.1f} ms")
+        await close_db(engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
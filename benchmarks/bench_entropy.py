@@ -0,0 +1,37 @@
+"""Compare per-token entropy scoring with the batch API.
+
+Run with: python benchmarks/bench_entropy.py
+"""
+from __future__ import annotations
+
+import re
+
+from payloads import _B64, minified_js, random_tokens, timeit
+
+from clawguard.utils import entropy
+from clawguard.utils.entropy import batch_is_high_entropy, is_high_entropy
+
+_TOKEN = re.compile(r"[A-Za-z0-9+/=_\-]{20,}")
+
+
+def main() -> None:
+    payloads = [
+        ("hex dump, 20k tokens", random_tokens(20_000, "0123456789abcdef", 32)),
+        ("base64 body, 13k lines", random_tokens(13_000, _B64, 76, sep="\n")),
+        ("minified JS, 1 MB", minified_js(1_000_000)),
+    ]
+    backends = [False] + ([True] if entropy.np is not None else [])
+    for label, content in payloads:
+        tokens = _TOKEN.findall(content)
+        expected = [is_high_entropy(t) for t in tokens]
+        before = timeit(lambda: [is_high_entropy(t) for t in tokens])
+        print(f"{label}: {len(tokens)} tokens, scalar {before:8.1f} ms")
+        for use_numpy in backends:
+            assert batch_is_high_entropy(tokens, use_numpy=use_numpy) == expected
+            after = timeit(lambda: batch_is_high_entropy(tokens, use_numpy=use_numpy))
+            backend = "numpy" if use_numpy else "python"
+            print(f"  batch ({backend:6s}) {after:8.1f} ms   x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
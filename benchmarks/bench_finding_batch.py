@@ -0,0 +1,66 @@
+"""Time the scan -> policy -> redact path on payloads with many findings.
+
+Compares the per-finding objects used before FindingBatch with the
+column-wise batch. Run with: python benchmarks/bench_finding_batch.py
+"""
+from __future__ import annotations
+
+import tracemalloc
+
+from payloads import timeit
+
+from clawguard.engine.policy_engine import PolicyEngine
+from clawguard.engine.redactor import Redactor
+from clawguard.scanners.registry import create_default_registry
+
+
+def email_csv(rows: int) -> str:
+    return "\n".join(f"{i},customer{i}@example.com,Customer {i}" for i in range(rows))
+
+
+def per_finding(registry, engine, redactor, content):
+    """The previous path: a Finding, response and audit dict per match, spliced one at a time."""
+    findings = [f for stype in registry.scanner_types for f in registry.get(stype).scan(content)]
+    engine.evaluate(findings)
+    records = [
+        {"finding_type": f.finding_type, "severity": f.severity.value, "start": f.start,
+         "end": f.end, "redacted_snippet": redactor._redact_value(f.matched_text)}
+        for f in findings
+    ]
+    result = content
+    for f in sorted(findings, key=lambda f: f.start, reverse=True):
+        result = result[:f.start] + redactor._redact_value(f.matched_text) + result[f.end:]
+    return result, records
+
+
+def batched(registry, engine, redactor, content):
+    findings = registry.scan_all(content)
+    engine.evaluate(findings)
+    snippets = redactor.snippets(findings)
+    return redactor.redact(content, findings, snippets), snippets
+
+
+def peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main() -> None:
+    registry = create_default_registry()
+    engine = PolicyEngine()
+    redactor = Redactor()
+    for rows in (10_000, 25_000):
+        content = email_csv(rows)
+        args = (registry, engine, redactor, content)
+        assert per_finding(*args)[0] == batched(*args)[0]
+        before = timeit(lambda: per_finding(*args), repeat=1)
+        after = timeit(lambda: batched(*args), repeat=3)
+        print(f"{rows} emails: per-finding {before:9.1f} ms {peak_mb(lambda: per_finding(*args)):6.1f} MB peak   "
+              f"batch {after:7.1f} ms {peak_mb(lambda: batched(*args)):6.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
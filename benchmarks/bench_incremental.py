@@ -0,0 +1,39 @@
+"""Time rescans of a growing conversation with and without the chunk cache.
+
+Each payload is the previous one plus a new turn, or with one turn edited in
+the middle.  Run with: python benchmarks/bench_incremental.py
+"""
+from __future__ import annotations
+
+from payloads import timeit, with_secrets
+
+from clawguard.scanners.registry import create_default_registry
+
+
+def turn(i: int) -> str:
+    return f'{{"role": "{"user" if i % 2 else "assistant"}", "content": "{with_secrets(2000, seed=i)}"}}\n'
+
+
+def main() -> None:
+    plain = create_default_registry()
+    incremental = create_default_registry()
+    incremental.enable_incremental(min_size=0)
+    for size in (250_000, 1_000_000, 4_000_000):
+        turns = [turn(i) for i in range(size // 2000)]
+        previous = "".join(turns)
+        appended = previous + turn(len(turns))
+        middle = len(turns) // 2
+        edited = "".join(turns[:middle] + [turn(-1)] + turns[middle + 1:])
+
+        cold = timeit(lambda: incremental.scan_all(previous), repeat=1)
+        for name, content in (("append", appended), ("edit", edited)):
+            assert incremental.scan_all(content).findings() == plain.scan_all(content).findings()
+            before = timeit(lambda: plain.scan_all(content))
+            after = timeit(lambda: incremental.scan_all(content))
+            print(f"{len(content) / 1e6:4.1f} MB {name:6}: full {before:8.1f} ms   "
+                  f"incremental {after:8.1f} ms   (first scan {cold:8.1f} ms)")
+        incremental.invalidate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Time serial vs chunked process-pool scans of multi-megabyte payloads.
+
+Also reports the slowest single chunk, which bounds the wall-clock time on a
+machine with a core per worker. Run with: python benchmarks/bench_parallel.py
+"""
+from __future__ import annotations
+
+import os
+
+from payloads import _B64, random_tokens, timeit, with_secrets
+
+from clawguard.scanners.parallel import ParallelScanner, split_ranges
+from clawguard.scanners.registry import create_default_registry
+
+
+def payload(size: int) -> str:
+    emails = "\n".join(f"user{i}@example.com 123-45-6789" for i in range(size // 2000))
+    return with_secrets(size) + random_tokens(size // 400, _B64, 40) + emails
+
+
+def main() -> None:
+    registry = create_default_registry()
+    scanners = [registry.get(t) for t in registry.scanner_types]
+    workers = max(2, os.cpu_count() or 1)
+    pool = ParallelScanner(min_size=0, workers=workers)
+    try:
+        for size in (2_000_000, 8_000_000):
+            content = payload(size)
+            serial = registry.scan_all(content).findings()
+            assert pool.scan(content, scanners).findings() == serial
+
+            before = timeit(lambda: registry.scan_all(content), repeat=1)
+            after = timeit(lambda: pool.scan(content, scanners), repeat=1)
+            slowest = max(
+                timeit(lambda: [s.scan_range(content, start, end) for s in scanners], repeat=1)
+                for start, end in split_ranges(len(content), workers)
+            )
+            print(f"{len(content) / 1e6:4.1f} MB: serial {before:8.1f} ms   {workers} workers {after:8.1f} ms   "
+                  f"slowest chunk {slowest:8.1f} ms   ({os.cpu_count()} CPUs)")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Compare the per-pattern finditer loop with the compiled PatternSet.
+
+Run with: python benchmarks/bench_pattern_set.py
+"""
+from __future__ import annotations
+
+from payloads import prose, timeit, with_secrets
+
+from clawguard.scanners import prefilter
+from clawguard.scanners.pattern_set import PatternSet
+from clawguard.scanners.patterns.pii import PII_PATTERNS
+from clawguard.scanners.patterns.secrets import SECRET_PATTERNS
+
+
+def loop(patterns, content: str) -> int:
+    return sum(1 for p in patterns for _ in p.pattern.finditer(content))
+
+
+def main() -> None:
+    payloads = [
+        ("300 B, no secrets", prose(300)),
+        ("1 MB, no secrets", prose(1_000_000)),
+        ("1 MB, secret every 4 KB", with_secrets(1_000_000)),
+    ]
+    backends = [False] + ([True] if prefilter.ahocorasick is not None else [])
+    for catalog_name, catalog in [("secrets", SECRET_PATTERNS), ("pii", PII_PATTERNS)]:
+        for use_automaton in backends:
+            ps = PatternSet(catalog, use_automaton=use_automaton)
+            backend = "automaton" if use_automaton else "find"
+            print(f"{catalog_name}: {len(catalog)} patterns, <= {ps.pass_count} full passes, {backend}")
+            for label, content in payloads:
+                assert loop(catalog, content) == len(ps.scan(content))
+                n = max(1, 100_000 // len(content))
+                before = timeit(lambda: [loop(catalog, content) for _ in range(n)]) / n
+                after = timeit(lambda: [ps.scan(content) for _ in range(n)]) / n
+                print(f"  {label:26s} loop {before:9.3f} ms   pattern set {after:9.3f} ms   x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
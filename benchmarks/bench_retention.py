@@ -0,0 +1,93 @@
+"""Time a retention run on a synthetic audit database and audit writes during it.
+
+Builds a database of 1M scan events, one second apart (or the count given
+as the first argument), converts it to incremental auto-vacuum with a
+vacuum run, then deletes all but the newest half (in whole days),
+retention_batch_size events per transaction, while a writer commits
+batches of audit events, and prints the retention report and the write
+latencies.
+Run with: python benchmarks/bench_retention.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import audit_db
+
+from clawguard.config import Settings
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.retention import RetentionJob
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db, sqlite_pragmas
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+START = datetime.datetime(2026, 1, 1)
+NOW = START + datetime.timedelta(seconds=ROWS)
+
+
+def _batch(first_id: int) -> list[dict]:
+    return [
+        {
+            "id": event_id, "timestamp": NOW, "agent_id": "bench", "destination": None,
+            "content_hash": "0" * 64, "action": "ALLOW", "findings_count": 0, "duration_ms": 1.0,
+            "findings": [],
+        }
+        for event_id in range(first_id, first_id + 50)
+    ]
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        audit_db(str(path), ROWS)
+        days = ROWS / 86_400 / 2
+        settings = Settings(
+            database_url=f"sqlite+aiosqlite:///{path}",
+            audit_retention_days=max(int(days), 1),
+        )
+        engine = get_engine(settings.database_url, sqlite_pragmas(settings), settings.db_write_pool_size)
+        await init_db(engine)
+        # A run with nothing to delete, as on a database that keeps everything
+        start = time.perf_counter()
+        await RetentionJob(engine, Settings(database_url=settings.database_url)).run(vacuum=True)
+        print(f"{ROWS:,} events; VACUUM to incremental auto-vacuum took {time.perf_counter() - start:.1f} s")
+
+        job = RetentionJob(engine, settings, clock=lambda: NOW)
+        repo = SQLAlchemyAuditRepository(get_session_factory(engine))
+        latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def writer() -> None:
+            next_id = ROWS + 1
+            while not done.is_set():
+                call = time.perf_counter()
+                await repo.write_events(_batch(next_id))
+                latencies.append((time.perf_counter() - call) * 1000)
+                next_id += 50
+                await asyncio.sleep(0.01)
+
+        async def retention():
+            try:
+                return await job.run()
+            finally:
+                done.set()
+
+        report, _ = await asyncio.gather(retention(), writer())
+        await close_db(engine)
+
+    print(json.dumps(report.to_dict(), indent=2))
+    latencies.sort()
+    print(
+        f"{len(latencies)} audit writes during retention: p50 {statistics.median(latencies):.2f} ms"
+        f"   p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f} ms   max {latencies[-1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Time audit writes and reads with the segment-log backend, against the database.
+
+Logs 500k synthetic scan events (or the count given as the first
+argument) one per call and in batches of 100, to a segment log and to
+SQLite (a tenth as many events), then times the reads of /audit, the
+dashboard and a time series on the segment log.
+Run with: python benchmarks/bench_segment_log.py [events]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import AGENTS, audit_events
+
+from clawguard.config import Settings
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.repository import encode_cursor
+from clawguard.db.segment_log import SegmentLogAuditRepository
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db, sqlite_pragmas
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+
+async def best(query, repeat: int = 3) -> float:
+    """Best-of-*repeat* time of ``await query()`` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+async def write(repo, events: list[dict], batch: int) -> float:
+    """Events logged per second, *batch* per call."""
+    start = time.perf_counter()
+    for i in range(0, len(events), batch):
+        await repo.log_scans([dict(event) for event in events[i:i + batch]])
+    return len(events) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    events = audit_events(EVENTS)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'audit.db'}", sqlite_pragmas(Settings()))
+        await init_db(engine)
+        sql = SQLAlchemyAuditRepository(get_session_factory(engine))
+        for batch in (1, 100):
+            rate = await write(sql, events[:EVENTS // 10], batch)
+            print(f"SQLite       {batch:>3} per call   {rate:9,.0f} events/s")
+        await close_db(engine)
+
+        for batch in (1, 100):
+            log = SegmentLogAuditRepository(Path(tmp) / f"log{batch}")
+            rate = await write(log, events, batch)
+            print(f"segment log  {batch:>3} per call   {rate:9,.0f} events/s")
+            await log.close()
+
+        start = time.perf_counter()
+        log = SegmentLogAuditRepository(Path(tmp) / "log100")
+        print(f"reopened {log.stats()} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        page = await log.query_events(limit=50, offset=EVENTS // 2)
+        cursor = encode_cursor(page[-1])
+        old_id = page[0]["id"]
+        for name, query in [
+            ("/audit newest page", lambda: log.query_events(limit=50)),
+            ("/audit page by agent", lambda: log.query_events(agent_id=AGENTS[7], limit=50)),
+            ("/audit page by cursor", lambda: log.query_events(limit=50, cursor=cursor)),
+            ("audit entry by ID", lambda: log.get_event(old_id)),
+            ("dashboard stats", log.get_stats),
+            ("timeseries by action", lambda: log.get_timeseries(group_by="action")),
+        ]:
+            print(f"{name:<24} {await best(query):8.2f} ms")
+        await log.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Compare the linear span-coverage check with SpanIndex.
+
+Run with: python benchmarks/bench_span_index.py
+"""
+from __future__ import annotations
+
+import random
+
+from payloads import timeit
+
+from clawguard.scanners import secret_scanner
+from clawguard.scanners.secret_scanner import SecretScanner
+from clawguard.utils.intervals import SpanIndex
+
+
+class LinearSpans:
+    """The previous ``any()`` scan over every span, behind SpanIndex's interface."""
+
+    def __init__(self, spans):
+        self._spans = list(spans)
+
+    def covers(self, start: int, end: int) -> bool:
+        return any(s[0] <= start and s[1] >= end for s in self._spans)
+
+
+def linear(spans: set[tuple[int, int]], queries: list[tuple[int, int]]) -> int:
+    return sum(1 for q in queries if any(s[0] <= q[0] and s[1] >= q[1] for s in spans))
+
+
+def indexed(spans: set[tuple[int, int]], queries: list[tuple[int, int]]) -> int:
+    index = SpanIndex(spans)
+    return sum(1 for start, end in queries if index.covers(start, end))
+
+
+def env_dump(lines: int, seed: int = 1) -> str:
+    """A leaked ``.env``-style dump with one credential per line."""
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+    return "\n".join(
+        f"AWS_KEY_{i}=AKIA{''.join(rng.choice(alphabet) for _ in range(16))}"
+        for i in range(lines)
+    )
+
+
+def main() -> None:
+    rng = random.Random(1)
+    spans = set()
+    for i in range(10_000):
+        start = i * 100 + rng.randint(0, 20)
+        spans.add((start, start + rng.randint(20, 60)))
+    queries = [(s + 1, e - 1) for s, e in spans] + [(i * 100 + 70, i * 100 + 95) for i in range(10_000)]
+
+    assert linear(spans, queries[:500]) == indexed(spans, queries[:500])
+    before = timeit(lambda: linear(spans, queries[:500]), repeat=1) * len(queries) / 500
+    after = timeit(lambda: indexed(spans, queries))
+    print(f"10k spans, {len(queries)} queries: linear ~{before:9.1f} ms (extrapolated)   "
+          f"SpanIndex {after:7.2f} ms   x{before / after:.0f}")
+
+    content = env_dump(10_000)
+    scanner = SecretScanner()
+    findings = scanner.scan(content)
+    after = timeit(lambda: scanner.scan(content), repeat=3)
+    secret_scanner.SpanIndex = LinearSpans
+    try:
+        assert scanner.scan(content) == findings
+        before = timeit(lambda: scanner.scan(content), repeat=1)
+    finally:
+        secret_scanner.SpanIndex = SpanIndex
+    print(f".env dump, 10k lines, {len(findings)} findings: SecretScanner.scan "
+          f"linear {before:9.1f} ms   SpanIndex {after:7.1f} ms   x{before / after:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time audit writes and concurrent dashboard reads with SQLite defaults and the WAL profile.
+
+A writer commits small batches of audit events while a reader runs
+get_stats in a loop, both against a temporary SQLite database.
+Run with: python benchmarks/bench_sqlite_profile.py
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from clawguard.config import Settings
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.session import (
+    close_db,
+    get_engine,
+    get_read_engine,
+    get_session_factory,
+    init_db,
+    reset_globals,
+    sqlite_pragmas,
+)
+from clawguard.utils.ids import ScanIdGenerator
+
+BATCHES = 300
+BATCH_SIZE = 20
+
+
+def _batch(ids: ScanIdGenerator) -> list[dict]:
+    timestamp = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    events = []
+    for _ in range(BATCH_SIZE):
+        event_id = ids.next_id()
+        events.append({
+            "id": event_id, "timestamp": timestamp, "agent_id": "bench", "destination": "api.example.com",
+            "content_hash": "0" * 64, "action": "REDACT", "findings_count": 1, "duration_ms": 1.0,
+            "findings": [{
+                "scan_event_id": event_id, "scanner_type": "PII", "finding_type": "ssn", "severity": "CRITICAL",
+                "start_offset": 0, "end_offset": 11, "redacted_snippet": "123-***6789",
+            }],
+        })
+    return events
+
+
+async def run(tmp: str, label: str, settings: Settings) -> None:
+    reset_globals()
+    url = f"sqlite+aiosqlite:///{Path(tmp) / f'{label}.db'}"
+    pragmas = sqlite_pragmas(settings)
+    engine = get_engine(url, pragmas, settings.db_write_pool_size)
+    read_engine = get_read_engine(url, pragmas, settings.db_read_pool_size)
+    await init_db(engine)
+    repo = SQLAlchemyAuditRepository(get_session_factory(engine), get_session_factory(read_engine))
+    ids = ScanIdGenerator()
+    writes: list[float] = []
+    reads: list[float] = []
+    done = asyncio.Event()
+
+    async def writer() -> None:
+        for _ in range(BATCHES):
+            start = time.perf_counter()
+            await repo.write_events(_batch(ids))
+            writes.append((time.perf_counter() - start) * 1000)
+        done.set()
+
+    async def reader() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await repo.get_stats()
+            reads.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(writer(), reader())
+    await close_db(read_engine)
+    await close_db(engine)
+    writes.sort()
+    reads.sort()
+    print(
+        f"{label:<9} write p50 {statistics.median(writes):6.2f} ms  p99 {writes[int(len(writes) * 0.99) - 1]:6.2f} ms"
+        f"   stats p50 {statistics.median(reads):6.2f} ms  ({len(reads)} reads)"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        await run(tmp, "defaults", Settings(
+            sqlite_journal_mode="DELETE", sqlite_synchronous="FULL", sqlite_mmap_size=0,
+            sqlite_cache_size=-2000, sqlite_temp_store="DEFAULT",
+        ))
+        await run(tmp, "profile", Settings())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
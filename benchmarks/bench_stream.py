@@ -0,0 +1,66 @@
+"""Peak memory and time of whole-payload vs streamed scans.
+
+The whole-payload path holds the request, the decoded content and its
+redacted copy; the stream keeps a bounded window. Run with:
+python benchmarks/bench_stream.py
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from payloads import with_secrets
+
+from clawguard.engine.redactor import Redactor
+from clawguard.scanners.registry import create_default_registry
+from clawguard.utils.hashing import sha256_hash
+
+CHUNK = 64 * 1024
+
+
+def whole(registry, redactor, body: bytes) -> int:
+    content = body.decode()
+    findings = registry.scan_all(content)
+    redacted = redactor.redact(content, findings, redactor.snippets(findings))
+    sha256_hash(content)
+    return len(redacted)
+
+
+def streamed(registry, redactor, body: bytes) -> int:
+    stream = registry.stream()
+    size = pos = 0
+    for i in range(0, len(body), CHUNK):
+        for rnd in stream.feed(body[i:i + CHUNK].decode()):
+            text, reached = redactor.redact_range(
+                rnd.text, rnd.findings, redactor.snippets(rnd.findings), pos - rnd.base, rnd.end)
+            size, pos = size + len(text), rnd.base + reached
+    rnd = stream.close()
+    text, _ = redactor.redact_range(rnd.text, rnd.findings, redactor.snippets(rnd.findings), pos - rnd.base, rnd.end)
+    return size + len(text)
+
+
+def measure(fn, *args) -> tuple[float, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, result
+
+
+def main() -> None:
+    registry = create_default_registry()
+    redactor = Redactor()
+    for size in (2_000_000, 8_000_000):
+        # ASCII payload, so chunks never split a character
+        body = with_secrets(size).encode()
+        t1, m1, n1 = measure(whole, registry, redactor, body)
+        t2, m2, n2 = measure(streamed, registry, redactor, body)
+        assert n1 == n2
+        print(f"{len(body) / 1e6:5.1f} MB: whole {t1:8.1f} ms {m1:7.1f} MB peak   "
+              f"stream {t2:8.1f} ms {m2:7.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Time dashboard time series from the stats rollups against grouping scan_events.
+
+Builds a database of 1M scan events, one second apart (or the count given
+as the first argument), and charts all of it: scans per hour by action
+with a GROUP BY over scan_events, and the same and a few other series
+through get_timeseries.
+Run with: python benchmarks/bench_timeseries.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from payloads import audit_db
+from sqlalchemy import Integer, func, select, type_coerce
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.models import ScanEvent
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+SINCE = datetime.datetime(2026, 1, 1)
+UNTIL = SINCE + datetime.timedelta(seconds=ROWS + 1)
+
+
+async def best(query, repeat: int = 3) -> float:
+    """Best-of-*repeat* time of ``await query()`` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audit.db"
+        audit_db(str(path), ROWS)
+        engine = get_engine(f"sqlite+aiosqlite:///{path}")
+        await init_db(engine)
+        session_factory = get_session_factory(engine)
+        repo = SQLAlchemyAuditRepository(session_factory)
+
+        async def group_by() -> None:
+            # Timestamps are stored as microseconds since 1970
+            hour = type_coerce(ScanEvent.timestamp, Integer) // 3_600_000_000
+            async with session_factory() as session:
+                await session.execute(
+                    select(hour, ScanEvent.action, func.count())
+                    .where(ScanEvent.timestamp >= SINCE, ScanEvent.timestamp < UNTIL)
+                    .group_by(hour, ScanEvent.action)
+                )
+
+        print(f"{ROWS:,} events over {UNTIL - SINCE}")
+        print("scans/hour by action, GROUP BY".ljust(42) + f"{await best(group_by):8.1f} ms")
+        for metric, group, bucket in (
+            ("scans", "action", "hour"),
+            ("block_rate", None, "hour"),
+            ("duration_ms", "agent", "day"),
+            ("findings", "finding_type", "day"),
+        ):
+            elapsed = await best(lambda: repo.get_timeseries(metric, group, bucket, SINCE, UNTIL))
+            print(f"{metric}/{bucket} by {group or 'total'}, rollups".ljust(42) + f"{elapsed:8.1f} ms")
+        await close_db(engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
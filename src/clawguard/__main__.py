@@ -1,13 +1,37 @@
 """CLI entry point: python -m clawguard"""
 from __future__ import annotations
 
+import argparse
+import asyncio
+import json
+
 import uvicorn
 
-from clawguard.config import get_settings
+from clawguard.config import Settings, get_settings
+
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="clawwall")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("serve", help="Run the server (the default)")
+    retention = commands.add_parser(
+        "retention", help="Apply the audit retention settings once and print what was reclaimed",
+    )
+    retention.add_argument(
+        "--vacuum", action="store_true",
+        help="Rebuild the SQLite database with VACUUM (blocks audit writes while it runs)",
+    )
+    args = parser.parse_args(argv)
 
-def main() -> None:
     settings = get_settings()
+    if args.command == "retention":
+        print(json.dumps(asyncio.run(run_retention(settings, args.vacuum)), indent=2))
+        return
+    if settings.workers > 1:
+        from clawguard.supervisor import serve
+
+        serve(settings)
+        return
     uvicorn.run(
         "clawguard.app:create_app",
         factory=True,
@@ -17,5 +41,19 @@ def main() -> None:
     )
 
 
+async def run_retention(settings: Settings, vacuum: bool = False) -> dict:
+    """One retention run on the database of *settings*; returns its report."""
+    from clawguard.db.retention import RetentionJob
+    from clawguard.db.session import close_db, get_engine, init_db, sqlite_pragmas
+
+    engine = get_engine(settings.database_url, sqlite_pragmas(settings), settings.db_write_pool_size)
+    try:
+        await init_db(engine)
+        report = await RetentionJob(engine, settings).run(vacuum)
+    finally:
+        await close_db(engine)
+    return report.to_dict()
+
+
 if __name__ == "__main__":
     main()
@@ -1,27 +1,130 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+import csv
+import datetime
+import io
+import json
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing
+from typing import Any, Literal
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from clawguard.db.repository import encode_cursor
 from clawguard.dependencies import ServiceContainer, get_container
 from clawguard.models.audit import AuditEntry
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# CSV columns; findings are one JSON array per row
+EXPORT_COLUMNS = (
+    "id", "timestamp", "agent_id", "destination", "content_hash",
+    "action", "findings_count", "duration_ms", "findings",
+)
+_json = json.JSONEncoder(separators=(",", ":")).encode
+
 
 @router.get("/audit", response_model=list[AuditEntry])
 async def query_audit(
+    response: Response,
     agent_id: str | None = Query(None),
     destination: str | None = Query(None),
     action: str | None = Query(None),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    since: datetime.datetime | None = Query(None),
+    until: datetime.datetime | None = Query(None),
     container: ServiceContainer = Depends(get_container),
 ) -> list[AuditEntry]:
-    events = await container.audit_repo.query_events(
+    """Audit entries, newest first.
+
+    A full page carries an ``X-Next-Cursor`` header; passing it back as
+    *cursor* returns the entries after the page, unaffected by scans
+    logged in between.  *offset* pages still work.
+    """
+    try:
+        events = await container.audit_repo.query_events(
+            agent_id=agent_id,
+            destination=destination,
+            action=action,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            since=since,
+            until=until,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    if len(events) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(events[-1])
+    return [AuditEntry.model_validate(e) for e in events]
+
+
+@router.get("/audit/export", response_class=StreamingResponse)
+async def export_audit(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    agent_id: str | None = Query(None),
+    destination: str | None = Query(None),
+    action: str | None = Query(None),
+    since: datetime.datetime | None = Query(None),
+    until: datetime.datetime | None = Query(None),
+    container: ServiceContainer = Depends(get_container),
+) -> StreamingResponse:
+    """Every audit entry matching the filters, oldest first, as NDJSON (one
+    :class:`AuditEntry` per line) or CSV.
+
+    Entries are read from a database cursor and sent a batch at a time as
+    they are read, so memory stays flat however many are exported.
+    """
+    events = container.audit_repo.export_events(
         agent_id=agent_id,
         destination=destination,
         action=action,
-        limit=limit,
-        offset=offset,
+        since=since,
+        until=until,
     )
-    return [AuditEntry.model_validate(e) for e in events]
+    return StreamingResponse(
+        _export_lines(events, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="audit.{format}"'},
+    )
+
+
+@router.get("/audit/{scan_id}", response_model=AuditEntry)
+async def get_audit_entry(
+    scan_id: int,
+    container: ServiceContainer = Depends(get_container),
+) -> AuditEntry:
+    """The audit entry of the scan that returned *scan_id*."""
+    event = await container.audit_repo.get_event(scan_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return AuditEntry.model_validate(event)
+
+
+async def _export_lines(
+    batches: AsyncGenerator[list[dict[str, Any]], None], format: str,
+) -> AsyncIterator[str]:
+    # Closes the database cursor as well when the client goes away mid-export
+    async with aclosing(batches):
+        if format == "ndjson":
+            async for events in batches:
+                yield "".join(_json(event) + "\n" for event in events)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+        async for events in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            for event in events:
+                writer.writerow([
+                    *(event[column] for column in EXPORT_COLUMNS[:-1]),
+                    _json(event["findings"]),
+                ])
+            yield buffer.getvalue()
@@ -1,11 +1,15 @@
-"""Dashboard API endpoints: stats, policy, and pattern catalog."""
+"""Dashboard API endpoints: stats, time series, policy, and pattern catalog."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from clawguard.dependencies import ServiceContainer, get_container
 from clawguard.models.dashboard import (
     DashboardStats,
+    DashboardTimeseries,
     PatternCatalog,
     PatternCatalogEntry,
 )
@@ -123,6 +127,24 @@ async def dashboard_stats(
     return DashboardStats.model_validate(stats)
 
 
+@router.get("/dashboard/timeseries", response_model=DashboardTimeseries)
+async def dashboard_timeseries(
+    metric: Literal["scans", "findings", "blocked", "block_rate", "duration_ms"] = Query("scans"),
+    group_by: Literal["action", "severity", "agent", "destination", "finding_type"] | None = Query(None),
+    bucket: Literal["minute", "hour", "day"] = Query("hour"),
+    since: datetime.datetime | None = Query(None),
+    until: datetime.datetime | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    container: ServiceContainer = Depends(get_container),
+) -> DashboardTimeseries:
+    """*metric* per time bucket, from the stats rollups; ``duration_ms`` is the average."""
+    try:
+        series = await container.audit_repo.get_timeseries(metric, group_by, bucket, since, until, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return DashboardTimeseries.model_validate(series)
+
+
 @router.get("/dashboard/policy")
 async def dashboard_policy(
     container: ServiceContainer = Depends(get_container),
@@ -19,3 +19,16 @@ async def health_check(
         "policy_loaded": container.policy_engine.policy is not None,
         "default_action": container.policy_engine.policy.default_action.value,
     }
+
+
+@router.get("/metrics")
+async def metrics(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    return {
+        "scan_cache": container.scan_cache.stats(),
+        "chunk_cache": container.registry.chunk_cache_stats(),
+        "audit_queue": container.audit_queue.stats() if container.audit_queue is not None else None,
+        "retention": container.retention.stats() if container.retention is not None else None,
+        "audit_log": container.audit_log.stats() if container.audit_log is not None else None,
+    }
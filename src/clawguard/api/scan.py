@@ -1,29 +1,75 @@
 from __future__ import annotations
 
+import codecs
+import hashlib
+import json
 import time
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 from clawguard.dependencies import ServiceContainer, get_container
-from clawguard.models.enums import Action
-from clawguard.models.scan import FindingResponse, ScanRequest, ScanResponse
+from clawguard.engine.policy_engine import PolicyDecision
+from clawguard.models.enums import Action, ScannerType
+from clawguard.models.scan import (
+    MAX_BATCH_ITEMS,
+    FindingResponse,
+    ScanRequest,
+    ScanResponse,
+    ScanStreamResult,
+)
+from clawguard.scanners.base import SEVERITIES, FindingBatch
+from clawguard.scanners.cache import CacheKey
+from clawguard.scanners.stream import StreamRound
 from clawguard.utils.hashing import sha256_hash
 
 router = APIRouter()
 
 
+class BodyStreamingResponse(StreamingResponse):
+    """A StreamingResponse whose body iterator reads the request body.
+
+    On ASGI servers before spec 2.4, StreamingResponse listens for client
+    disconnects on ``receive`` while streaming, which would consume the
+    request body messages; here the body iterator is the only reader and
+    sees the disconnect itself (as ``ClientDisconnect``).
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
 @router.post("/scan", response_model=ScanResponse)
 async def scan_content(
     request: ScanRequest,
     container: ServiceContainer = Depends(get_container),
 ) -> ScanResponse:
     start = time.monotonic()
+    response, event = await container.offload(_scan_one, container, request, start)
 
+    # Audit log (written behind the response, never stores raw content)
+    await container.audit_repo.log_scan(event)
+    return response
+
+
+def _scan_one(
+    container: ServiceContainer, request: ScanRequest, start: float
+) -> tuple[ScanResponse, dict[str, Any]]:
+    """Scan, evaluate and act on one request; runs on a scan thread."""
     # Determine which scanners to run based on destination
     scanner_types = container.policy_engine.get_scanners_for_destination(request.destination)
 
-    # Run scanners
-    findings = container.registry.scan_all(request.content, only=scanner_types)
+    # Run scanners, unless the same content was scanned recently
+    content_hash = sha256_hash(request.content)
+    cache = container.scan_cache
+    key = cache.key(content_hash, scanner_types)
+    findings = cache.get(key, request.content)
+    if findings is None:
+        findings = container.registry.scan_all(request.content, only=scanner_types)
+        cache.put(key, findings)
 
     # Evaluate policy (with prompt upgrade)
     decision = container.policy_engine.evaluate_with_prompt(
@@ -32,50 +78,122 @@ async def scan_content(
         agent_id=request.agent_id,
     )
 
+    return _respond(container, request, content_hash, findings, decision, start)
+
+
+@router.post("/scan/batch", response_model=list[ScanResponse])
+async def scan_batch(
+    requests: Annotated[list[ScanRequest], Body(max_length=MAX_BATCH_ITEMS)],
+    container: ServiceContainer = Depends(get_container),
+) -> list[ScanResponse]:
+    """Scan several payloads in one round trip.
+
+    Every item gets the response ``/scan`` would give it.  Policy lookups
+    are shared between items, items are spread over the parallel scan pool
+    when it is enabled, and the audit events are written in one transaction.
+    ``duration_ms`` is measured from the start of the batch.
+    """
+    start = time.monotonic()
+    responses, events = await container.offload(_scan_batch, container, requests, start)
+    await container.audit_repo.log_scans(events)
+    return responses
+
+
+def _scan_batch(
+    container: ServiceContainer, requests: list[ScanRequest], start: float
+) -> tuple[list[ScanResponse], list[dict[str, Any]]]:
+    """:func:`_scan_one` for a batch of requests; runs on a scan thread."""
+    policy = container.policy_engine
+
+    # Items sent to the same destination share the scanner lookup
+    scanner_types: dict[str | None, list[ScannerType] | None] = {}
+    for item in requests:
+        if item.destination not in scanner_types:
+            scanner_types[item.destination] = policy.get_scanners_for_destination(item.destination)
+
+    # Scan each distinct (content, scanners) once, skipping cached results
+    cache = container.scan_cache
+    hashes = [sha256_hash(item.content) for item in requests]
+    keys = [cache.key(h, scanner_types[item.destination]) for h, item in zip(hashes, requests)]
+    found: dict[CacheKey, FindingBatch] = {}
+    misses: dict[CacheKey, ScanRequest] = {}
+    for key, item in zip(keys, requests):
+        if key in found or key in misses:
+            continue
+        cached = cache.get(key, item.content)
+        if cached is None:
+            misses[key] = item
+        else:
+            found[key] = cached
+    scanned = container.registry.scan_many(
+        [(item.content, scanner_types[item.destination]) for item in misses.values()]
+    )
+    for key, findings in zip(misses, scanned):
+        cache.put(key, findings)
+        found[key] = findings
+    batches = [found[key] for key in keys]
+    decisions = policy.evaluate_many(
+        [(findings, item.destination, item.agent_id) for item, findings in zip(requests, batches)]
+    )
+
+    responses: list[ScanResponse] = []
+    events: list[dict[str, Any]] = []
+    for item, content_hash, findings, decision in zip(requests, hashes, batches, decisions):
+        response, event = _respond(container, item, content_hash, findings, decision, start)
+        responses.append(response)
+        events.append(event)
+    return responses, events
+
+
+def _respond(
+    container: ServiceContainer,
+    request: ScanRequest,
+    content_hash: str,
+    findings: FindingBatch,
+    decision: PolicyDecision,
+    start: float,
+) -> tuple[ScanResponse, dict[str, Any]]:
+    """Apply *decision* to a scanned request; returns the response and its audit event.
+
+    The scan ID is generated here, so the response does not wait for the audit write.
+    """
+    # Redacted snippets, shared by redaction, the response and the audit log
+    snippets = container.redactor.snippets(findings)
+
     # Apply action
-    result = container.action_handler.handle(decision.action, request.content, findings)
+    result = container.action_handler.handle(decision.action, request.content, findings, snippets)
 
     duration_ms = (time.monotonic() - start) * 1000
 
     # Build finding responses (with redacted snippets, never raw secrets)
-    finding_responses = []
-    for f in findings:
-        # Create a safe redacted snippet
-        redacted = container.redactor._redact_value(f.matched_text)
-        finding_responses.append(FindingResponse(
-            scanner_type=f.scanner_type,
-            finding_type=f.finding_type,
-            severity=f.severity,
-            start=f.start,
-            end=f.end,
-            redacted_snippet=redacted,
-        ))
-
-    # Audit log (async, never stores raw content)
-    content_hash = sha256_hash(request.content)
-    finding_records = [
-        {
-            "scanner_type": f.scanner_type.value,
-            "finding_type": f.finding_type,
-            "severity": f.severity.value,
-            "start_offset": f.start,
-            "end_offset": f.end,
-            "redacted_snippet": container.redactor._redact_value(f.matched_text),
-        }
-        for f in findings
+    kinds = findings.kinds
+    finding_responses = [
+        FindingResponse(
+            scanner_type=kinds[kind_id].scanner_type,
+            finding_type=kinds[kind_id].finding_type,
+            severity=SEVERITIES[code],
+            start=f_start,
+            end=f_end,
+            redacted_snippet=snippet,
+        )
+        for kind_id, code, f_start, f_end, snippet in zip(
+            findings.kind_ids, findings.severity_codes, findings.starts, findings.ends, snippets
+        )
     ]
 
-    scan_id = await container.audit_repo.log_scan({
+    scan_id = container.scan_ids.next_id()
+    event = {
+        "id": scan_id,
         "agent_id": request.agent_id,
         "destination": request.destination,
         "content_hash": content_hash,
         "action": decision.action.value,
         "findings_count": len(findings),
         "duration_ms": duration_ms,
-        "findings": finding_records,
-    })
-
-    return ScanResponse(
+        "findings": findings,
+        "redacted_snippets": snippets,
+    }
+    response = ScanResponse(
         action=result.action,
         suggested_action=decision.suggested_action,
         content=result.content,
@@ -84,3 +202,119 @@ async def scan_content(
         scan_id=scan_id,
         duration_ms=round(duration_ms, 2),
     )
+    return response, event
+
+
+@router.post("/scan/stream", response_class=BodyStreamingResponse)
+async def scan_stream(
+    request: Request,
+    destination: str | None = Query(None),
+    agent_id: str | None = Query(None),
+    tool_name: str | None = Query(None),
+    container: ServiceContainer = Depends(get_container),
+) -> BodyStreamingResponse:
+    """Scan a raw UTF-8 request body as it arrives.
+
+    The response is NDJSON: ``content`` lines carry the redacted content in
+    order, ``finding`` lines each finding once it is settled, and a final
+    ``result`` line (:class:`ScanStreamResult`) the policy decision.  Content
+    is always streamed redacted, since the decision needs every finding;
+    clients discard it when the action is BLOCK.  Memory is bounded by
+    ``scan_stream_window`` rather than the body size.
+    """
+    return BodyStreamingResponse(
+        _stream_events(request, destination, agent_id, container),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _stream_events(
+    request: Request,
+    destination: str | None,
+    agent_id: str | None,
+    container: ServiceContainer,
+) -> AsyncIterator[str]:
+    start = time.monotonic()
+    scanner_types = container.policy_engine.get_scanners_for_destination(destination)
+    stream = container.registry.stream(only=scanner_types, window=container.settings.scan_stream_window)
+    redactor = container.redactor
+
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # Stream-wide finding columns for policy and audit; matched text is not kept
+    findings = FindingBatch("")
+    snippets: list[str] = []
+    emitted = 0
+
+    def settle(rnd: StreamRound) -> list[str]:
+        nonlocal emitted
+        batch = rnd.findings
+        round_snippets = redactor.snippets(batch)
+        text, reached = redactor.redact_range(
+            rnd.text, batch, round_snippets, emitted - rnd.base, rnd.end,
+        )
+        emitted = rnd.base + reached
+
+        lines = [_ndjson({"type": "content", "content": text})] if text else []
+        for i in sorted(range(len(batch)), key=batch.starts.__getitem__):
+            kind = batch.kind(i)
+            f_start, f_end = rnd.base + batch.starts[i], rnd.base + batch.ends[i]
+            findings.append(findings.kind_id(*kind), batch.severity(i), f_start, f_end)
+            snippets.append(round_snippets[i])
+            lines.append(_ndjson({"type": "finding", **FindingResponse(
+                scanner_type=kind.scanner_type,
+                finding_type=kind.finding_type,
+                severity=batch.severity(i),
+                start=f_start,
+                end=f_end,
+                redacted_snippet=round_snippets[i],
+            ).model_dump(mode="json")}))
+        return lines
+
+    def advance(data: bytes, final: bool = False) -> list[str]:
+        # Scans and redacts on a scan thread, one piece of the body at a time
+        rounds = stream.feed(decoder.decode(data, final))
+        if final:
+            rounds.append(stream.close())
+        return [line for rnd in rounds for line in settle(rnd)]
+
+    async for data in request.stream():
+        digest.update(data)
+        for line in await container.offload(advance, data):
+            yield line
+    for line in await container.offload(advance, b"", True):
+        yield line
+
+    decision = container.policy_engine.evaluate_with_prompt(
+        findings,
+        destination=destination,
+        agent_id=agent_id,
+    )
+    duration_ms = (time.monotonic() - start) * 1000
+    content_hash = digest.hexdigest()
+    scan_id = container.scan_ids.next_id()
+    await container.audit_repo.log_scan({
+        "id": scan_id,
+        "agent_id": agent_id,
+        "destination": destination,
+        "content_hash": content_hash,
+        "action": decision.action.value,
+        "findings_count": len(findings),
+        "duration_ms": duration_ms,
+        "findings": findings,
+        "redacted_snippets": snippets,
+    })
+
+    yield _ndjson({"type": "result", **ScanStreamResult(
+        action=decision.action,
+        suggested_action=decision.suggested_action,
+        findings_count=len(findings),
+        content_hash=content_hash,
+        content_length=stream.position,
+        scan_id=scan_id,
+        duration_ms=round(duration_ms, 2),
+    ).model_dump(mode="json")})
+
+
+def _ndjson(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":")) + "\n"
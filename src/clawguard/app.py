@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
+from functools import partial
+from multiprocessing.connection import Connection
 from typing import AsyncIterator
 
 from fastapi import FastAPI
@@ -8,19 +10,56 @@ from fastapi import FastAPI
 from clawguard.api.router import api_router
 from clawguard.config import Settings, get_settings
 from clawguard.dashboard import router as dashboard_router
+from clawguard.db.audit_writer import AuditWriterClient
 from clawguard.db.session import close_db, init_db
 from clawguard.dependencies import get_container, init_container
 
 
-def create_app(settings: Settings | None = None) -> FastAPI:
+def create_app(
+    settings: Settings | None = None,
+    audit_connection: Connection | None = None,
+) -> FastAPI:
+    """Build the app; with *audit_connection* it is one of several server
+    processes (see :mod:`clawguard.supervisor`) and audit events go to the
+    audit writer process."""
     settings = settings or get_settings()
 
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         container = init_container(settings)
-        await init_db(container.engine)
+        if audit_connection is None:
+            if container.engine is not None:
+                await init_db(container.engine)
+        else:
+            # The audit writer created the tables, queues the events and
+            # applies retention; policy changes made by other server processes arrive through it
+            assert container.read_session_factory is not None
+            client = AuditWriterClient(
+                container.read_session_factory,
+                audit_connection,
+                partial(container.reload_policy, broadcast=False),
+            )
+            client.start()
+            container.audit_repo = client
+            container.audit_queue = None
+            container.policy_broadcast = client.broadcast_policy
+            container.retention = None
+        if container.audit_queue is not None:
+            # Replays audit events journaled before a restart
+            container.audit_queue.start()
+        if container.retention is not None:
+            container.retention.start()
+        # Start scan workers with the patterns compiled before traffic arrives
+        container.registry.warm_up()
         yield
-        await close_db(container.engine)
+        if container.retention is not None:
+            await container.retention.close()
+        # Write out queued audit events
+        await container.audit_repo.close()
+        container.close()
+        for engine in (container.read_engine, container.engine):
+            if engine is not None:
+                await close_db(engine)
 
     app = FastAPI(
         title="ClawGuard",
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import shutil
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -33,10 +34,89 @@ class Settings(BaseSettings):
 
     database_url: str = f"sqlite+aiosqlite:///{_DATA_DIR / 'clawwall.db'}"
 
+    # SQLite profile, applied to every connection: WAL lets reads run
+    # alongside the writer and commits skip the fsync of the main file;
+    # cache_size is in pages, or KiB when negative; busy_timeout in ms.
+    # auto_vacuum takes effect on new databases, or existing ones after a
+    # VACUUM (clawguard retention --vacuum)
+    sqlite_auto_vacuum: Literal["NONE", "FULL", "INCREMENTAL"] = "INCREMENTAL"
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_mmap_size: int = 268_435_456
+    sqlite_cache_size: int = -65_536
+    sqlite_busy_timeout: int = 5_000
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+
+    # Connections to a SQLite file: for audit writes, and read-only ones for
+    # the dashboard and /audit
+    db_write_pool_size: int = 1
+    db_read_pool_size: int = 4
+
     policy_path: str = str(_DATA_DIR / "policy.yaml")
 
     log_level: str = "INFO"
 
+    # Server processes; with more than one, a supervisor runs them alongside
+    # a single audit writer process
+    workers: int = 1
+
+    # Node number in scan IDs (0-63); processes writing to one database need
+    # distinct ones, and multi-worker mode uses node_id to node_id + workers
+    node_id: int = 0
+
+    # Threads that run scans off the event loop (0 scans on the loop)
+    scan_threads: int = 4
+
+    # Content of at least this many characters is scanned on a process pool,
+    # in chunks with several workers (0 disables); workers defaults to the
+    # CPU count
+    parallel_scan_threshold: int = 1_000_000
+    parallel_scan_workers: int = 0
+
+    # Characters /scan/stream buffers at most while scanning a request body
+    scan_stream_window: int = 1_048_576
+
+    # Scan results cached by content hash (0 entries disables) and their lifetime in seconds
+    scan_cache_size: int = 1024
+    scan_cache_ttl: float = 300.0
+
+    # Content of at least this many characters reuses the matches of chunks
+    # seen in earlier payloads (0 disables); chunks cached at most
+    incremental_scan_threshold: int = 65_536
+    chunk_cache_size: int = 4096
+
+    # Audit events queued for writing at most (0 writes them in the request);
+    # events written per transaction, and seconds a batch waits to fill
+    audit_queue_size: int = 10_000
+    audit_batch_size: int = 500
+    audit_flush_interval: float = 0.05
+
+    # Directory of the journal that takes audit events while the database
+    # fails or stalls ("" disables), and seconds a write may take before its
+    # batch goes to the journal
+    audit_journal_path: str = str(_DATA_DIR / "audit-journal")
+    audit_spill_after: float = 2.0
+
+    # Directory of the segment-log audit backend, which appends audit events
+    # to files instead of writing them to the database ("" keeps them in the
+    # database), and the size in bytes past which a segment file is closed.
+    # With it no database is opened.  It serves a single process (workers = 1)
+    audit_log_path: str = ""
+    audit_log_segment_size: int = 67_108_864
+
+    # Audit retention: scan events and their findings are deleted after
+    # audit_retention_days, allowed scans without findings after
+    # audit_allow_retention_hours, and minute stats rollups after
+    # rollup_minute_retention_days (0 keeps them); hour and all-time rollups
+    # are kept.  The job runs every retention_interval seconds (0 disables
+    # it), deleting retention_batch_size events per transaction
+    audit_retention_days: int = 0
+    audit_allow_retention_hours: int = 0
+    rollup_minute_retention_days: int = 0
+    retention_interval: float = 3600.0
+    retention_batch_size: int = 5_000
+    retention_batch_pause: float = 0.05
+
     model_config = {"env_prefix": "CLAWGUARD_"}
 
 
@@ -1,35 +1,141 @@
 from __future__ import annotations
 
+import datetime
+from collections.abc import AsyncGenerator, Iterable, Sequence
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, false, func, insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
-from clawguard.db.models import FindingRecord, ScanEvent
-from clawguard.db.repository import AuditRepository
+from clawguard.db.dictionaries import Dictionary
+from clawguard.db.models import ACTIONS, Agent, Destination, FindingRecord, FindingType, ScanEvent, StatsRollup
+from clawguard.db.repository import AuditRepository, decode_cursor, utc_naive
+from clawguard.db.rollups import (
+    ALL_TIME,
+    BUCKET_GRANULARITIES,
+    BUCKETS,
+    DEFAULT_SPANS,
+    FINDING_DIMENSIONS,
+    bucket_range,
+    rollup_rows,
+    rollup_upsert,
+    timeseries,
+)
+from clawguard.scanners.base import SEVERITIES, FindingBatch
 
 
 class SQLAlchemyAuditRepository(AuditRepository):
-    """SQLAlchemy implementation of the audit repository."""
+    """SQLAlchemy implementation of the audit repository.
 
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+    Queries run on *read_session_factory* when given, e.g. read-only
+    connections separate from the writer's.  Events are stored in the
+    compact schema of :mod:`clawguard.db.models` and read back as the same
+    dicts they were logged as.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        read_session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
         self._session_factory = session_factory
+        self._read_session_factory = read_session_factory or session_factory
+        self._agents = Dictionary(Agent, "name")
+        self._destinations = Dictionary(Destination, "name")
+        self._finding_types = Dictionary(FindingType, "scanner_type", "name")
 
     async def log_scan(self, event_data: dict[str, Any]) -> int:
-        findings_data = event_data.pop("findings", [])
+        return (await self.log_scans([event_data]))[0]
+
+    async def log_scans(self, events: list[dict[str, Any]]) -> list[int]:
+        batch = []
+        timestamp = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        for event_data in events:
+            findings_data = event_data.pop("findings", [])
+            snippets = event_data.pop("redacted_snippets", None)
+            event_data.setdefault("timestamp", timestamp)
+            batch.append((event_data, findings_data, snippets))
+        if not batch:
+            return []
 
         async with self._session_factory() as session:
-            event = ScanEvent(**event_data)
-            session.add(event)
-            await session.flush()  # get event.id
+            scan_events = [ScanEvent(**row) for row in await self._event_rows(session, [e for e, _, _ in batch])]
+            session.add_all(scan_events)
+            await session.flush()  # get event ids
+
+            finding_rows = [
+                _finding_rows(event.id, findings, snippets)
+                for event, (_, findings, snippets) in zip(scan_events, batch)
+            ]
+            await self._insert_findings(session, [row for event_rows in finding_rows for row in event_rows])
+            await self._add_to_rollups(session, [
+                {**event_data, "findings": event_rows}
+                for (event_data, _, _), event_rows in zip(batch, finding_rows)
+            ])
 
-            for fd in findings_data:
-                fd["scan_event_id"] = event.id
-                session.add(FindingRecord(**fd))
+            await session.commit()
+            return [event.id for event in scan_events]
+
+    async def write_events(self, events: list[dict[str, Any]], skip_existing: bool = False) -> int:
+        """Insert events that carry their ``id``, with ``findings`` as finding
+        rows (see :func:`_finding_rows`), using one bulk insert per table in
+        one transaction.
 
+        With *skip_existing*, events whose ID is already taken are left out
+        (with their findings).  Returns the number of events inserted.
+        """
+        async with self._session_factory() as session:
+            if skip_existing:
+                existing = set((await session.execute(
+                    select(ScanEvent.id).where(ScanEvent.id.in_([event["id"] for event in events]))
+                )).scalars())
+                events = [event for event in events if event["id"] not in existing]
+                if not events:
+                    return 0
+            await session.execute(insert(ScanEvent), await self._event_rows(session, events))
+            await self._insert_findings(session, [row for event in events for row in event["findings"]])
+            await self._add_to_rollups(session, events)
             await session.commit()
-            return event.id
+            return len(events)
+
+    async def _event_rows(self, session: AsyncSession, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Column values of *events*, with agents and destinations by their dictionary IDs."""
+        agents = await self._agents.ids(session, {event.get("agent_id") for event in events})
+        destinations = await self._destinations.ids(session, {event.get("destination") for event in events})
+        return [
+            {
+                **{key: value for key, value in event.items() if key not in _NOT_COLUMNS},
+                "agent_ref": agents.get(event.get("agent_id")),
+                "destination_ref": destinations.get(event.get("destination")),
+            }
+            for event in events
+        ]
+
+    async def _insert_findings(self, session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+        """Insert finding rows (see :func:`_finding_rows`), with their finding type by dictionary ID."""
+        if not rows:
+            return
+        kinds = await self._finding_types.ids(session, {(row["scanner_type"], row["finding_type"]) for row in rows})
+        await session.execute(insert(FindingRecord), [
+            {
+                **{key: value for key, value in row.items() if key not in ("scanner_type", "finding_type")},
+                "finding_type_ref": kinds[row["scanner_type"], row["finding_type"]],
+            }
+            for row in rows
+        ])
+
+    async def _to_dicts(self, session: AsyncSession, events: Sequence[ScanEvent]) -> list[dict[str, Any]]:
+        """*events* as dicts, with their agent, destination and finding type names."""
+        agents = await self._agents.keys(session, {event.agent_ref for event in events})
+        destinations = await self._destinations.keys(session, {event.destination_ref for event in events})
+        kinds = await self._finding_types.keys(
+            session, {finding.finding_type_ref for event in events for finding in event.findings},
+        )
+        return [_event_to_dict(event, agents, destinations, kinds) for event in events]
+
+    async def _add_to_rollups(self, session: AsyncSession, events: list[dict[str, Any]]) -> None:
+        await session.execute(rollup_upsert(session.get_bind().dialect.name), rollup_rows(events))
 
     async def query_events(
         self,
@@ -38,29 +144,73 @@ class SQLAlchemyAuditRepository(AuditRepository):
         action: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
     ) -> list[dict[str, Any]]:
-        async with self._session_factory() as session:
+        after = decode_cursor(cursor) if cursor else None
+        async with self._read_session_factory() as session:
             stmt = (
                 select(ScanEvent)
                 .options(selectinload(ScanEvent.findings))
-                .order_by(ScanEvent.timestamp.desc())
+                .order_by(ScanEvent.timestamp.desc(), ScanEvent.id.desc())
             )
 
-            if agent_id:
-                stmt = stmt.where(ScanEvent.agent_id == agent_id)
-            if destination:
-                stmt = stmt.where(ScanEvent.destination == destination)
-            if action:
-                stmt = stmt.where(ScanEvent.action == action)
+            stmt = _filter(stmt, agent_id, destination, action, since, until)
+            if after:
+                stmt = stmt.where(tuple_(ScanEvent.timestamp, ScanEvent.id) < after)
 
             stmt = stmt.offset(offset).limit(limit)
             result = await session.execute(stmt)
             events = result.scalars().all()
 
-            return [_event_to_dict(e) for e in events]
+            return await self._to_dicts(session, events)
+
+    async def export_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        async with self._read_session_factory() as session:
+            stmt = (
+                select(*_EVENT_COLUMNS)
+                .order_by(ScanEvent.timestamp, ScanEvent.id)
+                .execution_options(yield_per=batch_size)
+            )
+            stmt = _filter(stmt, agent_id, destination, action, since, until)
+
+            # Plain rows from a server-side cursor, a batch at a time; each
+            # batch loads its findings with one query by key
+            conn = await session.connection()
+            result = await conn.stream(stmt)
+            async for rows in result.partitions():
+                events = [dict(zip(_EVENT_KEYS, row)) for row in rows]
+                agents = await self._agents.keys(session, {event["agent_id"] for event in events})
+                destinations = await self._destinations.keys(session, {event["destination"] for event in events})
+                by_id: dict[int, list[dict[str, Any]]] = {}
+                for event in events:
+                    timestamp = event["timestamp"]
+                    event["timestamp"] = timestamp.isoformat() if timestamp else None
+                    event["agent_id"] = agents.get(event["agent_id"])
+                    event["destination"] = destinations.get(event["destination"])
+                    event["findings"] = by_id[event["id"]] = []
+                if any(event["findings_count"] for event in events):
+                    finding_rows = (await conn.execute(
+                        select(FindingRecord.scan_event_id, *_FINDING_COLUMNS)
+                        .where(FindingRecord.scan_event_id.in_(list(by_id)))
+                        .order_by(FindingRecord.id)
+                    )).all()
+                    kinds = await self._finding_types.keys(session, {row[2] for row in finding_rows})
+                    for scan_event_id, finding_id, kind, *columns in finding_rows:
+                        by_id[scan_event_id].append(dict(zip(_FINDING_KEYS, (finding_id, *kinds[kind], *columns))))
+                yield events
 
     async def get_event(self, event_id: int) -> dict[str, Any] | None:
-        async with self._session_factory() as session:
+        async with self._read_session_factory() as session:
             stmt = (
                 select(ScanEvent)
                 .options(selectinload(ScanEvent.findings))
@@ -70,53 +220,39 @@ class SQLAlchemyAuditRepository(AuditRepository):
             event = result.scalar_one_or_none()
             if event is None:
                 return None
-            return _event_to_dict(event)
+            return (await self._to_dicts(session, [event]))[0]
 
     async def get_stats(self) -> dict[str, Any]:
-        async with self._session_factory() as session:
-            # Total scans
-            total_result = await session.execute(
-                select(func.count()).select_from(ScanEvent)
+        async with self._read_session_factory() as session:
+            # All-time totals, from the rollups
+            result = await session.execute(
+                select(StatsRollup.dimension, StatsRollup.value, StatsRollup.count)
+                .where(StatsRollup.granularity == "all", StatsRollup.bucket == ALL_TIME)
+                .where(StatsRollup.dimension.in_(("total", "action", "severity", "finding_type")))
             )
-            total_scans = total_result.scalar() or 0
+            counts: dict[str, list[tuple[str, int]]] = {}
+            for dimension, value, count in result.all():
+                counts.setdefault(dimension, []).append((value, count))
 
-            # Action counts
-            action_result = await session.execute(
-                select(ScanEvent.action, func.count())
-                .group_by(ScanEvent.action)
-            )
+            total_scans = sum(count for _, count in counts.get("total", []))
             action_counts = [
-                {"action": row[0], "count": row[1]}
-                for row in action_result.all()
+                {"action": action, "count": count}
+                for action, count in counts.get("action", [])
             ]
-
-            # Severity counts (from findings)
-            severity_result = await session.execute(
-                select(FindingRecord.severity, func.count())
-                .group_by(FindingRecord.severity)
-            )
             severity_counts = [
-                {"severity": row[0], "count": row[1]}
-                for row in severity_result.all()
+                {"severity": severity, "count": count}
+                for severity, count in counts.get("severity", [])
             ]
-
-            # Top finding types
-            finding_type_result = await session.execute(
-                select(FindingRecord.finding_type, func.count())
-                .group_by(FindingRecord.finding_type)
-                .order_by(func.count().desc())
-                .limit(10)
-            )
             top_finding_types = [
-                {"finding_type": row[0], "count": row[1]}
-                for row in finding_type_result.all()
+                {"finding_type": finding_type, "count": count}
+                for finding_type, count in sorted(counts.get("finding_type", []), key=lambda fc: -fc[1])[:10]
             ]
 
             # Recent 5 scans
             recent_stmt = (
                 select(ScanEvent)
                 .options(selectinload(ScanEvent.findings))
-                .order_by(ScanEvent.timestamp.desc())
+                .order_by(ScanEvent.timestamp.desc(), ScanEvent.id.desc())
                 .limit(5)
             )
             recent_result = await session.execute(recent_stmt)
@@ -127,16 +263,132 @@ class SQLAlchemyAuditRepository(AuditRepository):
                 "action_counts": action_counts,
                 "severity_counts": severity_counts,
                 "top_finding_types": top_finding_types,
-                "recent_scans": [_event_to_dict(e) for e in recent_events],
+                "recent_scans": await self._to_dicts(session, recent_events),
             }
 
+    async def get_timeseries(
+        self,
+        metric: str = "scans",
+        group_by: str | None = None,
+        bucket: str = "hour",
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        if group_by in FINDING_DIMENSIONS and metric != "findings":
+            raise ValueError(f"Only findings are counted by {group_by}")
+        until = utc_naive(until) if until else datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        since = utc_naive(since) if since else until - DEFAULT_SPANS[bucket]
+        starts = bucket_range(bucket, since, until)
+        series: list[dict[str, Any]] = []
+        if starts:
+            # Finding dimensions count findings in the count column
+            findings = StatsRollup.count if group_by in FINDING_DIMENSIONS else StatsRollup.findings
+            async with self._read_session_factory() as session:
+                result = await session.execute(
+                    select(
+                        StatsRollup.bucket, StatsRollup.value, StatsRollup.count, findings,
+                        StatsRollup.blocked, StatsRollup.duration_ms,
+                    )
+                    .where(StatsRollup.granularity == BUCKET_GRANULARITIES[bucket])
+                    .where(StatsRollup.dimension == (group_by or "total"))
+                    .where(StatsRollup.bucket >= starts[0], StatsRollup.bucket < starts[-1] + BUCKETS[bucket])
+                )
+                series = timeseries(result.all(), metric, bucket, starts, limit)
+        return {
+            "metric": metric,
+            "group_by": group_by,
+            "bucket": bucket,
+            "timestamps": [start.isoformat() for start in starts],
+            "series": series,
+        }
+
+
+def _finding_rows(
+    event_id: int,
+    findings: Iterable[dict[str, Any]] | FindingBatch,
+    snippets: Sequence[str | None] | None,
+) -> list[dict[str, Any]]:
+    """Insert parameters for a scan's findings, read column-wise from a batch."""
+    if not isinstance(findings, FindingBatch):
+        return [{**fd, "scan_event_id": event_id} for fd in findings]
+    kinds = [(k.scanner_type.value, k.finding_type) for k in findings.kinds]
+    severities = [sev.value for sev in SEVERITIES]
+    if snippets is None:
+        snippets = [None] * len(findings)
+    return [
+        {
+            "scan_event_id": event_id,
+            "scanner_type": kinds[kind_id][0],
+            "finding_type": kinds[kind_id][1],
+            "severity": severities[code],
+            "start_offset": start,
+            "end_offset": end,
+            "redacted_snippet": snippet,
+        }
+        for kind_id, code, start, end, snippet in zip(
+            findings.kind_ids, findings.severity_codes, findings.starts, findings.ends, snippets
+        )
+    ]
+
+
+def _filter(
+    stmt: Select[Any],
+    agent_id: str | None,
+    destination: str | None,
+    action: str | None,
+    since: datetime.datetime | None,
+    until: datetime.datetime | None,
+) -> Select[Any]:
+    """*stmt* limited to the events matching the ``/audit`` filters."""
+    # Names are looked up once, and the events by their dictionary ID
+    if agent_id:
+        stmt = stmt.where(ScanEvent.agent_ref == select(Agent.id).where(Agent.name == agent_id).scalar_subquery())
+    if destination:
+        stmt = stmt.where(ScanEvent.destination_ref == (
+            select(Destination.id).where(Destination.name == destination).scalar_subquery()
+        ))
+    if action:
+        # Actions outside the vocabulary have no code, nor events
+        stmt = stmt.where(ScanEvent.action == action if action in ACTIONS else false())
+    if since:
+        stmt = stmt.where(ScanEvent.timestamp >= utc_naive(since))
+    if until:
+        stmt = stmt.where(ScanEvent.timestamp < utc_naive(until))
+    return stmt
+
+
+# Keys of the event and finding dicts, in the order _event_to_dict gives
+# them, and the columns they are read from (dictionary IDs for names)
+_EVENT_KEYS = (
+    "id", "timestamp", "agent_id", "destination", "content_hash", "action", "findings_count", "duration_ms",
+)
+_EVENT_COLUMNS = (
+    ScanEvent.id, ScanEvent.timestamp, ScanEvent.agent_ref, ScanEvent.destination_ref, ScanEvent.content_hash,
+    ScanEvent.action, ScanEvent.findings_count, ScanEvent.duration_ms,
+)
+_FINDING_KEYS = (
+    "id", "scanner_type", "finding_type", "severity", "start_offset", "end_offset", "redacted_snippet",
+)
+_FINDING_COLUMNS = (
+    FindingRecord.id, FindingRecord.finding_type_ref, FindingRecord.severity,
+    FindingRecord.start_offset, FindingRecord.end_offset, FindingRecord.redacted_snippet,
+)
+# Event keys stored other than as a column of their own
+_NOT_COLUMNS = ("agent_id", "destination", "findings")
+
 
-def _event_to_dict(event: ScanEvent) -> dict[str, Any]:
+def _event_to_dict(
+    event: ScanEvent,
+    agents: dict[int, Any],
+    destinations: dict[int, Any],
+    kinds: dict[int, Any],
+) -> dict[str, Any]:
     return {
         "id": event.id,
         "timestamp": event.timestamp.isoformat() if event.timestamp else None,
-        "agent_id": event.agent_id,
-        "destination": event.destination,
+        "agent_id": agents.get(event.agent_ref),
+        "destination": destinations.get(event.destination_ref),
         "content_hash": event.content_hash,
         "action": event.action,
         "findings_count": event.findings_count,
@@ -144,8 +396,8 @@ def _event_to_dict(event: ScanEvent) -> dict[str, Any]:
         "findings": [
             {
                 "id": f.id,
-                "scanner_type": f.scanner_type,
-                "finding_type": f.finding_type,
+                "scanner_type": kinds[f.finding_type_ref][0],
+                "finding_type": kinds[f.finding_type_ref][1],
                 "severity": f.severity,
                 "start_offset": f.start_offset,
                 "end_offset": f.end_offset,
@@ -0,0 +1,332 @@
+"""One audit writer process for several server processes.
+
+With ``workers > 1`` (see :mod:`clawguard.supervisor`), SQLite would make
+the server processes contend for its write lock.  Instead a single
+:class:`AuditWriter` process owns the database writes: each server process
+holds one end of a pipe to it and logs scans through an
+:class:`AuditWriterClient`, which sends the events and waits for their IDs
+while reading the database directly.  The writer queues the events for
+writing in batches (see :mod:`clawguard.db.write_behind`) and answers as
+soon as they are queued; before reading, a client asks the writer to flush.
+The retention job (see :mod:`clawguard.db.retention`) runs in the writer too.
+
+A server process that exits is replaced with a fresh pipe:
+:func:`send_connection` hands the writer's end of it over the *control*
+connection, and the writer stops reading the old pipe, whose answers and
+half-sent requests die with it.  A client gives up on a request the writer
+has not answered within ``timeout`` seconds.
+
+The writer also relays policy changes: a client's :meth:`~AuditWriterClient.broadcast_policy`
+makes every other server process reload the policy file.
+
+Messages are tuples: ``("log", request_id, events)`` and
+``("flush", request_id, None)`` are answered by ``("done", request_id,
+event IDs or None)`` or ``("failed", request_id, error)``, and
+``("policy",)`` is relayed as ``("reload_policy",)``.  On the control
+connection, ``("replace", index)`` is followed by the file descriptor of the
+new connection to server *index*.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import signal
+from collections.abc import AsyncGenerator, Callable
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import recv_handle, send_handle
+from multiprocessing.synchronize import Event
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from clawguard.config import Settings
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository, _finding_rows
+from clawguard.db.repository import AuditRepository
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db, sqlite_pragmas
+from clawguard.db.write_behind import WriteBehindAuditRepository
+from clawguard.dependencies import create_audit_queue, create_retention_job
+from clawguard.utils.ids import ScanIdGenerator
+
+# Seconds a client waits for the writer to answer a request
+REQUEST_TIMEOUT = 60.0
+
+
+class AuditWriter:
+    """Writes the audit events sent over *connections* to the database of
+    *settings*, taking replacements for them over *control*."""
+
+    def __init__(self, settings: Settings, connections: list[Connection], control: Connection | None = None) -> None:
+        self.settings = settings
+        self.connections = connections
+        self.control = control
+        self._repo: AuditRepository | None = None
+        self._queue: WriteBehindAuditRepository | None = None
+        self._requests: set[asyncio.Task[None]] = set()
+        self._stopped = asyncio.Event()
+
+    async def serve(self, ready: Event | None = None) -> None:
+        """Create the tables, set *ready* and write events until :meth:`stop`."""
+        settings = self.settings
+        engine = get_engine(settings.database_url, sqlite_pragmas(settings), settings.db_write_pool_size)
+        await init_db(engine)
+        repo = SQLAlchemyAuditRepository(get_session_factory(engine))
+        self._queue = create_audit_queue(settings, repo, ScanIdGenerator(settings.node_id))
+        self._repo = self._queue or repo
+        if self._queue is not None:
+            self._queue.start()
+        retention = create_retention_job(settings, engine)
+        if retention is not None:
+            retention.start()
+
+        loop = asyncio.get_running_loop()
+        for conn in self.connections:
+            loop.add_reader(conn.fileno(), self._receive, conn)
+        if self.control is not None:
+            loop.add_reader(self.control.fileno(), self._replace)
+        if ready is not None:
+            ready.set()
+        await self._stopped.wait()
+
+        # Write what was sent before the stop
+        if self.control is not None:
+            loop.remove_reader(self.control.fileno())
+        for conn in self.connections:
+            loop.remove_reader(conn.fileno())
+            self._receive(conn)
+        while self._requests:
+            await asyncio.gather(*self._requests)
+        if retention is not None:
+            await retention.close()
+        await self._repo.close()
+        await close_db(engine)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _receive(self, conn: Connection) -> None:
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message[0] in ("log", "flush"):
+                    task = asyncio.create_task(self._answer(conn, *message))
+                    self._requests.add(task)
+                    task.add_done_callback(self._requests.discard)
+                elif message[0] == "policy":
+                    for other in self.connections:
+                        if other is not conn:
+                            _send(other, ("reload_policy",))
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+
+    def _replace(self) -> None:
+        assert self.control is not None
+        loop = asyncio.get_running_loop()
+        try:
+            while self.control.poll():
+                _, index = self.control.recv()
+                conn = Connection(recv_handle(self.control))
+                old, self.connections[index] = self.connections[index], conn
+                # Whatever is left on the old pipe belongs to the dead process
+                loop.remove_reader(old.fileno())
+                old.close()
+                loop.add_reader(conn.fileno(), self._receive, conn)
+        except (EOFError, OSError):
+            loop.remove_reader(self.control.fileno())
+
+    async def _answer(self, conn: Connection, kind: str, request_id: int, events: Any) -> None:
+        assert self._repo is not None
+        try:
+            if kind == "log":
+                result = await self._repo.log_scans(events)
+            else:
+                result = None
+                if self._queue is not None:
+                    await self._queue.flush()
+        except Exception as exc:
+            _send(conn, ("failed", request_id, repr(exc)))
+        else:
+            _send(conn, ("done", request_id, result))
+
+
+def _send(conn: Connection, message: tuple[Any, ...]) -> None:
+    try:
+        conn.send(message)
+    except OSError:
+        # The connection was replaced, its server process is gone
+        pass
+
+
+def send_connection(control: Connection, index: int, connection: Connection) -> None:
+    """Make the writer at the other end of *control* talk to server *index*
+    over *connection* instead of the connection it had."""
+    control.send(("replace", index))
+    send_handle(control, connection.fileno(), 0)
+
+
+def run_audit_writer(
+    settings: Settings, connections: list[Connection], ready: Event, control: Connection | None = None,
+) -> None:
+    """Process target: serve until SIGTERM.
+
+    SIGINT is ignored so that a Ctrl-C reaching the whole process group
+    leaves the writer running until the server processes have stopped.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    async def main() -> None:
+        writer = AuditWriter(settings, connections, control)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, writer.stop)
+        await writer.serve(ready)
+
+    asyncio.run(main())
+
+
+class AuditWriterClient(SQLAlchemyAuditRepository):
+    """Audit repository of a server process: reads the database through
+    *session_factory* and sends writes to the writer over *connection*.
+
+    *on_reload* is called when another process changed the policy.  A
+    request the writer has not answered within *timeout* seconds fails.  Call
+    :meth:`start` on the event loop before use and :meth:`close` after.
+    Reads first wait until the writer has written every event it queued.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        connection: Connection,
+        on_reload: Callable[[], None],
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        super().__init__(session_factory)
+        self._connection = connection
+        self._on_reload = on_reload
+        self.timeout = timeout
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._ids = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._connection.fileno(), self._receive)
+
+    async def close(self) -> None:
+        if self._loop is not None:
+            self._loop.remove_reader(self._connection.fileno())
+            self._loop = None
+        self._fail("audit writer client closed")
+
+    async def log_scan(self, event_data: dict[str, Any]) -> int:
+        return (await self.log_scans([event_data]))[0]
+
+    async def log_scans(self, events: list[dict[str, Any]]) -> list[int]:
+        if not events:
+            return []
+        return await self._request("log", [_portable(event) for event in events])
+
+    async def query_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        await self._request("flush", None)
+        return await super().query_events(
+            agent_id, destination, action, limit, offset, cursor, since, until,
+        )
+
+    async def export_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        await self._request("flush", None)
+        async for events in super().export_events(agent_id, destination, action, since, until, batch_size):
+            yield events
+
+    async def get_event(self, event_id: int) -> dict[str, Any] | None:
+        await self._request("flush", None)
+        return await super().get_event(event_id)
+
+    async def get_stats(self) -> dict[str, Any]:
+        await self._request("flush", None)
+        return await super().get_stats()
+
+    async def get_timeseries(
+        self,
+        metric: str = "scans",
+        group_by: str | None = None,
+        bucket: str = "hour",
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        await self._request("flush", None)
+        return await super().get_timeseries(metric, group_by, bucket, since, until, limit)
+
+    def broadcast_policy(self) -> None:
+        """Make the other server processes reload the policy file."""
+        self._connection.send(("policy",))
+
+    async def _request(self, kind: str, payload: Any) -> Any:
+        if self._loop is None:
+            raise RuntimeError("audit writer client is not started")
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        self._connection.send((kind, request_id, payload))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"audit writer did not answer within {self.timeout}s") from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _receive(self) -> None:
+        try:
+            while self._connection.poll():
+                message = self._connection.recv()
+                if message[0] == "reload_policy":
+                    self._on_reload()
+                    continue
+                # Answers to requests given up on are dropped
+                future = self._pending.pop(message[1], None)
+                if future is None or future.done():
+                    continue
+                if message[0] == "done":
+                    future.set_result(message[2])
+                else:
+                    future.set_exception(RuntimeError(f"audit writer failed: {message[2]}"))
+        except (EOFError, OSError):
+            if self._loop is not None:
+                self._loop.remove_reader(self._connection.fileno())
+                self._loop = None
+            self._fail("audit writer is gone")
+
+    def _fail(self, reason: str) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+
+
+def _portable(event: dict[str, Any]) -> dict[str, Any]:
+    """*event* with its findings as plain dicts, without the scanned content."""
+    event = dict(event)
+    findings = event.pop("findings", [])
+    snippets = event.pop("redacted_snippets", None)
+    rows = _finding_rows(0, findings, snippets)
+    for row in rows:
+        del row["scan_event_id"]
+    event["findings"] = rows
+    return event
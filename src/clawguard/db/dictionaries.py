@@ -0,0 +1,111 @@
+"""Dictionary tables: names stored once and referenced by integer ID.
+
+Scan events refer to their agent and destination, and findings to their
+scanner and finding type, by the ID of a row in the ``agents``,
+``destinations`` or ``finding_types`` table (see
+:mod:`clawguard.db.models`).  A :class:`Dictionary` turns names into those
+IDs as events are written, adding the names not seen before, and back as
+they are read.  Rows are never deleted, so an ID keeps its name.
+"""
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Names cached per dictionary at most, before the cache starts over
+CACHE_SIZE = 100_000
+
+
+class Dictionary:
+    """The rows of *model*: IDs keyed by the value of *columns* (a tuple of
+    values with several columns), and back.
+
+    Rows already committed are cached both ways, so most writes and reads
+    look nothing up.
+    """
+
+    def __init__(self, model: Any, *columns: str) -> None:
+        self._model = model
+        self._names = columns
+        self._columns = [getattr(model, column) for column in columns]
+        self._ids: dict[Hashable, int] = {}
+        self._keys: dict[int, Hashable] = {}
+
+    async def ids(self, session: AsyncSession, keys: Iterable[Hashable]) -> dict[Hashable, int]:
+        """The IDs of *keys* (``None`` left out), adding the missing ones in
+        *session*'s transaction."""
+        ids: dict[Hashable, int] = {}
+        missing = set()
+        for key in keys:
+            if key is None:
+                continue
+            if key in self._ids:
+                ids[key] = self._ids[key]
+            else:
+                missing.add(key)
+        if not missing:
+            return ids
+
+        # Rows found before this transaction adds any are committed, and can
+        # be cached; those it adds go away if it rolls back
+        found = await self._select(session, missing)
+        self._remember(found)
+        ids.update(found)
+        if len(found) < len(missing):
+            new = missing - found.keys()
+            await session.execute(
+                _insert_ignore(session.get_bind().dialect.name, self._model),
+                [dict(zip(self._names, key if len(self._names) > 1 else (key,))) for key in new],
+            )
+            ids.update(await self._select(session, new))
+        return ids
+
+    async def keys(self, session: AsyncSession, ids: Iterable[int | None]) -> dict[int, Hashable]:
+        """The keys of the rows *ids* (``None`` left out), committed ones."""
+        keys: dict[int, Hashable] = {}
+        missing = set()
+        for row_id in ids:
+            if row_id is None:
+                continue
+            if row_id in self._keys:
+                keys[row_id] = self._keys[row_id]
+            else:
+                missing.add(row_id)
+        if missing:
+            result = await session.execute(select(*self._columns, self._model.id).where(self._model.id.in_(missing)))
+            found = {tuple(values) if len(values) > 1 else values[0]: row_id for *values, row_id in result}
+            self._remember(found)
+            keys.update({row_id: key for key, row_id in found.items()})
+        return keys
+
+    def _remember(self, found: dict[Hashable, int]) -> None:
+        if len(self._ids) + len(found) > CACHE_SIZE:
+            self._ids.clear()
+            self._keys.clear()
+        self._ids.update(found)
+        self._keys.update({row_id: key for key, row_id in found.items()})
+
+    async def _select(self, session: AsyncSession, keys: set[Hashable]) -> dict[Hashable, int]:
+        # The last column is the name; keys matching it on the others are picked here
+        names = {key[-1] if len(self._names) > 1 else key for key in keys}
+        result = await session.execute(
+            select(*self._columns, self._model.id).where(self._columns[-1].in_(names))
+        )
+        found = {}
+        for *values, row_id in result:
+            key = tuple(values) if len(values) > 1 else values[0]
+            if key in keys:
+                found[key] = row_id
+        return found
+
+
+def _insert_ignore(dialect_name: str, model: Any) -> Any:
+    """An insert of rows into *model*'s table that skips those already there."""
+    dialects = {"sqlite": sqlite, "postgresql": postgresql}
+    if dialect_name not in dialects:
+        raise NotImplementedError(f"Dictionary tables are not supported on {dialect_name}")
+    return dialects[dialect_name].insert(model).on_conflict_do_nothing()
@@ -0,0 +1,103 @@
+"""Durable on-disk journal of audit events the database could not take.
+
+The journal is a directory of append-only segments ``<n>.journal``.  Each
+record is a big-endian ``u32`` length and ``u32`` CRC-32 followed by the
+event as JSON, in the row form :meth:`SQLAlchemyAuditRepository.write_events`
+takes.  :meth:`AuditJournal.append` writes a batch of records and fsyncs
+once.  A record cut short by a crash fails its length or CRC check, and
+reading stops there.
+
+Segments are replayed whole: :meth:`AuditJournal.sealed` starts a new
+segment for later appends and lists the ones to replay, which are removed
+once their events are in the database.  Events are keyed by their scan ID,
+so replaying a segment again after a crash skips the ones already written.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import struct
+import threading
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+_HEADER = struct.Struct(">II")
+# Segments are closed for appends past this size
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+
+class AuditJournal:
+    """Journal of audit event rows in the directory *path*, created on first append."""
+
+    def __init__(self, path: str | Path, segment_size: int = SEGMENT_SIZE) -> None:
+        self.path = Path(path)
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._current: Path | None = None
+
+    def append(self, events: list[dict[str, Any]]) -> None:
+        """Write *events* durably: the call returns after one fsync."""
+        data = b"".join(_record(event) for event in events)
+        with self._lock:
+            segment = self._current
+            if segment is None or segment.stat().st_size >= self.segment_size:
+                segment = self._current = self._new_segment()
+            fd = os.open(segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def sealed(self) -> list[Path]:
+        """Segments to replay, oldest first; later appends go to a new segment."""
+        with self._lock:
+            self._current = None
+            return self._segments()
+
+    def read(self, segment: Path) -> Iterator[dict[str, Any]]:
+        """The events of *segment*, up to the first torn record."""
+        data = segment.read_bytes()
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, pos)
+            payload = data[pos + _HEADER.size:pos + _HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            yield _decode(payload)
+            pos += _HEADER.size + length
+
+    def remove(self, segment: Path) -> None:
+        segment.unlink(missing_ok=True)
+
+    def size(self) -> int:
+        """Bytes waiting to be replayed."""
+        with self._lock:
+            return sum(segment.stat().st_size for segment in self._segments())
+
+    def _segments(self) -> list[Path]:
+        if not self.path.is_dir():
+            return []
+        return sorted(self.path.glob("*.journal"), key=lambda p: int(p.stem))
+
+    def _new_segment(self) -> Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        number = int(segments[-1].stem) + 1 if segments else 1
+        return self.path / f"{number:08d}.journal"
+
+
+def _record(event: dict[str, Any]) -> bytes:
+    payload = json.dumps(
+        {**event, "timestamp": event["timestamp"].isoformat()}, separators=(",", ":")
+    ).encode("utf-8")
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode(payload: bytes) -> dict[str, Any]:
+    event = json.loads(payload)
+    event["timestamp"] = datetime.datetime.fromisoformat(event["timestamp"])
+    return event
@@ -0,0 +1,157 @@
+"""Schema migrations for databases created by earlier versions.
+
+``Base.metadata.create_all`` creates missing tables with everything the
+models declare, but leaves existing tables alone.  Changes to existing
+tables are steps in :data:`MIGRATIONS`, run in order by :func:`migrate`;
+the ``schema_version`` table records how many have run.  Each step also
+has to work on a database ``create_all`` just made, where it usually finds
+nothing to do.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from sqlalchemy import Column, Index, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+from clawguard.db.models import Agent, Destination, FindingRecord, FindingType, ScanEvent
+from clawguard.db.rollups import backfill_rollups
+
+_metadata = MetaData()
+schema_version = Table("schema_version", _metadata, Column("version", Integer, nullable=False))
+
+
+def _has_text_columns(conn: Connection) -> bool:
+    """Whether the audit tables are the ones from before the compact schema,
+    with agents, destinations, actions and finding types as text."""
+    return "agent_id" in {column["name"] for column in inspect(conn).get_columns(ScanEvent.__tablename__)}
+
+
+def _legacy_tables(conn: Connection, suffix: str = "") -> tuple[Table, Table]:
+    """The audit tables of *conn* from before the compact schema, as they are."""
+    metadata = MetaData()
+    return (
+        Table(ScanEvent.__tablename__ + suffix, metadata, autoload_with=conn),
+        Table(FindingRecord.__tablename__ + suffix, metadata, autoload_with=conn),
+    )
+
+
+def _add_audit_indexes(conn: Connection) -> None:
+    if _has_text_columns(conn):
+        # Tables from before the compact schema get the others when they are
+        # rebuilt; this one finds the findings of the events copied
+        findings = _legacy_tables(conn)[1]
+        Index("ix_findings_scan_event_id", findings.c.scan_event_id).create(conn, checkfirst=True)
+        return
+    for table in (ScanEvent.__table__, FindingRecord.__table__):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _backfill_rollups(conn: Connection) -> None:
+    # Databases created with the compact schema have had rollups from the start
+    if _has_text_columns(conn):
+        backfill_rollups(conn, *_legacy_tables(conn))
+
+
+def _compact_audit_tables(conn: Connection, chunk_size: int = 10_000) -> None:
+    """Rebuild the audit tables from before the compact schema: agents,
+    destinations and finding types move to the dictionary tables, content
+    hashes to bytes, timestamps to microseconds and actions, scanner types
+    and severities to codes.
+
+    The old tables are renamed aside and their rows copied, *chunk_size*
+    events at a time with the same IDs, before they are dropped.
+    """
+    if not _has_text_columns(conn):
+        return
+    for table in (ScanEvent.__table__, FindingRecord.__table__):
+        # Their indexes go first, so the new tables can take the names
+        for index in inspect(conn).get_indexes(table.name):
+            conn.execute(text(f"DROP INDEX {index['name']}"))
+        conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_legacy"))
+        # Indexed once filled, which is quicker than row by row
+        conn.execute(CreateTable(table))
+    events, findings = _legacy_tables(conn, "_legacy")
+
+    for model, column in ((Agent, events.c.agent_id), (Destination, events.c.destination)):
+        names = conn.execute(select(column).where(column.is_not(None)).distinct()).scalars().all()
+        if names:
+            conn.execute(model.__table__.insert(), [{"name": name} for name in names])
+    kinds = conn.execute(select(findings.c.scanner_type, findings.c.finding_type).distinct()).all()
+    if kinds:
+        conn.execute(FindingType.__table__.insert(), [
+            {"scanner_type": scanner_type, "name": finding_type} for scanner_type, finding_type in kinds
+        ])
+    agents = dict(conn.execute(select(Agent.name, Agent.id)).all())
+    destinations = dict(conn.execute(select(Destination.name, Destination.id)).all())
+    kind_ids = {
+        (scanner_type, name): kind_id
+        for scanner_type, name, kind_id in conn.execute(
+            select(FindingType.scanner_type, FindingType.name, FindingType.id)
+        )
+    }
+
+    last_id = None
+    while True:
+        query = select(events).order_by(events.c.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(events.c.id > last_id)
+        rows = [
+            {
+                "id": row.id, "timestamp": row.timestamp,
+                "agent_ref": agents.get(row.agent_id), "destination_ref": destinations.get(row.destination),
+                "content_hash": row.content_hash, "action": row.action,
+                "findings_count": row.findings_count, "duration_ms": row.duration_ms,
+            }
+            for row in conn.execute(query)
+        ]
+        if not rows:
+            break
+        first_id, last_id = rows[0]["id"], rows[-1]["id"]
+        conn.execute(ScanEvent.__table__.insert(), rows)
+        finding_rows = [
+            {
+                "id": row.id, "scan_event_id": row.scan_event_id,
+                "finding_type_ref": kind_ids[row.scanner_type, row.finding_type], "severity": row.severity,
+                "start_offset": row.start_offset, "end_offset": row.end_offset,
+                "redacted_snippet": row.redacted_snippet,
+            }
+            for row in conn.execute(select(findings).where(findings.c.scan_event_id.between(first_id, last_id)))
+        ]
+        if finding_rows:
+            conn.execute(FindingRecord.__table__.insert(), finding_rows)
+
+    findings.drop(conn)
+    events.drop(conn)
+    for table in (ScanEvent.__table__, FindingRecord.__table__):
+        for index in table.indexes:
+            index.create(conn)
+    if conn.dialect.name == "postgresql":
+        # The copied IDs went past the new tables' sequences
+        for table in (ScanEvent.__table__, FindingRecord.__table__):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), coalesce(max(id), 1)) FROM {table.name}"
+            ))
+
+
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    _add_audit_indexes,
+    _backfill_rollups,
+    _compact_audit_tables,
+]
+
+
+def migrate(conn: Connection) -> int:
+    """Run the migrations *conn*'s database has not had; return its version."""
+    schema_version.create(conn, checkfirst=True)
+    version = conn.execute(select(schema_version.c.version)).scalar()
+    if version is None:
+        conn.execute(schema_version.insert().values(version=0))
+        version = 0
+    for step in MIGRATIONS[version:]:
+        step(conn)
+    if version < len(MIGRATIONS):
+        conn.execute(schema_version.update().values(version=len(MIGRATIONS)))
+    return max(version, len(MIGRATIONS))
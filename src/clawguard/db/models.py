@@ -2,25 +2,149 @@ from __future__ import annotations
 
 import datetime
 
-from sqlalchemy import DateTime, Enum, Float, Integer, String, Text, func
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.engine import Dialect
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
+
+# The fixed vocabularies stored as small-int codes; the codes are stored,
+# so new values go last
+ACTIONS = ("ALLOW", "BLOCK", "REDACT", "PROMPT")
+SCANNER_TYPES = ("SECRET", "PII", "CUSTOM")
+SEVERITY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Scan IDs take 53 bits (see clawguard.utils.ids).  SQLite's INTEGER is
+# already 64-bit, and keeps the id the table's rowid
+_SCAN_ID = BigInteger().with_variant(Integer, "sqlite")
+
+
+class Code(TypeDecorator[str]):
+    """A value of the vocabulary *values*, stored as its position in it."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, values: tuple[str, ...]) -> None:
+        super().__init__()
+        self.values = values
+        self._codes = {value: code for code, value in enumerate(values)}
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> int | None:
+        if value is None:
+            return None
+        try:
+            return self._codes[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not one of {', '.join(self.values)}") from None
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> str | None:
+        return self.values[value] if value is not None else None
+
+
+class Microseconds(TypeDecorator[datetime.datetime]):
+    """A naive UTC datetime, stored as microseconds since 1970."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> int | None:
+        return (value - _EPOCH) // _MICROSECOND if value is not None else None
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> datetime.datetime | None:
+        return _EPOCH + datetime.timedelta(microseconds=value) if value is not None else None
+
+
+class Digest(TypeDecorator[str]):
+    """A SHA-256 hex digest, stored as its 32 bytes.
+
+    Other strings are stored as their UTF-8 bytes, so any of them but one
+    of 32 bytes reads back unchanged.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> bytes | None:
+        if value is None:
+            return None
+        if len(value) == 64:
+            try:
+                packed = bytes.fromhex(value)
+            except ValueError:
+                packed = b""
+            if packed.hex() == value:
+                return packed
+        return value.encode()
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> str | None:
+        if value is None:
+            return None
+        return value.hex() if len(value) == 32 else bytes(value).decode()
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# ── Dictionary tables ──
+# Agent IDs, destinations and finding types, stored once and referenced by
+# their integer ID; clawguard.db.dictionaries translates between the two
+
+
+class Agent(Base):
+    __tablename__ = "agents"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+
+
+class Destination(Base):
+    __tablename__ = "destinations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(1024), nullable=False, unique=True)
+
+
+class FindingType(Base):
+    __tablename__ = "finding_types"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scanner_type: Mapped[str] = mapped_column(Code(SCANNER_TYPES), nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    __table_args__ = (UniqueConstraint("scanner_type", "name", name="uq_finding_types_scanner_type_name"),)
+
+
+# ── Audit log ──
+
+
 class ScanEvent(Base):
     __tablename__ = "scan_events"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    timestamp: Mapped[datetime.datetime] = mapped_column(
-        DateTime, server_default=func.now(), nullable=False
-    )
-    agent_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    destination: Mapped[str | None] = mapped_column(String(1024), nullable=True)
-    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
-    action: Mapped[str] = mapped_column(String(10), nullable=False)
+    id: Mapped[int] = mapped_column(_SCAN_ID, primary_key=True, autoincrement=True)
+    timestamp: Mapped[datetime.datetime] = mapped_column(Microseconds, nullable=False)
+    agent_ref: Mapped[int | None] = mapped_column(Integer, ForeignKey("agents.id"), nullable=True)
+    destination_ref: Mapped[int | None] = mapped_column(Integer, ForeignKey("destinations.id"), nullable=True)
+    content_hash: Mapped[str] = mapped_column(Digest, nullable=False)
+    action: Mapped[str] = mapped_column(Code(ACTIONS), nullable=False)
     findings_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     duration_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
 
@@ -28,15 +152,24 @@ class ScanEvent(Base):
         "FindingRecord", back_populates="scan_event", cascade="all, delete-orphan"
     )
 
+    # Audit queries filter on one column and take the newest rows first; in
+    # SQLite every index also ends with the id, the tiebreak of equal times.
+    # Existing databases get these from clawguard.db.migrations
+    __table_args__ = (
+        Index("ix_scan_events_timestamp", "timestamp"),
+        Index("ix_scan_events_agent_ref_timestamp", "agent_ref", "timestamp"),
+        Index("ix_scan_events_destination_ref_timestamp", "destination_ref", "timestamp"),
+        Index("ix_scan_events_action_timestamp", "action", "timestamp"),
+    )
+
 
 class FindingRecord(Base):
     __tablename__ = "findings"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    scan_event_id: Mapped[int] = mapped_column(Integer, nullable=False)
-    scanner_type: Mapped[str] = mapped_column(String(20), nullable=False)
-    finding_type: Mapped[str] = mapped_column(String(100), nullable=False)
-    severity: Mapped[str] = mapped_column(String(10), nullable=False)
+    scan_event_id: Mapped[int] = mapped_column(_SCAN_ID, nullable=False)
+    finding_type_ref: Mapped[int] = mapped_column(Integer, ForeignKey("finding_types.id"), nullable=False)
+    severity: Mapped[str] = mapped_column(Code(SEVERITY_LEVELS), nullable=False)
     start_offset: Mapped[int] = mapped_column(Integer, nullable=False)
     end_offset: Mapped[int] = mapped_column(Integer, nullable=False)
     redacted_snippet: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -44,12 +177,36 @@ class FindingRecord(Base):
     scan_event: Mapped[ScanEvent] = relationship("ScanEvent", back_populates="findings")
 
     __table_args__ = (
+        # Loading an event's findings, and the severity and finding type
+        # counts of the dashboard, which read only these indexes
+        Index("ix_findings_scan_event_id", "scan_event_id"),
+        Index("ix_findings_severity", "severity"),
+        Index("ix_findings_finding_type_ref", "finding_type_ref"),
         # ForeignKey defined via string for clarity
         {"comment": "Individual findings from a scan event"},
     )
 
+class StatsRollup(Base):
+    """Counts of the audit events in one time bucket with one value of a dimension.
+
+    Maintained by clawguard.db.rollups as events are written.  For the
+    ``severity`` and ``finding_type`` dimensions ``count`` counts findings,
+    for the others scan events, which the remaining columns add up.
+    """
+
+    __tablename__ = "stats_rollups"
+
+    granularity: Mapped[str] = mapped_column(String(10), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(20), primary_key=True)
+    bucket: Mapped[datetime.datetime] = mapped_column(DateTime, primary_key=True)
+    value: Mapped[str] = mapped_column(String(1024), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    findings: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    blocked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
 # Manually add foreign key (avoids import-time issues with async engines)
-from sqlalchemy import ForeignKey  # noqa: E402
 FindingRecord.__table__.c.scan_event_id.append_foreign_key(
     ForeignKey("scan_events.id")
 )
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import base64
+import datetime
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator
 from typing import Any
 
 
@@ -9,9 +12,24 @@ class AuditRepository(ABC):
 
     @abstractmethod
     async def log_scan(self, event_data: dict[str, Any]) -> int:
-        """Persist a scan event and its findings. Returns the event ID."""
+        """Persist a scan event and its findings. Returns the event ID.
+
+        ``findings`` is a list of finding dicts, or a ``FindingBatch`` with
+        its snippets in ``redacted_snippets``.
+        """
         ...
 
+    async def log_scans(self, events: list[dict[str, Any]]) -> list[int]:
+        """Persist several scan events (as for :meth:`log_scan`). Returns their IDs in order.
+
+        Implementations should write them in one transaction; the default
+        logs them one by one.
+        """
+        return [await self.log_scan(event) for event in events]
+
+    async def close(self) -> None:
+        """Finish pending writes; the default has none."""
+
     @abstractmethod
     async def query_events(
         self,
@@ -20,8 +38,32 @@ class AuditRepository(ABC):
         action: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
     ) -> list[dict[str, Any]]:
-        """Query audit log with optional filters."""
+        """Query audit log with optional filters, newest first.
+
+        Events are ordered by timestamp, then ID.  *cursor* (from
+        :func:`encode_cursor`) continues after the event it was made from,
+        so pages stay put while events are added; *since* is inclusive and
+        *until* exclusive.  Raises ``ValueError`` for an invalid cursor.
+        """
+        ...
+
+    @abstractmethod
+    def export_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        """Every audit event matching the filters (as for :meth:`query_events`),
+        oldest first, in lists of up to *batch_size* as they are read, so the
+        log can be exported whole without holding it in memory."""
         ...
 
     @abstractmethod
@@ -33,3 +75,46 @@ class AuditRepository(ABC):
     async def get_stats(self) -> dict[str, Any]:
         """Get aggregated dashboard statistics."""
         ...
+
+    @abstractmethod
+    async def get_timeseries(
+        self,
+        metric: str = "scans",
+        group_by: str | None = None,
+        bucket: str = "hour",
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        """*metric* per *bucket* from *since* to *until* (the last
+        ``DEFAULT_SPANS[bucket]`` by default), one series per *group_by*
+        value (or a single total), as columns: bucket ``timestamps`` and
+        the ``values`` of each series.
+
+        Raises ``ValueError`` for a metric *group_by* does not have, or
+        too many buckets.
+        """
+        ...
+
+
+def encode_cursor(event: dict[str, Any]) -> str:
+    """An opaque cursor for the events after *event* (as returned by ``query_events``)."""
+    key = f"{event['timestamp']}/{event['id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """The timestamp and ID encoded in *cursor*; ``ValueError`` if it is not a cursor."""
+    try:
+        key = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, event_id = key.rsplit("/", 1)
+        return datetime.datetime.fromisoformat(timestamp), int(event_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
+def utc_naive(value: datetime.datetime) -> datetime.datetime:
+    """*value* as the naive UTC time audit timestamps are stored in."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
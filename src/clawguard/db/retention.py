@@ -0,0 +1,205 @@
+"""Audit log retention.
+
+:class:`RetentionJob` deletes scan events past their retention period
+(see the ``audit_retention_days``, ``audit_allow_retention_hours`` and
+``rollup_minute_retention_days`` settings) with their findings, oldest
+first and ``batch_size`` events per transaction, pausing between batches so
+audit writes waiting for the database get their turn.  The stats rollups
+already hold the counts of the deleted events, so dashboard totals and time
+series are unchanged.
+
+On SQLite, the pages freed are then returned to the file system a few at a
+time with ``PRAGMA incremental_vacuum`` and the WAL is checkpointed.  That
+needs ``auto_vacuum=INCREMENTAL``, which databases created before it get
+from a run with a full ``VACUUM``.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from sqlalchemy import and_, delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from clawguard.config import Settings
+from clawguard.db.models import FindingRecord, ScanEvent, StatsRollup
+
+# Pages released per incremental vacuum step (4 MiB with 4 KiB pages)
+VACUUM_STEP = 1024
+
+
+@dataclass(slots=True)
+class RetentionReport:
+    """What one retention run deleted and reclaimed."""
+
+    events_deleted: int = 0
+    findings_deleted: int = 0
+    rollups_deleted: int = 0
+    batches: int = 0
+    bytes_reclaimed: int = 0
+    free_bytes: int = 0
+    database_bytes: int = 0
+    duration_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class RetentionJob:
+    """Applies the retention settings of *settings* to the database of *engine*.
+
+    :meth:`start` runs it every ``retention_interval`` seconds in the
+    background; :meth:`run` runs it once.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        settings: Settings,
+        clock: Callable[[], datetime.datetime] | None = None,
+    ) -> None:
+        self.engine = engine
+        self.retention_days = settings.audit_retention_days
+        self.allow_retention_hours = settings.audit_allow_retention_hours
+        self.minute_rollup_days = settings.rollup_minute_retention_days
+        self.interval = settings.retention_interval
+        self.batch_size = settings.retention_batch_size
+        self.batch_pause = settings.retention_batch_pause
+        self._clock = clock or (lambda: datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None))
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+        self.runs = 0
+        self.failed_runs = 0
+        self.last_run: str | None = None
+        self.last_report: RetentionReport | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run(self, vacuum: bool = False) -> RetentionReport:
+        """Delete what is past retention and reclaim the space it took.
+
+        With *vacuum*, a SQLite database is rebuilt with ``VACUUM``, which
+        blocks writes while it copies the whole file.
+        """
+        async with self._lock:
+            start = time.perf_counter()
+            now = self._clock()
+            report = RetentionReport()
+            if self.retention_days > 0:
+                cutoff = now - datetime.timedelta(days=self.retention_days)
+                await self._delete_events(report, ScanEvent.timestamp < cutoff)
+            if self.allow_retention_hours > 0:
+                cutoff = now - datetime.timedelta(hours=self.allow_retention_hours)
+                await self._delete_events(report, and_(
+                    ScanEvent.action == "ALLOW", ScanEvent.timestamp < cutoff, ScanEvent.findings_count == 0,
+                ))
+            if self.minute_rollup_days > 0:
+                await self._delete_minute_rollups(report, now - datetime.timedelta(days=self.minute_rollup_days))
+            if self.engine.dialect.name == "sqlite":
+                await self._reclaim(report, vacuum)
+            report.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+
+            self.runs += 1
+            self.last_run = now.isoformat()
+            self.last_report = report
+            return report
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "last_run": self.last_run,
+            "last_report": self.last_report.to_dict() if self.last_report is not None else None,
+        }
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception:
+                # The database is busy or unavailable; the next run catches up
+                self.failed_runs += 1
+            await asyncio.sleep(self.interval)
+
+    async def _delete_events(self, report: RetentionReport, condition: Any) -> None:
+        while True:
+            async with self.engine.begin() as conn:
+                ids = list((await conn.execute(
+                    select(ScanEvent.id).where(condition).order_by(ScanEvent.timestamp).limit(self.batch_size)
+                )).scalars())
+                if not ids:
+                    return
+                findings = await conn.execute(delete(FindingRecord).where(FindingRecord.scan_event_id.in_(ids)))
+                events = await conn.execute(delete(ScanEvent).where(ScanEvent.id.in_(ids)))
+            report.findings_deleted += findings.rowcount
+            report.events_deleted += events.rowcount
+            report.batches += 1
+            await asyncio.sleep(self.batch_pause)
+
+    async def _delete_minute_rollups(self, report: RetentionReport, cutoff: datetime.datetime) -> None:
+        while True:
+            async with self.engine.begin() as conn:
+                # A batch is the rows of up to 60 minutes
+                buckets = list((await conn.execute(
+                    select(StatsRollup.bucket).distinct()
+                    .where(StatsRollup.granularity == "minute", StatsRollup.bucket < cutoff)
+                    .order_by(StatsRollup.bucket).limit(60)
+                )).scalars())
+                if not buckets:
+                    return
+                rollups = await conn.execute(
+                    delete(StatsRollup)
+                    .where(StatsRollup.granularity == "minute", StatsRollup.bucket.in_(buckets))
+                )
+            report.rollups_deleted += rollups.rowcount
+            report.batches += 1
+            await asyncio.sleep(self.batch_pause)
+
+    async def _reclaim(self, report: RetentionReport, vacuum: bool) -> None:
+        page_size = await self._sqlite("PRAGMA page_size")
+        pages = await self._sqlite("PRAGMA page_count")
+        if vacuum:
+            await self._sqlite("VACUUM")
+        elif await self._sqlite("PRAGMA auto_vacuum") == 2:  # INCREMENTAL
+            free = await self._sqlite("PRAGMA freelist_count")
+            while free:
+                await self._incremental_vacuum(VACUUM_STEP)
+                await asyncio.sleep(self.batch_pause)
+                before, free = free, await self._sqlite("PRAGMA freelist_count")
+                if free >= before:
+                    break
+        # Shrink the WAL the pages went through, unless a reader holds it
+        await self._sqlite("PRAGMA wal_checkpoint(TRUNCATE)")
+        report.database_bytes = await self._sqlite("PRAGMA page_count") * page_size
+        report.bytes_reclaimed = pages * page_size - report.database_bytes
+        report.free_bytes = await self._sqlite("PRAGMA freelist_count") * page_size
+
+    async def _sqlite(self, statement: str) -> int:
+        """Run *statement* outside a transaction on a connection held just for
+        it, so audit writes get the connection in between; returns the first
+        value it gives."""
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            result = await conn.exec_driver_sql(statement)
+            return (result.scalar() if result.returns_rows else None) or 0
+
+    async def _incremental_vacuum(self, pages: int) -> None:
+        # The pragma frees one page per step of its statement, which has no
+        # result columns for the DB-API to fetch; a script runs it to the end
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.executescript(f"PRAGMA incremental_vacuum({pages})")
@@ -0,0 +1,231 @@
+"""Stats rollups: audit counts pre-aggregated per time bucket.
+
+Every audit write adds its events to rows of the ``stats_rollups`` table
+(:class:`~clawguard.db.models.StatsRollup`), one per granularity, time
+bucket, dimension and value, in the same transaction.  Dashboard stats then
+read a few rows instead of grouping the whole history:
+
+* granularities are ``minute`` and ``hour`` buckets, and ``all`` with the
+  single bucket :data:`ALL_TIME`;
+* dimensions are ``total`` (with the value ``""``), ``action``, ``agent``
+  and ``destination`` (``""`` when unset), which count scan events, and
+  ``severity`` and ``finding_type``, which count findings.
+
+Time series (:func:`timeseries`) are read from the minute or hour rows,
+days being summed from hours.
+"""
+from __future__ import annotations
+
+import datetime
+import math
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import Table, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.dml import Insert
+
+from clawguard.db.models import StatsRollup
+
+ALL_TIME = datetime.datetime(1970, 1, 1)
+GRANULARITIES = ("minute", "hour", "all")
+EVENT_DIMENSIONS = ("total", "action", "agent", "destination")
+FINDING_DIMENSIONS = ("severity", "finding_type")
+
+# Time series buckets, the rollups each is summed from, and the range
+# shown when none is given
+BUCKETS = {
+    "minute": datetime.timedelta(minutes=1),
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1),
+}
+BUCKET_GRANULARITIES = {"minute": "minute", "hour": "hour", "day": "hour"}
+DEFAULT_SPANS = {
+    "minute": datetime.timedelta(hours=1),
+    "hour": datetime.timedelta(days=1),
+    "day": datetime.timedelta(days=30),
+}
+MAX_BUCKETS = 10_080
+METRICS = ("scans", "findings", "blocked", "block_rate", "duration_ms")
+
+
+def bucket_start(timestamp: datetime.datetime, granularity: str) -> datetime.datetime:
+    """The start of the *granularity* bucket *timestamp* falls in."""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ALL_TIME
+
+
+def minute_rollups(events: Iterable[dict[str, Any]]) -> dict[tuple[str, datetime.datetime, str], list[float]]:
+    """Rollup increments for *events* per ``(dimension, minute, value)``, as
+    ``[count, findings, blocked, duration_ms]``."""
+    minutes: dict[tuple[str, datetime.datetime, str], list[float]] = {}
+    for event in events:
+        minute = event["timestamp"].replace(second=0, microsecond=0)
+        findings = event["findings"]
+        blocked = 1 if event["action"] == "BLOCK" else 0
+        for key in (
+            ("total", minute, ""),
+            ("action", minute, event["action"]),
+            ("agent", minute, event.get("agent_id") or ""),
+            ("destination", minute, event.get("destination") or ""),
+        ):
+            row = minutes.get(key)
+            if row is None:
+                minutes[key] = [1, len(findings), blocked, event["duration_ms"]]
+            else:
+                row[0] += 1
+                row[1] += len(findings)
+                row[2] += blocked
+                row[3] += event["duration_ms"]
+        for finding in findings:
+            for key in (("severity", minute, finding["severity"]), ("finding_type", minute, finding["finding_type"])):
+                row = minutes.get(key)
+                if row is None:
+                    minutes[key] = [1, 0, 0, 0.0]
+                else:
+                    row[0] += 1
+    return minutes
+
+
+def rollup_rows(events: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Rollup increments for *events*, in the row form ``write_events`` takes."""
+    # Sum per minute first, then the minutes into hours and all time
+    minutes = minute_rollups(events)
+
+    rows = []
+    for granularity in GRANULARITIES:
+        if granularity == "minute":
+            totals = minutes
+        else:
+            totals = {}
+            for (dimension, minute, value), counts in minutes.items():
+                key = (dimension, bucket_start(minute, granularity), value)
+                row = totals.get(key)
+                if row is None:
+                    totals[key] = list(counts)
+                else:
+                    for n, count in enumerate(counts):
+                        row[n] += count
+        rows += [
+            {
+                "granularity": granularity,
+                "dimension": dimension,
+                "bucket": bucket,
+                "value": value,
+                "count": count,
+                "findings": findings,
+                "blocked": blocked,
+                "duration_ms": duration_ms,
+            }
+            for (dimension, bucket, value), (count, findings, blocked, duration_ms) in totals.items()
+        ]
+    return rows
+
+
+def rollup_upsert(dialect_name: str) -> Insert:
+    """The statement adding rollup rows to the existing ones, for SQLite or PostgreSQL."""
+    dialects = {"sqlite": sqlite, "postgresql": postgresql}
+    if dialect_name not in dialects:
+        raise NotImplementedError(f"Stats rollups are not supported on {dialect_name}")
+    stmt = dialects[dialect_name].insert(StatsRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=["granularity", "dimension", "bucket", "value"],
+        set_={
+            column: getattr(StatsRollup, column) + getattr(stmt.excluded, column)
+            for column in ("count", "findings", "blocked", "duration_ms")
+        },
+    )
+
+
+def bucket_range(bucket: str, since: datetime.datetime, until: datetime.datetime) -> list[datetime.datetime]:
+    """Starts of the *bucket*s from the one *since* falls in up to *until*.
+
+    Raises ``ValueError`` past :data:`MAX_BUCKETS` buckets.
+    """
+    start = bucket_start(since, bucket)
+    count = math.ceil((until - start) / BUCKETS[bucket])
+    if count > MAX_BUCKETS:
+        raise ValueError(f"The range spans more than {MAX_BUCKETS} {bucket} buckets")
+    return [start + n * BUCKETS[bucket] for n in range(max(count, 0))]
+
+
+def timeseries(
+    rows: Iterable[Sequence[Any]],
+    metric: str,
+    bucket: str,
+    starts: list[datetime.datetime],
+    limit: int = 10,
+) -> list[dict[str, Any]]:
+    """The values of *metric* in each bucket of *starts*, per value of the dimension.
+
+    *rows* are rollup rows as ``(bucket, value, count, findings, blocked,
+    duration_ms)``.  Series come busiest first, at most *limit* of them;
+    rates and averages are ``None`` in buckets without scans.
+    """
+    index = {start: n for n, start in enumerate(starts)}
+    sums: dict[str, list[list[float]]] = {}
+    for row_bucket, value, *counts in rows:
+        position = index.get(bucket_start(row_bucket, bucket))
+        if position is None:
+            continue
+        columns = sums.setdefault(value, [[0] * len(starts) for _ in range(4)])
+        for column, count in zip(columns, counts):
+            column[position] += count
+
+    busiest = sorted(sums.items(), key=lambda item: -sum(item[1][0]))[:limit]
+    return [{"key": value, "values": _metric(metric, *columns)} for value, columns in busiest]
+
+
+def _metric(
+    metric: str, count: list[float], findings: list[float], blocked: list[float], duration_ms: list[float],
+) -> list[float | None]:
+    if metric == "scans":
+        return count
+    if metric == "findings":
+        return findings
+    if metric == "blocked":
+        return blocked
+    totals = blocked if metric == "block_rate" else duration_ms
+    return [round(total / n, 4) if n else None for total, n in zip(totals, count)]
+
+
+def backfill_rollups(conn: Connection, events_table: Table, findings_table: Table, chunk_size: int = 10_000) -> None:
+    """Add the events already in the database to the rollups, *chunk_size* at a time.
+
+    The events are read from *events_table* and *findings_table*, with the
+    columns of the audit tables before the compact schema (agent, destination,
+    action, scanner and finding type as text).
+    """
+    stmt = rollup_upsert(conn.dialect.name)
+    events_columns, findings_columns = events_table.c, findings_table.c
+    last_id = None
+    while True:
+        query = select(
+            events_columns.id, events_columns.timestamp, events_columns.agent_id, events_columns.destination,
+            events_columns.action, events_columns.duration_ms,
+        ).order_by(events_columns.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(events_columns.id > last_id)
+        events = {
+            event_id: {
+                "timestamp": timestamp, "agent_id": agent_id, "destination": destination,
+                "action": action, "duration_ms": duration_ms, "findings": [],
+            }
+            for event_id, timestamp, agent_id, destination, action, duration_ms in conn.execute(query)
+        }
+        if not events:
+            return
+        first_id, last_id = min(events), max(events)
+        findings = conn.execute(
+            select(findings_columns.scan_event_id, findings_columns.severity, findings_columns.finding_type)
+            .where(findings_columns.scan_event_id.between(first_id, last_id))
+        )
+        for event_id, severity, finding_type in findings:
+            events[event_id]["findings"].append({"severity": severity, "finding_type": finding_type})
+        conn.execute(stmt, rollup_rows(events.values()))
@@ -0,0 +1,706 @@
+"""Append-only segment-log audit backend.
+
+:class:`SegmentLogAuditRepository` keeps the audit log in a directory of
+segment files ``<n>.segment`` instead of the database, for deployments
+that log more scans than relational writes keep up with.  Events are
+appended in the order they are logged, each as a little-endian ``u32``
+length and ``u32`` CRC-32 followed by a packed record (see :func:`_encode`):
+fixed-width fields, small-int codes for the action, scanner type and
+severity, the content hash as 32 bytes and length-prefixed strings.  A
+segment is closed for appends past ``segment_size`` bytes.
+
+Each segment has a sparse index in memory: the offset, time range and ID
+range of every run of :data:`INDEX_INTERVAL` records.  Reads map segments
+into memory and decode only the runs the index points them to, on a
+thread: ``/audit`` pages walk back from the newest run in their time
+range, :meth:`~SegmentLogAuditRepository.get_event` looks in the runs
+whose ID range holds the ID, and dashboard stats and time series add up
+stats rollups (per minute, as in :mod:`clawguard.db.rollups`) kept for
+each segment.  A closed segment's index and rollups are written next to it
+as ``<n>.index``; the minute rollups of closed segments are read from
+there when a minute series needs them.
+
+Timestamps are given on append and never go back: one earlier than the
+last event's is raised to it, so the log is in time order.  Each append
+is one ``write`` to the open segment, fsynced when the segment is closed:
+a process crash loses nothing, a power loss may cut the open segment
+short, and a torn record ends it when it is reopened.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections.abc import AsyncGenerator, Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from clawguard.db.audit_repository import _finding_rows
+from clawguard.db.models import ACTIONS, SCANNER_TYPES, SEVERITY_LEVELS
+from clawguard.db.repository import AuditRepository, decode_cursor, utc_naive
+from clawguard.db.rollups import (
+    BUCKETS,
+    DEFAULT_SPANS,
+    FINDING_DIMENSIONS,
+    bucket_range,
+    bucket_start,
+    minute_rollups,
+    timeseries,
+)
+from clawguard.utils.ids import ScanIdGenerator
+
+# Segments are closed for appends past this size
+SEGMENT_SIZE = 64 * 1024 * 1024
+# Records per run of the sparse index
+INDEX_INTERVAL = 64
+
+# Payload length, CRC-32 of the payload
+_HEADER = struct.Struct("<II")
+# ID, timestamp (microseconds since 1970), duration_ms, findings_count, ID of
+# the first finding, findings stored, action code, flags
+_EVENT = struct.Struct("<qqdIqIBB")
+_ID_TIME = struct.Struct("<qq")
+# Scanner type and severity codes, start and end offset
+_FINDING = struct.Struct("<BBII")
+_LENGTH = struct.Struct("<I")
+_NONE = 0xFFFFFFFF
+# Flag: the content hash is stored as 32 bytes rather than a string
+_PACKED_HASH = 1
+
+# Codes of the fixed vocabularies, as in the database
+_ACTION_CODES = {value: code for code, value in enumerate(ACTIONS)}
+_SCANNER_CODES = {value: code for code, value in enumerate(SCANNER_TYPES)}
+_SEVERITY_CODES = {value: code for code, value in enumerate(SEVERITY_LEVELS)}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+# An index run: offset of its first record, first and last timestamp,
+# lowest and highest ID, and record count
+_OFFSET, _FIRST_TS, _LAST_TS, _MIN_ID, _MAX_ID, _COUNT = range(6)
+
+RollupKey = tuple[str, datetime.datetime, str]
+Buffer = mmap.mmap | bytes
+
+
+class _Segment:
+    """One segment file with its sparse index and stats rollups."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.number = int(path.stem)
+        self.size = 0
+        self.count = 0
+        self.next_finding_id = 1
+        self.blocks: list[list[int]] = []
+        # Minute rollups, None once the segment is closed and they are on disk
+        self.minutes: dict[RollupKey, list[float]] | None = {}
+        self.hours: dict[RollupKey, list[float]] = {}
+        self.totals: dict[tuple[str, str], int] = {}
+        self._map: mmap.mmap | None = None
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_suffix(".index")
+
+    def add(self, offset: int, timestamp: int, event_id: int) -> None:
+        """Index the record at *offset*."""
+        block = self.blocks[-1] if self.blocks else None
+        if block is None or block[_COUNT] >= INDEX_INTERVAL:
+            self.blocks.append([offset, timestamp, timestamp, event_id, event_id, 1])
+        else:
+            block[_LAST_TS] = timestamp
+            block[_MIN_ID] = min(block[_MIN_ID], event_id)
+            block[_MAX_ID] = max(block[_MAX_ID], event_id)
+            block[_COUNT] += 1
+        self.count += 1
+
+    def add_rollups(self, minutes: dict[RollupKey, list[float]]) -> None:
+        for (dimension, minute, value), counts in minutes.items():
+            if self.minutes is not None:
+                _add_counts(self.minutes, (dimension, minute, value), counts)
+            _add_counts(self.hours, (dimension, bucket_start(minute, "hour"), value), counts)
+            key = (dimension, value)
+            self.totals[key] = self.totals.get(key, 0) + int(counts[0])
+
+    def minute_rollups(self) -> dict[RollupKey, list[float]]:
+        if self.minutes is not None:
+            return self.minutes
+        data = json.loads(self.index_path.read_text())
+        return _load_rollups(data["minutes"])
+
+    def seal(self) -> None:
+        """Write the index and minute rollups to disk and drop the rollups from memory."""
+        minutes = self.minute_rollups()
+        data = {
+            "size": self.size,
+            "count": self.count,
+            "next_finding_id": self.next_finding_id,
+            "blocks": self.blocks,
+            "minutes": [
+                [dimension, minute.isoformat(), value, *counts]
+                for (dimension, minute, value), counts in minutes.items()
+            ],
+        }
+        tmp = self.index_path.with_suffix(".index.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.index_path)
+        self.minutes = None
+
+    def load_index(self) -> bool:
+        """Load the index written by :meth:`seal`; False if it is missing or stale."""
+        try:
+            data = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return False
+        if data["size"] != self.path.stat().st_size:
+            return False
+        self.size = data["size"]
+        self.count = data["count"]
+        self.next_finding_id = data["next_finding_id"]
+        self.blocks = data["blocks"]
+        self.minutes = None
+        self.add_rollups(_load_rollups(data["minutes"]))
+        return True
+
+    def rebuild(self) -> None:
+        """Index the records of the file up to the first torn one."""
+        data = self.path.read_bytes()
+        pos = 0
+        events = []
+        while pos + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, pos)
+            end = pos + _HEADER.size + length
+            if end > len(data) or zlib.crc32(data[pos + _HEADER.size:end]) != crc:
+                break
+            event = _decode(data, pos)
+            event["timestamp"] = datetime.datetime.fromisoformat(event["timestamp"])
+            self.add(pos, _micros(event["timestamp"]), event["id"])
+            if event["findings"]:
+                self.next_finding_id = event["findings"][-1]["id"] + 1
+            events.append(event)
+            if len(events) == 10_000:
+                self.add_rollups(minute_rollups(events))
+                events = []
+            pos = end
+        self.add_rollups(minute_rollups(events))
+        self.size = pos
+
+    def buffer(self, size: int) -> Buffer:
+        """The file mapped into memory, covering at least *size* bytes."""
+        if size == 0:
+            return b""
+        if self._map is None or len(self._map) < size:
+            with open(self.path, "rb") as f:
+                # Readers holding the previous map keep it until they are done
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+
+class SegmentLogAuditRepository(AuditRepository):
+    """Audit log in segment files in the directory *path*, created if missing.
+
+    Events without an ``id`` get one from *ids*.  Segments are closed for
+    appends past *segment_size* bytes.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        segment_size: int = SEGMENT_SIZE,
+        ids: ScanIdGenerator | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.segment_size = segment_size
+        self._ids = ids or ScanIdGenerator()
+        # Held by appends while they index, and by reads while they take a view
+        self._lock = threading.Lock()
+        self._segments: list[_Segment] = []
+        self._fd: int | None = None
+        self._last_ts = 0
+        self._next_finding_id = 1
+        self._open()
+
+    async def log_scan(self, event_data: dict[str, Any]) -> int:
+        return (await self.log_scans([event_data]))[0]
+
+    async def log_scans(self, events: list[dict[str, Any]]) -> list[int]:
+        if not events:
+            return []
+        return self._append(events)
+
+    async def close(self) -> None:
+        """Sync the open segment and write its index, so reopening need not scan it."""
+        if self._fd is None:
+            return
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        with self._lock:
+            self._segments[-1].seal()
+
+    async def query_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        after = None
+        if cursor:
+            timestamp, event_id = decode_cursor(cursor)
+            after = (_micros(timestamp), event_id)
+        return await asyncio.to_thread(
+            lambda: list(itertools.islice(
+                self._scan_back(agent_id, destination, action, after, since, until), offset, offset + limit,
+            ))
+        )
+
+    async def export_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        events = self._scan_forward(agent_id, destination, action, since, until)
+        while batch := await asyncio.to_thread(lambda: list(itertools.islice(events, batch_size))):
+            yield batch
+
+    async def get_event(self, event_id: int) -> dict[str, Any] | None:
+        return await asyncio.to_thread(self._find, event_id)
+
+    async def get_stats(self) -> dict[str, Any]:
+        totals: dict[tuple[str, str], int] = {}
+        with self._lock:
+            for segment in self._segments:
+                for key, count in segment.totals.items():
+                    totals[key] = totals.get(key, 0) + count
+        counts: dict[str, list[tuple[str, int]]] = {}
+        for (dimension, value), count in sorted(totals.items()):
+            counts.setdefault(dimension, []).append((value, count))
+
+        return {
+            "total_scans": sum(count for _, count in counts.get("total", [])),
+            "action_counts": [
+                {"action": action, "count": count} for action, count in counts.get("action", [])
+            ],
+            "severity_counts": [
+                {"severity": severity, "count": count} for severity, count in counts.get("severity", [])
+            ],
+            "top_finding_types": [
+                {"finding_type": finding_type, "count": count}
+                for finding_type, count in sorted(counts.get("finding_type", []), key=lambda fc: -fc[1])[:10]
+            ],
+            "recent_scans": await self.query_events(limit=5),
+        }
+
+    async def get_timeseries(
+        self,
+        metric: str = "scans",
+        group_by: str | None = None,
+        bucket: str = "hour",
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        if group_by in FINDING_DIMENSIONS and metric != "findings":
+            raise ValueError(f"Only findings are counted by {group_by}")
+        until = utc_naive(until) if until else datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        since = utc_naive(since) if since else until - DEFAULT_SPANS[bucket]
+        starts = bucket_range(bucket, since, until)
+        series: list[dict[str, Any]] = []
+        if starts:
+            rows = await asyncio.to_thread(
+                self._rollup_rows, group_by or "total", bucket, starts[0], starts[-1] + BUCKETS[bucket],
+            )
+            series = timeseries(rows, metric, bucket, starts, limit)
+        return {
+            "metric": metric,
+            "group_by": group_by,
+            "bucket": bucket,
+            "timestamps": [start.isoformat() for start in starts],
+            "series": series,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "events": sum(segment.count for segment in self._segments),
+                "bytes": sum(segment.size for segment in self._segments),
+                "index_entries": sum(len(segment.blocks) for segment in self._segments),
+            }
+
+    # ── Appends ──
+
+    def _open(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        paths = sorted(self.path.glob("*.segment"), key=lambda p: int(p.stem))
+        for path in paths:
+            segment = _Segment(path)
+            if not segment.load_index():
+                segment.rebuild()
+                if path.stat().st_size > segment.size:
+                    # Cut off a torn record, so appends start after the last whole one
+                    os.truncate(path, segment.size)
+                segment.seal()
+            self._segments.append(segment)
+            if segment.blocks:
+                self._last_ts = max(self._last_ts, segment.blocks[-1][_LAST_TS])
+            self._next_finding_id = max(self._next_finding_id, segment.next_finding_id)
+
+        if self._segments and self._segments[-1].size < self.segment_size:
+            # Append to the last segment again, with its rollups in memory
+            segment = self._segments[-1]
+            segment.minutes = segment.minute_rollups()
+            segment.index_path.unlink()
+        else:
+            self._segments.append(self._new_segment())
+        self._fd = os.open(self._segments[-1].path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _new_segment(self) -> _Segment:
+        number = self._segments[-1].number + 1 if self._segments else 1
+        return _Segment(self.path / f"{number:08d}.segment")
+
+    def _rotate(self) -> None:
+        assert self._fd is not None
+        os.fsync(self._fd)
+        os.close(self._fd)
+        segment = self._new_segment()
+        with self._lock:
+            self._segments[-1].seal()
+            self._segments.append(segment)
+        self._fd = os.open(segment.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _append(self, events: list[dict[str, Any]]) -> list[int]:
+        if self._fd is None:
+            raise RuntimeError("The audit log is closed")
+        if self._segments[-1].size >= self.segment_size:
+            self._rotate()
+        now = _micros(datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None))
+        last_ts, finding_id = self._last_ts, self._next_finding_id
+        records: list[bytes] = []
+        indexed: list[tuple[int, int]] = []
+        rollup_events: list[dict[str, Any]] = []
+        for event_data in events:
+            event_id = event_data.get("id") or self._ids.next_id()
+            timestamp = event_data.get("timestamp")
+            last_ts = max(_micros(utc_naive(timestamp)) if timestamp else now, last_ts)
+            findings = _finding_rows(event_id, event_data.get("findings", []), event_data.get("redacted_snippets"))
+            records.append(_encode(event_id, last_ts, event_data, findings, finding_id))
+            indexed.append((last_ts, event_id))
+            rollup_events.append({
+                "timestamp": _datetime(last_ts), "agent_id": event_data.get("agent_id"),
+                "destination": event_data.get("destination"), "action": event_data["action"],
+                "duration_ms": event_data.get("duration_ms", 0.0), "findings": findings,
+            })
+            finding_id += len(findings)
+
+        segment = self._segments[-1]
+        data = b"".join(records)
+        try:
+            written = 0
+            while written < len(data):
+                written += os.write(self._fd, data[written:])
+        except OSError:
+            # Drop what part of the batch made it, so later records stay readable
+            os.truncate(segment.path, segment.size)
+            raise
+
+        minutes = minute_rollups(rollup_events)
+        with self._lock:
+            offset = segment.size
+            for record, (timestamp, event_id) in zip(records, indexed):
+                segment.add(offset, timestamp, event_id)
+                offset += len(record)
+            segment.size = offset
+            segment.next_finding_id = finding_id
+            segment.add_rollups(minutes)
+        self._last_ts, self._next_finding_id = last_ts, finding_id
+        return [event_id for _, event_id in indexed]
+
+    # ── Reads (on a thread) ──
+
+    def _view(self) -> list[tuple[_Segment, list[list[int]], Buffer]]:
+        """The segments with their index runs and data as of now, oldest first.
+
+        Runs are only appended, so each segment's list is cut at its current
+        length, and the last run, which may still grow, is copied.
+        """
+        with self._lock:
+            view = []
+            for segment in self._segments:
+                if not segment.blocks:
+                    continue
+                blocks = segment.blocks[:]
+                blocks[-1] = list(blocks[-1])
+                # The end of the data, as the offset a run past the last would have
+                blocks.append([segment.size, 0, 0, 0, 0, 0])
+                view.append((segment, blocks, segment.buffer(segment.size)))
+            return view
+
+    def _scan_back(
+        self,
+        agent_id: str | None,
+        destination: str | None,
+        action: str | None,
+        after: tuple[int, int] | None,
+        since: datetime.datetime | None,
+        until: datetime.datetime | None,
+    ) -> Iterator[dict[str, Any]]:
+        """Events matching the filters and before the cursor *after*, newest first."""
+        match = _matcher(agent_id, destination, action)
+        since_us = _micros(utc_naive(since)) if since else None
+        until_us = _micros(utc_naive(until)) if until else None
+        for _, blocks, buf in reversed(self._view()):
+            for n in range(len(blocks) - 2, -1, -1):
+                block = blocks[n]
+                if until_us is not None and block[_FIRST_TS] >= until_us:
+                    continue
+                if after is not None and block[_FIRST_TS] > after[0]:
+                    continue
+                if since_us is not None and block[_LAST_TS] < since_us:
+                    return
+                found = []
+                for pos, event_id, timestamp in _records(buf, block[_OFFSET], blocks[n + 1][_OFFSET]):
+                    if (
+                        (since_us is None or timestamp >= since_us)
+                        and (until_us is None or timestamp < until_us)
+                        and (after is None or (timestamp, event_id) < after)
+                        and match(buf, pos)
+                    ):
+                        found.append(pos)
+                for pos in reversed(found):
+                    yield _decode(buf, pos)
+
+    def _scan_forward(
+        self,
+        agent_id: str | None,
+        destination: str | None,
+        action: str | None,
+        since: datetime.datetime | None,
+        until: datetime.datetime | None,
+    ) -> Iterator[dict[str, Any]]:
+        """Events matching the filters, oldest first."""
+        match = _matcher(agent_id, destination, action)
+        since_us = _micros(utc_naive(since)) if since else None
+        until_us = _micros(utc_naive(until)) if until else None
+        for _, blocks, buf in self._view():
+            for n in range(len(blocks) - 1):
+                block = blocks[n]
+                if since_us is not None and block[_LAST_TS] < since_us:
+                    continue
+                if until_us is not None and block[_FIRST_TS] >= until_us:
+                    return
+                for pos, _, timestamp in _records(buf, block[_OFFSET], blocks[n + 1][_OFFSET]):
+                    if (
+                        (since_us is None or timestamp >= since_us)
+                        and (until_us is None or timestamp < until_us)
+                        and match(buf, pos)
+                    ):
+                        yield _decode(buf, pos)
+
+    def _find(self, event_id: int) -> dict[str, Any] | None:
+        for _, blocks, buf in reversed(self._view()):
+            for n in range(len(blocks) - 2, -1, -1):
+                block = blocks[n]
+                if not block[_MIN_ID] <= event_id <= block[_MAX_ID]:
+                    continue
+                for pos, record_id, _ in _records(buf, block[_OFFSET], blocks[n + 1][_OFFSET]):
+                    if record_id == event_id:
+                        return _decode(buf, pos)
+        return None
+
+    def _rollup_rows(
+        self, dimension: str, bucket: str, start: datetime.datetime, end: datetime.datetime,
+    ) -> list[tuple[Any, ...]]:
+        """Rollup rows of *dimension* from *start* to *end* as :func:`timeseries` takes them,
+        per minute for minute buckets and per hour otherwise."""
+        start_us, end_us = _micros(start), _micros(end)
+        with self._lock:
+            segments = [
+                segment for segment in self._segments
+                if segment.blocks
+                and segment.blocks[0][_FIRST_TS] < end_us
+                and segment.blocks[-1][_LAST_TS] >= start_us
+            ]
+            rollups = [
+                segment.minute_rollups() if bucket == "minute" else dict(segment.hours)
+                for segment in segments
+            ]
+        # Finding dimensions count findings in the count column
+        findings = 0 if dimension in FINDING_DIMENSIONS else 1
+        return [
+            (row_bucket, value, counts[0], counts[findings], counts[2], counts[3])
+            for segment_rollups in rollups
+            for (row_dimension, row_bucket, value), counts in segment_rollups.items()
+            if row_dimension == dimension and start <= row_bucket < end
+        ]
+
+
+# ── Record format ──
+
+def _encode(
+    event_id: int,
+    timestamp: int,
+    event_data: dict[str, Any],
+    findings: list[dict[str, Any]],
+    first_finding_id: int,
+) -> bytes:
+    """The record of an event with its *findings* (as rows), numbered from *first_finding_id*."""
+    content_hash = event_data["content_hash"]
+    flags = 0
+    packed = b""
+    if len(content_hash) == 64:
+        try:
+            packed = bytes.fromhex(content_hash)
+        except ValueError:
+            pass
+        if packed.hex() == content_hash:
+            flags |= _PACKED_HASH
+    parts = [
+        _EVENT.pack(
+            event_id, timestamp, event_data.get("duration_ms", 0.0), event_data.get("findings_count", 0),
+            first_finding_id, len(findings), _ACTION_CODES[event_data["action"]], flags,
+        ),
+        packed if flags & _PACKED_HASH else _string(content_hash),
+        _string(event_data.get("agent_id")),
+        _string(event_data.get("destination")),
+    ]
+    for finding in findings:
+        parts.append(_FINDING.pack(
+            _SCANNER_CODES[finding["scanner_type"]], _SEVERITY_CODES[finding["severity"]],
+            finding["start_offset"], finding["end_offset"],
+        ))
+        parts.append(_string(finding["finding_type"]))
+        parts.append(_string(finding.get("redacted_snippet")))
+    payload = b"".join(parts)
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode(buf: Buffer, pos: int) -> dict[str, Any]:
+    """The event of the record at *pos*, as the repository returns it."""
+    (
+        event_id, timestamp, duration_ms, findings_count, finding_id, stored, action, flags,
+    ) = _EVENT.unpack_from(buf, pos + _HEADER.size)
+    pos += _HEADER.size + _EVENT.size
+    if flags & _PACKED_HASH:
+        content_hash = buf[pos:pos + 32].hex()
+        pos += 32
+    else:
+        content_hash, pos = _read_string(buf, pos)
+    agent_id, pos = _read_string(buf, pos)
+    destination, pos = _read_string(buf, pos)
+    findings = []
+    for n in range(stored):
+        scanner, severity, start, end = _FINDING.unpack_from(buf, pos)
+        finding_type, pos = _read_string(buf, pos + _FINDING.size)
+        snippet, pos = _read_string(buf, pos)
+        findings.append({
+            "id": finding_id + n,
+            "scanner_type": SCANNER_TYPES[scanner],
+            "finding_type": finding_type,
+            "severity": SEVERITY_LEVELS[severity],
+            "start_offset": start,
+            "end_offset": end,
+            "redacted_snippet": snippet,
+        })
+    return {
+        "id": event_id,
+        "timestamp": _datetime(timestamp).isoformat(),
+        "agent_id": agent_id,
+        "destination": destination,
+        "content_hash": content_hash,
+        "action": ACTIONS[action],
+        "findings_count": findings_count,
+        "duration_ms": duration_ms,
+        "findings": findings,
+    }
+
+
+def _records(buf: Buffer, pos: int, end: int) -> Iterator[tuple[int, int, int]]:
+    """Offset, ID and timestamp of each record from *pos* to *end*."""
+    while pos < end:
+        (length,) = _LENGTH.unpack_from(buf, pos)
+        event_id, timestamp = _ID_TIME.unpack_from(buf, pos + _HEADER.size)
+        yield pos, event_id, timestamp
+        pos += _HEADER.size + length
+
+
+def _matcher(agent_id: str | None, destination: str | None, action: str | None) -> Callable[[Buffer, int], bool]:
+    """A test of the record at an offset against the filters (none when unset)."""
+    action_code = _ACTION_CODES.get(action, -1) if action else None
+    if agent_id is None and destination is None and action_code is None:
+        return lambda buf, pos: True
+
+    def match(buf: Buffer, pos: int) -> bool:
+        fields = _EVENT.unpack_from(buf, pos + _HEADER.size)
+        if action_code is not None and fields[6] != action_code:
+            return False
+        if agent_id is None and destination is None:
+            return True
+        pos += _HEADER.size + _EVENT.size
+        if fields[7] & _PACKED_HASH:
+            pos += 32
+        else:
+            pos += _LENGTH.size + _LENGTH.unpack_from(buf, pos)[0]
+        record_agent, pos = _read_string(buf, pos)
+        if agent_id and record_agent != agent_id:
+            return False
+        if destination:
+            return _read_string(buf, pos)[0] == destination
+        return True
+
+    return match
+
+
+def _string(value: str | None) -> bytes:
+    if value is None:
+        return _LENGTH.pack(_NONE)
+    data = value.encode("utf-8")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _read_string(buf: Buffer, pos: int) -> tuple[str | None, int]:
+    (length,) = _LENGTH.unpack_from(buf, pos)
+    pos += _LENGTH.size
+    if length == _NONE:
+        return None, pos
+    return buf[pos:pos + length].decode("utf-8"), pos + length
+
+
+def _micros(timestamp: datetime.datetime) -> int:
+    delta = timestamp - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _datetime(micros: int) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(microseconds=micros)
+
+
+def _add_counts(rollups: dict[RollupKey, list[float]], key: RollupKey, counts: list[float]) -> None:
+    row = rollups.get(key)
+    if row is None:
+        rollups[key] = list(counts)
+    else:
+        for n, count in enumerate(counts):
+            row[n] += count
+
+
+def _load_rollups(rows: list[list[Any]]) -> dict[RollupKey, list[float]]:
+    return {
+        (dimension, datetime.datetime.fromisoformat(minute), value): counts
+        for dimension, minute, value, *counts in rows
+    }
@@ -1,32 +1,86 @@
 from __future__ import annotations
 
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
+from clawguard.config import Settings
+from clawguard.db.migrations import migrate
 from clawguard.db.models import Base
 
 
 _engine: AsyncEngine | None = None
+_read_engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
+_read_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    """The SQLite profile of *settings*, as PRAGMAs run on every connection."""
+    return {
+        # Before anything that could create the database file
+        "auto_vacuum": settings.sqlite_auto_vacuum,
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "busy_timeout": settings.sqlite_busy_timeout,
+        "temp_store": settings.sqlite_temp_store,
+    }
+
 
+def get_engine(
+    database_url: str,
+    pragmas: dict[str, str | int] | None = None,
+    pool_size: int | None = None,
+) -> AsyncEngine:
+    """The engine that writes to *database_url*.
 
-def get_engine(database_url: str) -> AsyncEngine:
+    For SQLite, *pragmas* are run on every new connection and the pool
+    holds at most *pool_size* connections.
+    """
     global _engine
-    if _engine is None or str(_engine.url) != database_url:
-        _engine = create_async_engine(database_url, echo=False)
+    if _engine is None or _engine.url != make_url(database_url):
+        _engine = _create_engine(database_url, pragmas, pool_size)
     return _engine
 
 
+def get_read_engine(
+    database_url: str,
+    pragmas: dict[str, str | int] | None = None,
+    pool_size: int | None = None,
+) -> AsyncEngine:
+    """An engine of read-only connections to *database_url*, separate from
+    the writer's so reads run alongside writes (under WAL).
+
+    In-memory and non-SQLite databases share the write engine.
+    """
+    global _read_engine
+    if not _is_sqlite_file(database_url):
+        return get_engine(database_url, pragmas, pool_size)
+    if _read_engine is None or _read_engine.url != make_url(database_url):
+        _read_engine = _create_engine(database_url, {**(pragmas or {}), "query_only": "ON"}, pool_size)
+    return _read_engine
+
+
 def get_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
-    global _session_factory
-    if _session_factory is None:
+    global _session_factory, _read_session_factory
+    if engine is _read_engine:
+        if _read_session_factory is None or _read_session_factory.kw["bind"] is not engine:
+            _read_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        return _read_session_factory
+    if _session_factory is None or _session_factory.kw["bind"] is not engine:
         _session_factory = async_sessionmaker(engine, expire_on_commit=False)
     return _session_factory
 
 
 async def init_db(engine: AsyncEngine) -> None:
-    """Create all tables."""
+    """Create all tables and migrate existing ones."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate)
 
 
 async def close_db(engine: AsyncEngine) -> None:
@@ -36,6 +90,35 @@ async def close_db(engine: AsyncEngine) -> None:
 
 def reset_globals() -> None:
     """Reset module-level state (for testing)."""
-    global _engine, _session_factory
+    global _engine, _read_engine, _session_factory, _read_session_factory
     _engine = None
+    _read_engine = None
     _session_factory = None
+    _read_session_factory = None
+
+
+def _create_engine(
+    database_url: str,
+    pragmas: dict[str, str | int] | None,
+    pool_size: int | None,
+) -> AsyncEngine:
+    kwargs: dict[str, Any] = {}
+    if pool_size is not None and _is_sqlite_file(database_url):
+        kwargs.update(pool_size=pool_size, max_overflow=0)
+    engine = create_async_engine(database_url, echo=False, **kwargs)
+    if pragmas and make_url(database_url).get_backend_name() == "sqlite":
+        statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.close()
+
+    return engine
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
@@ -0,0 +1,299 @@
+"""Write-behind audit logging.
+
+:class:`WriteBehindAuditRepository` takes audit writes off the request path:
+``log_scan`` turns the event's findings into rows and queues it (events
+without an ``id`` get one from a :class:`~clawguard.utils.ids.ScanIdGenerator`),
+and a background task writes queued events in batches of up to
+``batch_size`` (or whatever arrived within ``flush_interval`` of the first)
+with one bulk insert per table in a single transaction.  While
+``max_pending`` events are queued, ``log_scan`` waits for room.  Reads wait
+until every event queued before them is written, so a scan is visible in
+the audit log as soon as its response is.
+
+With a :class:`~clawguard.db.journal.AuditJournal`, a batch the database
+fails to take, or takes longer than ``spill_after`` seconds over, is
+appended to the journal instead, and a second task replays the journal
+into the database every ``replay_interval`` seconds until it is empty.
+Scans keep flowing while the database is locked or down; spilled events
+show up in reads once they are replayed.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository, _finding_rows
+from clawguard.db.journal import AuditJournal
+from clawguard.db.repository import AuditRepository
+from clawguard.utils.ids import ScanIdGenerator
+
+# Without a journal: attempts at writing a batch before its events are
+# dropped, and the delay before the first retry (doubled for each further one)
+WRITE_ATTEMPTS = 3
+RETRY_DELAY = 0.5
+
+
+class WriteBehindAuditRepository(AuditRepository):
+    """Queues the writes of *repo* and runs its reads once they are done.
+
+    The tasks start on the first write or :meth:`start`; :meth:`close`
+    writes what is queued and stops them, leaving the journal for the next
+    start.
+    """
+
+    def __init__(
+        self,
+        repo: SQLAlchemyAuditRepository,
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        ids: ScanIdGenerator | None = None,
+        journal: AuditJournal | None = None,
+        spill_after: float = 2.0,
+        replay_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._repo = repo
+        self._ids = ids or ScanIdGenerator()
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.spill_after = spill_after
+        self.replay_interval = replay_interval
+        self._clock = clock
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(max_pending)
+        self._tasks: list[asyncio.Task[None]] = []
+        # Set while the journal may hold events
+        self._spilled = asyncio.Event()
+        # Set when an event is queued or a reader waits, to end a batch early
+        self._wake = asyncio.Event()
+        self._waiting = 0
+        self._queued = 0
+        self._written = 0
+        self._progress = asyncio.Condition()
+        self.batches = 0
+        self.failed_writes = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    async def log_scan(self, event_data: dict[str, Any]) -> int:
+        return (await self.log_scans([event_data]))[0]
+
+    def start(self) -> None:
+        """Start writing, and replaying the journal left by an earlier run."""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._run()))
+        if self.journal is not None:
+            self._spilled.set()
+            self._tasks.append(asyncio.create_task(self._replay()))
+
+    async def log_scans(self, events: list[dict[str, Any]]) -> list[int]:
+        self.start()
+        timestamp = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        ids: list[int] = []
+        for event_data in events:
+            event_id = event_data.get("id") or self._ids.next_id()
+            await self._queue.put(_event_row(event_id, timestamp, event_data))
+            self._queued += 1
+            self._wake.set()
+            ids.append(event_id)
+        return ids
+
+    async def flush(self) -> None:
+        """Wait until every event queued so far is written (or spilled or dropped)."""
+        target = self._queued
+        if self._written >= target:
+            return
+        self._waiting += 1
+        self._wake.set()
+        try:
+            async with self._progress:
+                await self._progress.wait_for(lambda: self._written >= target)
+        finally:
+            self._waiting -= 1
+
+    async def close(self) -> None:
+        if not self._tasks:
+            return
+        await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def query_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        await self.flush()
+        return await self._repo.query_events(
+            agent_id, destination, action, limit, offset, cursor, since, until,
+        )
+
+    async def export_events(
+        self,
+        agent_id: str | None = None,
+        destination: str | None = None,
+        action: str | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        await self.flush()
+        async for events in self._repo.export_events(agent_id, destination, action, since, until, batch_size):
+            yield events
+
+    async def get_event(self, event_id: int) -> dict[str, Any] | None:
+        await self.flush()
+        return await self._repo.get_event(event_id)
+
+    async def get_stats(self) -> dict[str, Any]:
+        await self.flush()
+        return await self._repo.get_stats()
+
+    async def get_timeseries(
+        self,
+        metric: str = "scans",
+        group_by: str | None = None,
+        bucket: str = "hour",
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        await self.flush()
+        return await self._repo.get_timeseries(metric, group_by, bucket, since, until, limit)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_pending,
+            "written": self._written - self.dropped,
+            "batches": self.batches,
+            "failed_writes": self.failed_writes,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "journal_bytes": self.journal.size() if self.journal is not None else 0,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "max_flush_ms": round(self._max_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.batches, 2) if self.batches else 0.0,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._waiting:
+                    break
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        start = self._clock()
+        try:
+            if self.journal is not None:
+                await self._write_or_spill(batch)
+            else:
+                await self._write_with_retries(batch)
+        except Exception:
+            # Whatever goes wrong, the batch is done with: readers waiting on
+            # it must not wait forever, and the loop goes on to the next one
+            self.dropped += len(batch)
+        finally:
+            elapsed = (self._clock() - start) * 1000
+            self.batches += 1
+            self._last_flush_ms = elapsed
+            self._max_flush_ms = max(self._max_flush_ms, elapsed)
+            self._total_flush_ms += elapsed
+            async with self._progress:
+                self._written += len(batch)
+                self._progress.notify_all()
+
+    async def _write_or_spill(self, batch: list[dict[str, Any]]) -> None:
+        assert self.journal is not None
+        try:
+            await asyncio.wait_for(self._repo.write_events(batch), self.spill_after)
+            return
+        except Exception:
+            # Also on a timeout: should the cancelled write have committed,
+            # the replay skips its events
+            self.failed_writes += 1
+        try:
+            await asyncio.to_thread(self.journal.append, batch)
+        except Exception:
+            # The journal cannot take it either (disk full, directory not
+            # writable, a row JSON cannot encode): retry the database
+            await self._write_with_retries(batch)
+            return
+        self.spilled += len(batch)
+        self._spilled.set()
+
+    async def _write_with_retries(self, batch: list[dict[str, Any]]) -> None:
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                await self._repo.write_events(batch)
+                break
+            except Exception:
+                self.failed_writes += 1
+                if attempt + 1 < WRITE_ATTEMPTS:
+                    await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+        else:
+            self.dropped += len(batch)
+
+    async def _replay(self) -> None:
+        assert self.journal is not None
+        while True:
+            await self._spilled.wait()
+            self._spilled.clear()
+            try:
+                await self._replay_journal()
+            except Exception:
+                # The database is still unavailable; try again later
+                self._spilled.set()
+            await asyncio.sleep(self.replay_interval)
+
+    async def _replay_journal(self) -> None:
+        journal = self.journal
+        assert journal is not None
+        for segment in await asyncio.to_thread(journal.sealed):
+            events = await asyncio.to_thread(lambda: list(journal.read(segment)))
+            for i in range(0, len(events), self.batch_size):
+                self.replayed += await self._repo.write_events(
+                    events[i:i + self.batch_size], skip_existing=True,
+                )
+            await asyncio.to_thread(journal.remove, segment)
+
+
+def _event_row(event_id: int, timestamp: datetime.datetime, event_data: dict[str, Any]) -> dict[str, Any]:
+    """Insert parameters for *event_data*, its findings as rows and without the scanned content."""
+    row = {k: v for k, v in event_data.items() if k not in ("findings", "redacted_snippets")}
+    row["id"] = event_id
+    row["timestamp"] = timestamp
+    row["findings"] = _finding_rows(event_id, event_data.get("findings", []), event_data.get("redacted_snippets"))
+    return row
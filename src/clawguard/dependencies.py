@@ -1,18 +1,34 @@
 """FastAPI dependency injection wiring."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
 from clawguard.config import Settings
 from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.journal import AuditJournal
 from clawguard.db.repository import AuditRepository
-from clawguard.db.session import get_engine, get_session_factory
+from clawguard.db.retention import RetentionJob
+from clawguard.db.segment_log import SegmentLogAuditRepository
+from clawguard.db.session import get_engine, get_read_engine, get_session_factory, sqlite_pragmas
+from clawguard.db.write_behind import WriteBehindAuditRepository
 from clawguard.engine.action_handler import ActionHandler
 from clawguard.engine.policy_engine import PolicyEngine
 from clawguard.engine.redactor import Redactor
 from clawguard.models.enums import ScannerType
+from clawguard.scanners.cache import ScanCache
 from clawguard.scanners.custom_scanner import CustomScanner
 from clawguard.scanners.pii_scanner import PIIScanner
 from clawguard.scanners.registry import ScannerRegistry, create_default_registry
 from clawguard.scanners.secret_scanner import SecretScanner
+from clawguard.utils.ids import ScanIdGenerator
+
+T = TypeVar("T")
 
 
 class ServiceContainer:
@@ -23,6 +39,19 @@ class ServiceContainer:
 
         # Scanners
         self.registry: ScannerRegistry = create_default_registry()
+        if settings.parallel_scan_threshold > 0:
+            self.registry.enable_parallel(
+                settings.parallel_scan_threshold, settings.parallel_scan_workers,
+            )
+        if settings.incremental_scan_threshold > 0:
+            self.registry.enable_incremental(
+                settings.incremental_scan_threshold, settings.chunk_cache_size,
+            )
+
+        self.scan_cache = ScanCache(settings.scan_cache_size, settings.scan_cache_ttl)
+        self.scan_executor: ThreadPoolExecutor | None = None
+        if settings.scan_threads > 0:
+            self.scan_executor = ThreadPoolExecutor(settings.scan_threads, thread_name_prefix="clawguard-scan")
 
         # Policy
         self.policy_engine = PolicyEngine()
@@ -40,23 +69,114 @@ class ServiceContainer:
         self.redactor = Redactor(self.policy_engine.policy.redaction)
         self.action_handler = ActionHandler(self.redactor)
 
-        # Database
-        self.engine = get_engine(settings.database_url)
-        self.session_factory = get_session_factory(self.engine)
-        self.audit_repo: AuditRepository = SQLAlchemyAuditRepository(self.session_factory)
+        # Audit log: the database holds nothing else, so with the segment
+        # log there is none
+        self.engine: AsyncEngine | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.read_engine: AsyncEngine | None = None
+        self.read_session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.scan_ids = ScanIdGenerator(settings.node_id)
+        self.audit_log: SegmentLogAuditRepository | None = None
+        self.audit_queue: WriteBehindAuditRepository | None = None
+        self.retention: RetentionJob | None = None
+        if settings.audit_log_path:
+            # Appends are cheap enough for the request path; retention
+            # applies to the database
+            self.audit_log = SegmentLogAuditRepository(
+                settings.audit_log_path, settings.audit_log_segment_size, self.scan_ids,
+            )
+            self.audit_repo: AuditRepository = self.audit_log
+        else:
+            pragmas = sqlite_pragmas(settings)
+            self.engine = get_engine(settings.database_url, pragmas, settings.db_write_pool_size)
+            self.session_factory = get_session_factory(self.engine)
+            self.read_engine = get_read_engine(settings.database_url, pragmas, settings.db_read_pool_size)
+            self.read_session_factory = get_session_factory(self.read_engine)
+            repo = SQLAlchemyAuditRepository(self.session_factory, self.read_session_factory)
+            self.audit_queue = create_audit_queue(settings, repo, self.scan_ids)
+            self.audit_repo = self.audit_queue or repo
+            self.retention = create_retention_job(settings, self.engine)
+
+        # Called after a policy change made through this container, to pass
+        # it on to other server processes
+        self.policy_broadcast: Callable[[], None] | None = None
+
+    def reload_policy(self, broadcast: bool = True) -> None:
+        """Reload the policy file and apply it."""
+        self.policy_engine.reload(self.settings.policy_path)
+        self.apply_policy(broadcast)
+
+    def apply_policy(self, broadcast: bool = True) -> None:
+        """Apply the current policy to the scanners and redactor."""
+        policy = self.policy_engine.policy
+
+        # Reload custom patterns and sync disabled patterns; scans running
+        # on other threads are retried if they overlap the change
+        with self.registry.reconfigure():
+            custom_scanner = self.registry.get(ScannerType.CUSTOM)
+            if isinstance(custom_scanner, CustomScanner):
+                custom_scanner.load_patterns(policy.custom_patterns)
+            self._sync_disabled_patterns()
+
+        # Update redactor config
+        self.redactor._config = policy.redaction
+
+        if broadcast and self.policy_broadcast is not None:
+            self.policy_broadcast()
+
+    async def offload(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run CPU-bound scan work on the scan threads, off the event loop."""
+        if self.scan_executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.scan_executor, partial(fn, *args))
+
+    def close(self) -> None:
+        """Release worker pools."""
+        if self.scan_executor is not None:
+            self.scan_executor.shutdown(wait=False, cancel_futures=True)
+        self.registry.close()
 
     def _sync_disabled_patterns(self) -> None:
-        """Push disabled_patterns and severity_overrides from policy to secret/PII scanners."""
+        """Push disabled_patterns and severity_overrides from policy to secret/PII scanners.
+
+        Each scanner rebuilds its compiled pattern set, and cached scan
+        results are dropped.  While requests are served, use
+        :meth:`apply_policy`, which lets concurrent scans see the change whole.
+        """
         disabled = set(self.policy_engine.policy.disabled_patterns)
         sev_overrides = self.policy_engine.policy.pattern_severity_overrides
         secret_scanner = self.registry.get(ScannerType.SECRET)
         if isinstance(secret_scanner, SecretScanner):
-            secret_scanner.disabled_patterns = disabled
-            secret_scanner.severity_overrides = sev_overrides
+            secret_scanner.configure(disabled, sev_overrides)
         pii_scanner = self.registry.get(ScannerType.PII)
         if isinstance(pii_scanner, PIIScanner):
-            pii_scanner.disabled_patterns = disabled
-            pii_scanner.severity_overrides = sev_overrides
+            pii_scanner.configure(disabled, sev_overrides)
+        self.scan_cache.invalidate()
+
+
+def create_audit_queue(
+    settings: Settings, repo: SQLAlchemyAuditRepository, ids: ScanIdGenerator,
+) -> WriteBehindAuditRepository | None:
+    """Write-behind queue in front of *repo*, unless disabled in *settings*."""
+    if settings.audit_queue_size <= 0:
+        return None
+    return WriteBehindAuditRepository(
+        repo,
+        settings.audit_queue_size,
+        settings.audit_batch_size,
+        settings.audit_flush_interval,
+        ids,
+        journal=AuditJournal(settings.audit_journal_path) if settings.audit_journal_path else None,
+        spill_after=settings.audit_spill_after,
+    )
+
+
+def create_retention_job(settings: Settings, engine: AsyncEngine) -> RetentionJob | None:
+    """Periodic retention job for the database of *engine*, unless *settings* keep everything."""
+    keeps = (settings.audit_retention_days, settings.audit_allow_retention_hours, settings.rollup_minute_retention_days)
+    if settings.retention_interval <= 0 or not any(n > 0 for n in keeps):
+        return None
+    return RetentionJob(engine, settings)
 
 
 _container: ServiceContainer | None = None
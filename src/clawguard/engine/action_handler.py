@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 
 from clawguard.models.enums import Action
@@ -20,7 +21,14 @@ class ActionHandler:
     def __init__(self, redactor: Redactor) -> None:
         self._redactor = redactor
 
-    def handle(self, action: Action, content: str, findings: list[Finding]) -> ActionResult:
+    def handle(
+        self,
+        action: Action,
+        content: str,
+        findings: Sequence[Finding],
+        replacements: Sequence[str] | None = None,
+    ) -> ActionResult:
+        """Apply *action*; *replacements* are precomputed redaction snippets."""
         if action == Action.ALLOW:
             return ActionResult(
                 action=Action.ALLOW,
@@ -36,7 +44,7 @@ class ActionHandler:
             )
 
         if action == Action.PROMPT:
-            redacted = self._redactor.redact(content, findings)
+            redacted = self._redactor.redact(content, findings, replacements)
             return ActionResult(
                 action=Action.PROMPT,
                 content=redacted,
@@ -44,7 +52,7 @@ class ActionHandler:
             )
 
         # REDACT
-        redacted = self._redactor.redact(content, findings)
+        redacted = self._redactor.redact(content, findings, replacements)
         return ActionResult(
             action=Action.REDACT,
             content=redacted,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import fnmatch
+from collections.abc import Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -8,7 +9,7 @@ import yaml
 
 from clawguard.models.enums import Action, ScannerType, Severity
 from clawguard.models.policy import PolicyConfig
-from clawguard.scanners.base import Finding
+from clawguard.scanners.base import Finding, FindingBatch
 
 
 _SEV_ORDER = {Severity.LOW: 0, Severity.MEDIUM: 1, Severity.HIGH: 2, Severity.CRITICAL: 3}
@@ -54,7 +55,7 @@ class PolicyEngine:
 
     def evaluate(
         self,
-        findings: list[Finding],
+        findings: Sequence[Finding],
         destination: str | None = None,
         agent_id: str | None = None,
     ) -> Action:
@@ -72,8 +73,9 @@ class PolicyEngine:
             return Action.ALLOW
 
         # 1. Severity overrides
+        present = _severities(findings)
         for override in self._policy.severity_overrides:
-            if any(f.severity == override.severity for f in findings):
+            if override.severity in present:
                 return Action(override.action.value)
 
         # 2. Destination allowlist — trusted destinations bypass
@@ -113,7 +115,7 @@ class PolicyEngine:
 
     def evaluate_with_prompt(
         self,
-        findings: list[Finding],
+        findings: Sequence[Finding],
         destination: str | None = None,
         agent_id: str | None = None,
     ) -> PolicyDecision:
@@ -124,11 +126,30 @@ class PolicyEngine:
         threshold = self._policy.prompt_threshold
         if threshold is None:
             return PolicyDecision(action=base_action)
-        max_sev = max(_SEV_ORDER[f.severity] for f in findings)
+        max_sev = max(_SEV_ORDER[sev] for sev in _severities(findings))
         if max_sev >= _SEV_ORDER[threshold]:
             return PolicyDecision(action=Action.PROMPT, suggested_action=base_action)
         return PolicyDecision(action=base_action)
 
+    def evaluate_many(
+        self,
+        items: Sequence[tuple[Sequence[Finding], str | None, str | None]],
+    ) -> list[PolicyDecision]:
+        """:meth:`evaluate_with_prompt` for ``(findings, destination, agent_id)`` items.
+
+        Decisions depend on findings only through their severities, so items
+        with the same destination, agent and severities are evaluated once.
+        """
+        decisions: dict[tuple[str | None, str | None, frozenset[Severity]], PolicyDecision] = {}
+        result = []
+        for findings, destination, agent_id in items:
+            key = (destination, agent_id, frozenset(_severities(findings)))
+            decision = decisions.get(key)
+            if decision is None:
+                decision = decisions[key] = self.evaluate_with_prompt(findings, destination, agent_id)
+            result.append(decision)
+        return result
+
     def get_scanners_for_destination(self, destination: str | None) -> list[ScannerType] | None:
         """Return scanner types to run for a destination, or None for all."""
         if destination is None:
@@ -137,3 +158,9 @@ class PolicyEngine:
             if fnmatch.fnmatch(destination, rule.pattern) and rule.scanners:
                 return [ScannerType(s) for s in rule.scanners]
         return None
+
+
+def _severities(findings: Sequence[Finding]) -> set[Severity]:
+    if isinstance(findings, FindingBatch):
+        return findings.severities()
+    return {f.severity for f in findings}
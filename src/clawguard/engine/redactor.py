@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 from clawguard.models.enums import RedactStrategy
 from clawguard.models.policy import RedactionConfig
-from clawguard.scanners.base import Finding
+from clawguard.scanners.base import Finding, FindingBatch
 from clawguard.utils.hashing import sha256_short
 
 
@@ -16,24 +18,93 @@ class Redactor:
     def config(self) -> RedactionConfig:
         return self._config
 
-    def redact(self, content: str, findings: list[Finding]) -> str:
+    def redact(
+        self,
+        content: str,
+        findings: Sequence[Finding],
+        replacements: Sequence[str] | None = None,
+    ) -> str:
         """Replace matched spans in content using the configured strategy.
 
-        Processes findings from end to start to preserve offset accuracy.
+        *replacements*, if given, are the precomputed :meth:`snippets` of
+        *findings*.  Processes findings from end to start to preserve offset
+        accuracy.
         """
         if not findings:
             return content
 
-        # Sort by start position descending so replacements don't shift offsets
-        sorted_findings = sorted(findings, key=lambda f: f.start, reverse=True)
+        if isinstance(findings, FindingBatch):
+            starts, ends = findings.starts, findings.ends
+            text_of = findings.matched_text
+        else:
+            starts = [f.start for f in findings]
+            ends = [f.end for f in findings]
+            text_of = [f.matched_text for f in findings].__getitem__
+        if replacements is None:
+            replacements = [self._redact_value(text_of(i)) for i in range(len(findings))]
 
+        # Sort by start position descending so replacements don't shift offsets
+        order = sorted(range(len(findings)), key=starts.__getitem__, reverse=True)
+
+        # Disjoint spans are stitched together in one pass
+        pieces: list[str] = []
+        tail = len(content)
+        for i in order:
+            if ends[i] > tail:
+                break
+            pieces.append(content[ends[i]:tail])
+            pieces.append(replacements[i])
+            tail = starts[i]
+        else:
+            pieces.append(content[:tail])
+            return "".join(reversed(pieces))
+
+        # Overlapping spans are spliced one at a time, each into the result
+        # of the previous one
         result = content
-        for finding in sorted_findings:
-            replacement = self._redact_value(finding.matched_text)
-            result = result[:finding.start] + replacement + result[finding.end:]
-
+        for i in order:
+            result = result[:starts[i]] + replacements[i] + result[ends[i]:]
         return result
 
+    def redact_range(
+        self,
+        content: str,
+        findings: FindingBatch,
+        replacements: Sequence[str],
+        pos: int,
+        end: int,
+    ) -> tuple[str, int]:
+        """Redact ``content[pos:end]`` for streamed output.
+
+        *findings* must include every finding starting in that range.
+        Returns the redacted text and the offset it reaches, which is past
+        *end* when a finding runs beyond it.  Text a previous call already
+        covered is not repeated; the uncovered rest of an overlapping
+        finding is redacted on its own.
+        """
+        pieces: list[str] = []
+        starts, ends = findings.starts, findings.ends
+        for i in sorted(range(len(findings)), key=starts.__getitem__):
+            start, stop = starts[i], ends[i]
+            if stop <= pos or start >= end:
+                continue
+            if start >= pos:
+                pieces.append(content[pos:start])
+                pieces.append(replacements[i])
+            else:
+                pieces.append(self._redact_value(content[pos:stop]))
+            pos = stop
+        if pos < end:
+            pieces.append(content[pos:end])
+            pos = end
+        return "".join(pieces), pos
+
+    def snippets(self, findings: Sequence[Finding]) -> list[str]:
+        """The redacted form of every finding's matched text, in order."""
+        if isinstance(findings, FindingBatch):
+            return [self._redact_value(findings.matched_text(i)) for i in range(len(findings))]
+        return [self._redact_value(f.matched_text) for f in findings]
+
     def _redact_value(self, text: str) -> str:
         strategy = self._config.strategy
 
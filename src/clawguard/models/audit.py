@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import datetime
+
 from pydantic import BaseModel
 
 
@@ -9,6 +11,9 @@ class AuditQuery(BaseModel):
     action: str | None = None
     limit: int = 50
     offset: int = 0
+    cursor: str | None = None
+    since: datetime.datetime | None = None
+    until: datetime.datetime | None = None
 
 
 class AuditFinding(BaseModel):
@@ -29,6 +29,19 @@ class DashboardStats(BaseModel):
     recent_scans: list[AuditEntry] = []
 
 
+class TimeSeries(BaseModel):
+    key: str
+    values: list[float | None]
+
+
+class DashboardTimeseries(BaseModel):
+    metric: str
+    group_by: str | None = None
+    bucket: str
+    timestamps: list[str] = []
+    series: list[TimeSeries] = []
+
+
 class PatternCatalogEntry(BaseModel):
     name: str
     severity: str
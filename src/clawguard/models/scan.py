@@ -4,6 +4,9 @@ from pydantic import BaseModel
 
 from clawguard.models.enums import Action, ScannerType, Severity
 
+# Most items one /scan/batch request may carry
+MAX_BATCH_ITEMS = 500
+
 
 class ScanRequest(BaseModel):
     content: str
@@ -29,3 +32,18 @@ class ScanResponse(BaseModel):
     findings_count: int = 0
     scan_id: int | None = None
     duration_ms: float = 0.0
+
+
+class ScanStreamResult(BaseModel):
+    """Final line of a ``/scan/stream`` response.
+
+    The redacted content and the findings precede it as ``content`` and
+    ``finding`` lines.
+    """
+    action: Action
+    suggested_action: Action | None = None
+    findings_count: int = 0
+    content_hash: str
+    content_length: int = 0
+    scan_id: int | None = None
+    duration_ms: float = 0.0
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import re
 from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Collection, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
+from typing import NamedTuple, overload
 
 from clawguard.models.enums import ScannerType, Severity
 
 
-@dataclass
+# Characters of surrounding content included on each side in Finding.context
+CONTEXT_WINDOW = 30
+
+# Severity codes stored in FindingBatch, in ascending order of severity
+SEVERITIES: tuple[Severity, ...] = (Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+_SEVERITY_CODES = {sev: code for code, sev in enumerate(SEVERITIES)}
+
+
+@dataclass(slots=True)
 class Finding:
     scanner_type: ScannerType
     finding_type: str
@@ -14,8 +26,173 @@ class Finding:
     matched_text: str
     start: int
     end: int
-    context: str = ""
-    metadata: dict[str, str] = field(default_factory=dict)
+    # Pattern category (e.g. "cloud", "entropy"); empty for PII and custom
+    category: str = ""
+    # The scanned content; context is sliced from it on demand
+    source: str | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def context(self) -> str:
+        """The match with up to CONTEXT_WINDOW characters on either side."""
+        if self.source is None:
+            return ""
+        start = max(0, self.start - CONTEXT_WINDOW)
+        return self.source[start:self.end + CONTEXT_WINDOW]
+
+
+class FindingKind(NamedTuple):
+    scanner_type: ScannerType
+    finding_type: str
+    category: str = ""
+
+
+class FindingBatch(Sequence[Finding]):
+    """Findings of one scan of *source*, stored column-wise.
+
+    Offsets, interned kind ids and severity codes live in flat arrays, so a
+    match costs a few bytes instead of an object.  Matched text is sliced
+    from *source* on demand.  Indexing or iterating yields :class:`Finding`
+    views, and :meth:`findings` returns them as a list.
+    """
+
+    __slots__ = ("source", "starts", "ends", "kind_ids", "severity_codes", "_kinds", "_kind_ids", "_texts")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.kind_ids = array("I")
+        self.severity_codes = array("B")
+        self._kinds: list[FindingKind] = []
+        self._kind_ids: dict[FindingKind, int] = {}
+        # Matched text that is not the source slice (findings from scan())
+        self._texts: dict[int, str] = {}
+
+    @classmethod
+    def from_findings(cls, source: str, findings: Iterable[Finding]) -> FindingBatch:
+        batch = cls(source)
+        for f in findings:
+            i = len(batch.starts)
+            batch.append(batch.kind_id(f.scanner_type, f.finding_type, f.category), f.severity, f.start, f.end)
+            if len(f.matched_text) != f.end - f.start or not source.startswith(f.matched_text, f.start):
+                batch._texts[i] = f.matched_text
+        return batch
+
+    def copy(self, source: str | None = None) -> FindingBatch:
+        """A copy of the batch over *source* (default: the same content).
+
+        *source* must be the content that was scanned, or ``""`` for a copy
+        that does not keep the content alive (see :attr:`matched_text`).
+        """
+        batch = FindingBatch(self.source if source is None else source)
+        batch.starts = array("q", self.starts)
+        batch.ends = array("q", self.ends)
+        batch.kind_ids = array("I", self.kind_ids)
+        batch.severity_codes = array("B", self.severity_codes)
+        batch._kinds = list(self._kinds)
+        batch._kind_ids = dict(self._kind_ids)
+        batch._texts = dict(self._texts)
+        return batch
+
+    @property
+    def kinds(self) -> Sequence[FindingKind]:
+        """Interned finding kinds, indexed by the values in ``kind_ids``."""
+        return self._kinds
+
+    def kind_id(self, scanner_type: ScannerType, finding_type: str, category: str = "") -> int:
+        """Return the id of a finding kind, interning it on first use."""
+        kind = FindingKind(scanner_type, finding_type, category)
+        kind_id = self._kind_ids.get(kind)
+        if kind_id is None:
+            kind_id = self._kind_ids[kind] = len(self._kinds)
+            self._kinds.append(kind)
+        return kind_id
+
+    def append(self, kind_id: int, severity: Severity, start: int, end: int) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.kind_ids.append(kind_id)
+        self.severity_codes.append(_SEVERITY_CODES[severity])
+
+    def extend(self, other: FindingBatch) -> None:
+        """Append every finding of *other*, which must share this batch's source."""
+        if other.source is not self.source and other.source != self.source:
+            raise ValueError("Cannot merge findings of different content")
+        offset = len(self.starts)
+        remap = [self.kind_id(*kind) for kind in other._kinds]
+        self.starts.extend(other.starts)
+        self.ends.extend(other.ends)
+        if remap == list(range(len(remap))):
+            self.kind_ids.extend(other.kind_ids)
+        else:
+            self.kind_ids.extend(array("I", [remap[k] for k in other.kind_ids]))
+        self.severity_codes.extend(other.severity_codes)
+        self._texts.update((offset + i, text) for i, text in other._texts.items())
+
+    def matched_text(self, i: int) -> str:
+        text = self._texts.get(i)
+        return self.source[self.starts[i]:self.ends[i]] if text is None else text
+
+    def kind(self, i: int) -> FindingKind:
+        return self._kinds[self.kind_ids[i]]
+
+    def severity(self, i: int) -> Severity:
+        return SEVERITIES[self.severity_codes[i]]
+
+    def severities(self) -> set[Severity]:
+        """The distinct severities present."""
+        return {SEVERITIES[code] for code in set(self.severity_codes)}
+
+    def findings(self) -> list[Finding]:
+        """The batch as a ``list[Finding]``."""
+        return [self._finding(i) for i in range(len(self.starts))]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @overload
+    def __getitem__(self, i: int) -> Finding: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[Finding]: ...
+
+    def __getitem__(self, i: int | slice) -> Finding | list[Finding]:
+        if isinstance(i, slice):
+            return [self._finding(j) for j in range(*i.indices(len(self.starts)))]
+        if i < 0:
+            i += len(self.starts)
+        if not 0 <= i < len(self.starts):
+            raise IndexError("finding index out of range")
+        return self._finding(i)
+
+    def __iter__(self) -> Iterator[Finding]:
+        return (self._finding(i) for i in range(len(self.starts)))
+
+    def _finding(self, i: int) -> Finding:
+        kind = self._kinds[self.kind_ids[i]]
+        return Finding(
+            scanner_type=kind.scanner_type,
+            finding_type=kind.finding_type,
+            severity=SEVERITIES[self.severity_codes[i]],
+            matched_text=self.matched_text(i),
+            start=self.starts[i],
+            end=self.ends[i],
+            category=kind.category,
+            source=self.source,
+        )
+
+
+@dataclass(slots=True)
+class MatchSequences:
+    """Raw regex matches behind a scan, one span list per match pattern.
+
+    See :meth:`BaseScanner.scan_range`.
+    """
+
+    spans: list[list[tuple[int, int]]]
+    # Per-match outcome of the scanner's own check (validator, entropy) by
+    # pattern index, aligned with spans; None where it has not run yet
+    checks: dict[int, list[bool | None]] = field(default_factory=dict)
 
 
 class BaseScanner(ABC):
@@ -25,3 +202,35 @@ class BaseScanner(ABC):
     def scan(self, content: str) -> list[Finding]:
         """Scan content and return a list of findings."""
         ...
+
+    def scan_batch(self, content: str) -> FindingBatch:
+        """Scan content and return the findings column-wise.
+
+        Built-in scanners fill the batch directly; the default wraps scan().
+        """
+        return FindingBatch.from_findings(content, self.scan(content))
+
+    # ── Chunked scanning ──
+    # Scanners whose results derive from finditer() sequences can be scanned
+    # in ranges and reassembled (see clawguard.scanners.parallel).
+
+    def match_patterns(self) -> Sequence[re.Pattern[str]] | None:
+        """The regexes whose matches make up this scanner's findings.
+
+        None (the default) means the scanner cannot be scanned in ranges.
+        """
+        return None
+
+    def scan_range(
+        self, content: str, start: int, end: int, only: Collection[int] | None = None
+    ) -> MatchSequences:
+        """Matches of each match pattern, as ``finditer(content, start)``
+        reports them, up to the first one starting at or after *end*.
+
+        With *only*, just the match patterns at those indices need to run.
+        """
+        raise NotImplementedError
+
+    def assemble(self, content: str, matches: MatchSequences) -> FindingBatch:
+        """Build findings from the match sequences of the whole content."""
+        raise NotImplementedError
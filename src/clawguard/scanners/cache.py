@@ -0,0 +1,102 @@
+"""In-memory cache of scan results by content hash.
+
+Agents resend the same content (system prompts, file reads, retried tool
+calls).  :class:`ScanCache` keeps the findings of recent scans keyed by the
+content's SHA-256, the scanner selection and a version that
+:meth:`ScanCache.invalidate` bumps whenever policy or patterns change.  A scan
+that started before an invalidation is stored under the old version and is
+never served.  Entries hold detached copies of the findings, so the cache
+does not keep scanned content alive.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from typing import NamedTuple
+
+from clawguard.models.enums import ScannerType
+from clawguard.scanners.base import FindingBatch
+
+
+class CacheKey(NamedTuple):
+    content_hash: str
+    scanners: tuple[ScannerType, ...] | None
+    version: int
+
+
+class ScanCache:
+    """Bounded LRU cache of scan results whose entries expire after *ttl* seconds.
+
+    *max_entries* of 0 disables caching.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, FindingBatch]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, content_hash: str, scanners: Sequence[ScannerType] | None) -> CacheKey:
+        """The key for content scanned by *scanners* (None: all) under the current version."""
+        return CacheKey(content_hash, tuple(scanners) if scanners is not None else None, self._version)
+
+    def get(self, key: CacheKey, content: str) -> FindingBatch | None:
+        """Cached findings for *key*, as a batch over *content*, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[1].copy(content)
+
+    def put(self, key: CacheKey, findings: FindingBatch) -> None:
+        if not self.enabled or key.version != self._version:
+            return
+        entry = (self._clock() + self.ttl, findings.copy(""))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry; results of scans already running are not stored."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Collection
 from dataclasses import dataclass
 
 from clawguard.models.enums import ScannerType, Severity
-from clawguard.scanners.base import BaseScanner, Finding
+from clawguard.scanners.base import BaseScanner, Finding, FindingBatch, MatchSequences
+from clawguard.scanners.ranges import finditer_range
 
 
 @dataclass
@@ -35,26 +37,30 @@ class CustomScanner(BaseScanner):
             ))
 
     def scan(self, content: str) -> list[Finding]:
-        findings: list[Finding] = []
-
-        for cp in self._patterns:
-            if cp.compiled is None:
-                continue
-            for match in cp.compiled.finditer(content):
-                findings.append(Finding(
-                    scanner_type=self.scanner_type,
-                    finding_type=cp.name,
-                    severity=cp.severity,
-                    matched_text=match.group(0),
-                    start=match.start(),
-                    end=match.end(),
-                    context=_extract_context(content, match.start(), match.end()),
-                ))
-
-        return findings
-
-
-def _extract_context(content: str, start: int, end: int, window: int = 30) -> str:
-    ctx_start = max(0, start - window)
-    ctx_end = min(len(content), end + window)
-    return content[ctx_start:ctx_end]
+        return self.scan_batch(content).findings()
+
+    def scan_batch(self, content: str) -> FindingBatch:
+        return self.assemble(content, self.scan_range(content, 0, len(content)))
+
+    def match_patterns(self) -> list[re.Pattern[str]]:
+        return [cp.compiled for cp in self._patterns if cp.compiled is not None]
+
+    def scan_range(
+        self, content: str, start: int, end: int, only: Collection[int] | None = None
+    ) -> MatchSequences:
+        return MatchSequences([
+            [m.span() for m in finditer_range(pattern, content, start, end)]
+            if only is None or i in only else []
+            for i, pattern in enumerate(self.match_patterns())
+        ])
+
+    def assemble(self, content: str, matches: MatchSequences) -> FindingBatch:
+        batch = FindingBatch(content)
+
+        patterns = [cp for cp in self._patterns if cp.compiled is not None]
+        for cp, spans in zip(patterns, matches.spans):
+            kind_id = batch.kind_id(self.scanner_type, cp.name)
+            for start, end in spans:
+                batch.append(kind_id, cp.severity, start, end)
+
+        return batch
@@ -0,0 +1,314 @@
+"""Incremental rescanning of payloads that mostly repeat earlier ones.
+
+Agents often resend the previous payload with a small edit or an append.
+:class:`IncrementalScanner` cuts content into content-defined chunks: a cut
+falls after a line break whose preceding text hashes below a threshold, so a
+boundary depends only on the text around it and an edit moves at most the
+boundaries next to it.  The raw matches of each chunk are cached by the
+chunk's hash, relative to the chunk.
+
+Cached matches are those a chunk settles on its own (see
+:mod:`clawguard.scanners.ranges`): they start at least ``HISTORY``
+characters into the chunk, where lookbehinds see only the chunk, and before
+the last character no pattern can consume, so no match attempt reads past
+the chunk.  The short stretches around each boundary are rescanned in the
+payload, and everything is stitched together and rebased onto the payload's
+offsets as chunk boundaries are in :mod:`clawguard.scanners.parallel`.
+Patterns without a stop character are matched over the whole payload.  The
+result equals a scan of the whole payload.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from clawguard.models.enums import ScannerType
+from clawguard.scanners.base import BaseScanner, FindingBatch, MatchSequences
+from clawguard.scanners.parallel import merge_sequences
+from clawguard.scanners.ranges import stop_character
+from clawguard.scanners.stream import HISTORY
+
+if TYPE_CHECKING:
+    from clawguard.scanners.parallel import ParallelScanner
+
+# Chunk sizes in characters; cuts average AVG_CHUNK and are forced at MAX_CHUNK
+MIN_CHUNK = 4 * 1024
+AVG_CHUNK = 16 * 1024
+MAX_CHUNK = 64 * 1024
+# Characters before a line break that decide whether to cut there
+BOUNDARY_WINDOW = 64
+
+
+def content_chunks(
+    content: str,
+    min_size: int = MIN_CHUNK,
+    avg_size: int = AVG_CHUNK,
+    max_size: int = MAX_CHUNK,
+) -> list[tuple[int, int]]:
+    """Split *content* into contiguous content-defined ``(start, end)`` chunks.
+
+    A line break ends a chunk when the CRC of the text before it, up to
+    ``BOUNDARY_WINDOW`` characters of its line, falls below a threshold
+    proportional to the line's length, so chunks average *avg_size* whatever
+    the line lengths.  Text without line breaks is cut every *max_size*
+    characters.
+    """
+    chunks: list[tuple[int, int]] = []
+    length = len(content)
+    start = 0
+    while length - start > min_size:
+        limit = min(length, start + max_size)
+        cut = limit
+        pos = content.find("\n", start + min_size - 1, limit)
+        while pos != -1:
+            # The line, up to max_size characters of it, ends at pos
+            line = max(0, pos - max_size)
+            line = max(line, content.rfind("\n", line, pos) + 1)
+            window = content[max(line, pos - BOUNDARY_WINDOW):pos + 1]
+            digest = zlib.crc32(window.encode("utf-8", "surrogatepass"))
+            if digest * (avg_size - min_size) < (pos + 1 - line) << 32:
+                cut = pos + 1
+                break
+            pos = content.find("\n", pos + 1, limit)
+        if cut == length:
+            break
+        chunks.append((start, cut))
+        start = cut
+    if start < length or not chunks:
+        chunks.append((start, length))
+    return chunks
+
+
+@dataclass(slots=True)
+class _Chunk:
+    # Matches settled in chunk[HISTORY:end] per scanner, relative to the chunk
+    end: int
+    sequences: list[MatchSequences]
+
+
+class IncrementalScanner:
+    """Scans content of at least *min_size* characters chunk by chunk,
+    reusing the matches of chunks seen before.
+
+    At most *max_entries* chunks are cached, least recently used first out.
+    Call :meth:`invalidate` whenever the scanners' patterns change.
+    """
+
+    def __init__(self, min_size: int, max_entries: int = 4096) -> None:
+        self.min_size = min_size
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[bytes, tuple[ScannerType, ...]], _Chunk] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def applies(self, content: str) -> bool:
+        return self.max_entries > 0 and len(content) >= self.min_size
+
+    def scan(
+        self,
+        content: str,
+        scanners: Sequence[BaseScanner],
+        parallel: ParallelScanner | None = None,
+    ) -> FindingBatch:
+        """Scan *content*; chunks not cached yet run on *parallel*'s pool if it applies."""
+        ranged = [s for s in scanners if s.match_patterns() is not None]
+        chunks = content_chunks(content, MIN_CHUNK, AVG_CHUNK, MAX_CHUNK)
+        entries = self._lookup(content, chunks, ranged, parallel)
+
+        batch = FindingBatch(content)
+        for scanner in scanners:
+            if scanner not in ranged:
+                batch.extend(scanner.scan_batch(content))
+                continue
+            k = ranged.index(scanner)
+            cached = [(start, entry.end, entry.sequences[k]) for (start, _), entry in zip(chunks, entries)]
+            batch.extend(scanner.assemble(content, _merge(content, scanner, cached)))
+        return batch
+
+    def invalidate(self) -> None:
+        """Drop every chunk; scans already running do not store theirs."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _lookup(
+        self,
+        content: str,
+        chunks: list[tuple[int, int]],
+        scanners: list[BaseScanner],
+        parallel: ParallelScanner | None,
+    ) -> list[_Chunk]:
+        selection = tuple(s.scanner_type for s in scanners)
+        keys = [
+            (hashlib.blake2b(content[s:e].encode("utf-8", "surrogatepass"), digest_size=16).digest(), selection)
+            for s, e in chunks
+        ]
+        entries: list[_Chunk | None] = []
+        with self._lock:
+            version = self._version
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                entries.append(entry)
+            hits = sum(entry is not None for entry in entries)
+            self.hits += hits
+            self.misses += len(entries) - hits
+
+        # Scan each missing chunk on its own, once even if it repeats
+        missing: dict[tuple[bytes, tuple[ScannerType, ...]], tuple[str, int]] = {}
+        patterns = [p for s in scanners for p in s.match_patterns() or []]
+        for key, (s, e), entry in zip(keys, chunks, entries):
+            if entry is None and key not in missing:
+                text = content[s:e]
+                missing[key] = (text, _settled_end(text, patterns))
+        scanned = _scan_chunks(list(missing.values()), scanners, parallel, content)
+
+        found = dict(zip(missing, (
+            _Chunk(end, sequences) for (_, end), sequences in zip(missing.values(), scanned)
+        )))
+        with self._lock:
+            # Chunks scanned before an invalidation are not stored
+            if version == self._version:
+                self._entries.update(found)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return [entry if entry is not None else found[key] for key, entry in zip(keys, entries)]
+
+
+def _merge(
+    content: str,
+    scanner: BaseScanner,
+    cached: list[tuple[int, int, MatchSequences]],
+) -> MatchSequences:
+    """Rebase cached ``(chunk start, settled end, matches)`` onto *content*
+    and rescan the stretches between them."""
+    patterns = scanner.match_patterns() or []
+    settled = _settled_patterns(scanner)
+    ranges: list[tuple[int, int]] = []
+    parts: list[MatchSequences] = []
+    pos = 0
+    for start, end, sequences in cached:
+        lo, hi = start + HISTORY, start + end
+        if hi <= lo:
+            continue
+        if pos < lo:
+            ranges.append((pos, lo))
+            parts.append(_scan_between(content, scanner, settled, pos, lo))
+        ranges.append((lo, hi))
+        parts.append(_rebase(sequences, start))
+        pos = hi
+    if pos < len(content) or not ranges:
+        ranges.append((pos, len(content)))
+        parts.append(_scan_between(content, scanner, settled, pos, len(content)))
+
+    # Matches of patterns that can run through any text are not settled by
+    # a chunk; take them from one pass over the whole content instead
+    unsettled = [i for i in range(len(patterns)) if i not in settled]
+    for part in parts:
+        for i in unsettled:
+            part.spans[i] = []
+            part.checks.pop(i, None)
+    merged = merge_sequences(content, patterns, ranges, parts)
+    if unsettled:
+        whole = scanner.scan_range(content, 0, len(content), only=unsettled)
+        for i in unsettled:
+            merged.spans[i] = whole.spans[i]
+            if i in whole.checks:
+                merged.checks[i] = whole.checks[i]
+    return merged
+
+
+def _scan_between(
+    content: str,
+    scanner: BaseScanner,
+    settled: list[int],
+    start: int,
+    end: int,
+) -> MatchSequences:
+    """``scan_range`` of the *settled* patterns over the part of *content*
+    that decides their matches in ``[start, end)``.
+
+    Those matches read no further than the first stop character at or after
+    ``end - 1``, and look back at most ``HISTORY``.
+    """
+    patterns = scanner.match_patterns() or []
+    lo = max(0, start - HISTORY)
+    hi = end
+    for i in settled:
+        stop = stop_character(patterns[i]).search(content, max(0, end - 1))
+        if stop is None:
+            hi = len(content)
+            break
+        hi = max(hi, stop.start() + 2)
+    sequences = scanner.scan_range(content[lo:hi], start - lo, end - lo, settled)
+    return _rebase(sequences, lo) if lo else sequences
+
+
+def _settled_end(text: str, patterns: Sequence[re.Pattern[str]]) -> int:
+    """How far into *text* matches are settled by *text* alone.
+
+    Every stoppable pattern needs a stop character at or after the result
+    minus one and before the last character (which ``$`` may look past).
+    Returns ``HISTORY`` or less when the chunk settles nothing.
+    """
+    stoppers = [s for s in map(stop_character, patterns) if s is not None]
+    margin = HISTORY
+    while len(text) - margin > HISTORY:
+        end = len(text) - margin
+        if all(s.search(text, end - 1, len(text) - 1) is not None for s in stoppers):
+            return end
+        margin *= 2
+    return 0
+
+
+def _scan_chunks(
+    items: list[tuple[str, int]],
+    scanners: list[BaseScanner],
+    parallel: ParallelScanner | None,
+    content: str,
+) -> list[list[MatchSequences]]:
+    """Settled matches of every ``(chunk text, settled end)`` in *items*, per scanner."""
+    empty = [MatchSequences([]) for _ in scanners]
+    ranges = [(text, HISTORY, end) for text, end in items if end > HISTORY]
+    settled = [_settled_patterns(s) for s in scanners]
+    if parallel is not None and len(ranges) > 1 and parallel.applies(content):
+        scanned = iter(parallel.scan_ranges(ranges, scanners, settled))
+    else:
+        scanned = iter(
+            [s.scan_range(text, start, end, only) for s, only in zip(scanners, settled)]
+            for text, start, end in ranges
+        )
+    return [next(scanned) if end > HISTORY else empty for _, end in items]
+
+
+def _settled_patterns(scanner: BaseScanner) -> list[int]:
+    """Indices of the match patterns a stop character settles."""
+    patterns = scanner.match_patterns() or []
+    return [i for i, pattern in enumerate(patterns) if stop_character(pattern) is not None]
+
+
+def _rebase(sequences: MatchSequences, offset: int) -> MatchSequences:
+    return MatchSequences(
+        [[(s + offset, e + offset) for s, e in spans] for spans in sequences.spans],
+        {i: list(checks) for i, checks in sequences.checks.items()},
+    )
@@ -0,0 +1,327 @@
+"""Chunked scanning of large content on a process pool.
+
+Content is split into one range per worker.  Each worker receives the whole
+string and reports the matches ``finditer(content, start)`` finds inside its
+range (see :mod:`clawguard.scanners.ranges`), so lookarounds and matches
+running past the range end behave exactly as in a single pass.  The overlap
+is therefore exact rather than a fixed margin.  Where a match crosses into
+the next range, the parent rescans from it until its matches fall back in
+step with the next worker's, then hands the merged sequences to each
+scanner's :meth:`~clawguard.scanners.base.BaseScanner.assemble`.  The result
+equals a single-threaded scan.
+
+Batches of smaller items (:meth:`ParallelScanner.scan_many`) are spread over
+the same pool one item per task.  With a single worker, large content is
+scanned whole in the worker process, which keeps it off the server process.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import re
+import threading
+from collections.abc import Collection, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from clawguard.scanners.base import BaseScanner, FindingBatch, MatchSequences
+from clawguard.scanners.ranges import stop_character
+
+# Ranges shorter than this are not worth a worker of their own
+MIN_CHUNK_SIZE = 64 * 1024
+
+
+class ParallelScanner:
+    """Scans content of at least *min_size* characters on *workers* processes.
+
+    The pool is started on first use (or by :meth:`preload`) and shut down
+    by :meth:`close`.
+    """
+
+    def __init__(self, min_size: int, workers: int = 0) -> None:
+        self.min_size = min_size
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Executor | None = None
+        self._preloaded: bytes | None = None
+        self._lock = threading.Lock()
+
+    def applies(self, content: str) -> bool:
+        return len(content) >= self.min_size
+
+    def preload(self, scanners: Sequence[BaseScanner]) -> None:
+        """Start the pool with *scanners* unpickled and compiled in every worker."""
+        self.close()
+        self._preloaded = pickle.dumps(list(scanners))
+        executor = self._pool()
+        for _ in range(self.workers):
+            executor.submit(_ready)
+
+    def scan(self, content: str, scanners: Sequence[BaseScanner]) -> FindingBatch:
+        ranges = split_ranges(len(content), self.workers)
+        if len(ranges) == 1:
+            try:
+                return self._scan_items([(content, scanners)])[0]
+            except BrokenProcessPool:
+                self.close()
+                return _scan_whole(content, scanners)
+
+        chunked = [s for s in scanners if s.match_patterns() is not None]
+        merged: dict[int, MatchSequences] = {}
+        if chunked and len(ranges) > 1:
+            try:
+                merged = self._scan_chunked(content, chunked, ranges)
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool next time and scan here
+                self.close()
+
+        batch = FindingBatch(content)
+        for scanner in scanners:
+            sequences = merged.get(id(scanner))
+            if sequences is None:
+                batch.extend(scanner.scan_batch(content))
+            else:
+                batch.extend(scanner.assemble(content, sequences))
+        return batch
+
+    def scan_many(self, items: Sequence[tuple[str, Sequence[BaseScanner]]]) -> list[FindingBatch]:
+        """Scan several ``(content, scanners)`` items, spreading them over the pool.
+
+        Items large enough on their own are scanned in chunks; the rest run
+        one item per task once their total size reaches *min_size*.
+        """
+        results: list[FindingBatch | None] = [None] * len(items)
+        pooled: list[int] = []
+        for i, (content, scanners) in enumerate(items):
+            if self.applies(content):
+                results[i] = self.scan(content, scanners)
+            else:
+                pooled.append(i)
+
+        total = sum(len(items[i][0]) for i in pooled)
+        if pooled and total >= self.min_size:
+            try:
+                for i, batch in zip(pooled, self._scan_items([items[i] for i in pooled])):
+                    results[i] = batch
+            except BrokenProcessPool:
+                self.close()
+
+        for i in pooled:
+            if results[i] is None:
+                content, scanners = items[i]
+                results[i] = _scan_whole(content, scanners)
+        return [batch for batch in results if batch is not None]
+
+    def scan_ranges(
+        self,
+        items: Sequence[tuple[str, int, int]],
+        scanners: Sequence[BaseScanner],
+        only: Sequence[Collection[int] | None] | None = None,
+    ) -> list[list[MatchSequences]]:
+        """``scan_range`` of each scanner over every ``(content, start, end)`` item.
+
+        *only* gives each scanner's pattern selection.  Items are spread over
+        the pool one per task.
+        """
+        try:
+            executor = self._pool()
+            payload = pickle.dumps(list(scanners))
+            futures = [executor.submit(_scan_chunk, payload, *item, only) for item in items]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self.close()
+        return [_scan_ranges(scanners, *item, only) for item in items]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _scan_items(self, items: list[tuple[str, Sequence[BaseScanner]]]) -> list[FindingBatch]:
+        executor = self._pool()
+        payloads: dict[tuple[int, ...], bytes] = {}
+        futures = []
+        for content, scanners in items:
+            key = tuple(map(id, scanners))
+            if key not in payloads:
+                payloads[key] = pickle.dumps(list(scanners))
+            futures.append(executor.submit(_scan_item, payloads[key], content))
+        batches = []
+        for (content, _), future in zip(items, futures):
+            batch = future.result()
+            # Workers do not send the content back
+            batch.source = content
+            batches.append(batch)
+        return batches
+
+    def _pool(self) -> Executor:
+        # Scans run on several threads; only one may start the pool
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads or sockets
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_preload if self._preloaded is not None else None,
+                    initargs=(self._preloaded,) if self._preloaded is not None else (),
+                )
+            return self._executor
+
+    def _scan_chunked(
+        self,
+        content: str,
+        scanners: list[BaseScanner],
+        ranges: list[tuple[int, int]],
+    ) -> dict[int, MatchSequences]:
+        executor = self._pool()
+        payload = pickle.dumps(scanners)
+        futures = [
+            executor.submit(_scan_chunk, payload, content, start, end)
+            for start, end in ranges
+        ]
+        # results[chunk][scanner]
+        results = [future.result() for future in futures]
+        return {
+            id(scanner): merge_sequences(
+                content,
+                scanner.match_patterns() or [],
+                ranges,
+                [chunk[k] for chunk in results],
+            )
+            for k, scanner in enumerate(scanners)
+        }
+
+
+def _scan_whole(content: str, scanners: Sequence[BaseScanner]) -> FindingBatch:
+    batch = FindingBatch(content)
+    for scanner in scanners:
+        batch.extend(scanner.scan_batch(content))
+    return batch
+
+
+def _scan_ranges(
+    scanners: Sequence[BaseScanner],
+    content: str,
+    start: int,
+    end: int,
+    only: Sequence[Collection[int] | None] | None = None,
+) -> list[MatchSequences]:
+    selections = only if only is not None else [None] * len(scanners)
+    return [s.scan_range(content, start, end, sel) for s, sel in zip(scanners, selections)]
+
+
+def split_ranges(length: int, parts: int) -> list[tuple[int, int]]:
+    """Split ``[0, length)`` into up to *parts* contiguous ranges."""
+    parts = max(1, min(parts, length // MIN_CHUNK_SIZE))
+    bounds = [length * i // parts for i in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def merge_sequences(
+    content: str,
+    patterns: Sequence[re.Pattern[str]],
+    ranges: Sequence[tuple[int, int]],
+    chunks: Sequence[MatchSequences],
+) -> MatchSequences:
+    """Join per-range match sequences into the whole-content sequences."""
+    merged = MatchSequences([[] for _ in patterns])
+    checked = {i for chunk in chunks for i in chunk.checks}
+    for i in checked:
+        merged.checks[i] = []
+
+    for (start, end), chunk in zip(ranges, chunks):
+        for i, pattern in enumerate(patterns):
+            spans = chunk.spans[i]
+            checks = chunk.checks.get(i) if i in checked else None
+            if checks is None and i in checked:
+                checks = [None] * len(spans)
+
+            out = merged.spans[i]
+            if out:
+                prev_start, prev_end = out[-1]
+                if prev_end > start or prev_start == prev_end == start:
+                    skip = _resync(content, pattern, out, spans, end, merged.checks.get(i))
+                    spans = spans[skip:]
+                    checks = checks[skip:] if checks is not None else None
+
+            out.extend(spans)
+            if checks is not None:
+                merged.checks[i].extend(checks)
+    return merged
+
+
+def _resync(
+    content: str,
+    pattern: re.Pattern[str],
+    out: list[tuple[int, int]],
+    spans: list[tuple[int, int]],
+    end: int,
+    checks: list[bool | None] | None,
+) -> int:
+    """Continue *out* past a match that runs into the next range.
+
+    The next worker started scanning inside that match, so its first matches
+    may not exist in a whole-content scan.  Rescan from the last match until
+    a match coincides with one of the worker's; from there the two agree.
+    Returns how many of the worker's matches to drop.
+    """
+    index = {span: k for k, span in enumerate(spans)}
+    last = out[-1]
+    matches = pattern.finditer(content, last[0])
+    for match in matches:
+        if match.span() == last:
+            break
+    for match in matches:
+        span = match.span()
+        if span in index:
+            return index[span]
+        if span[0] >= end:
+            break
+        out.append(span)
+        if checks is not None:
+            checks.append(None)
+    return len(spans)
+
+
+# ── Worker side ──
+
+# Unpickled scanners by payload (one per scanner selection); a policy
+# change produces new payloads
+_worker_scanners: dict[bytes, list[BaseScanner]] = {}
+
+
+def _preload(payload: bytes) -> None:
+    # Compile the scanners' patterns and stop characters before the first task
+    for scanner in _unpickle_scanners(payload):
+        for pattern in scanner.match_patterns() or []:
+            stop_character(pattern)
+
+
+def _ready() -> None:
+    """No-op task that makes the pool start a worker."""
+
+
+def _unpickle_scanners(payload: bytes) -> list[BaseScanner]:
+    scanners = _worker_scanners.get(payload)
+    if scanners is None:
+        if len(_worker_scanners) >= 8:
+            _worker_scanners.clear()
+        scanners = _worker_scanners[payload] = pickle.loads(payload)
+    return scanners
+
+
+def _scan_item(payload: bytes, content: str) -> FindingBatch:
+    batch = _scan_whole(content, _unpickle_scanners(payload))
+    batch.source = ""
+    return batch
+
+
+def _scan_chunk(
+    payload: bytes,
+    content: str,
+    start: int,
+    end: int,
+    only: Sequence[Collection[int] | None] | None = None,
+) -> list[MatchSequences]:
+    return _scan_ranges(_unpickle_scanners(payload), content, start, end, only)
@@ -0,0 +1,298 @@
+"""Compiled multi-pattern matcher for the built-in pattern catalogs.
+
+``PatternSet`` replaces the one-``finditer``-per-pattern loop.  Patterns that
+open with the same literal character are merged into one named-group
+alternation, so the content is walked once per leading character instead of
+once per pattern.  Patterns that cannot be merged without changing their
+meaning (leading lookbehinds, character classes, flags, backreferences) keep
+a pass of their own.
+
+Before any regex runs, a :class:`~clawguard.scanners.prefilter.LiteralIndex`
+looks for every pattern's literal anchor.  Patterns whose anchor is absent
+are skipped, and patterns anchored at a fixed offset are only tried where
+their anchor was found.  Results are identical to running every pattern alone.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Collection, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, Protocol, TypeVar
+
+from clawguard.models.enums import Severity
+from clawguard.scanners.prefilter import Anchor, LiteralHits, LiteralIndex, extract_anchor
+from clawguard.scanners.ranges import finditer_range, search_limit
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+
+class CatalogPattern(Protocol):
+    """Shape shared by ``SecretPattern`` and ``PIIPattern``."""
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def pattern(self) -> re.Pattern[str]: ...
+
+    @property
+    def severity(self) -> Severity: ...
+
+
+P = TypeVar("P", bound=CatalogPattern)
+
+
+@dataclass(frozen=True)
+class PatternMatch(Generic[P]):
+    pattern: P
+    severity: Severity
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class _Group:
+    regex: re.Pattern[str]
+    # Indices into PatternSet.patterns, in alternation order
+    members: tuple[int, ...]
+    # Marker group name -> position in members
+    markers: dict[str, int]
+    # Literal anchors of the members; the pass is skipped if none is present
+    gates: tuple[Anchor | None, ...]
+
+    def live(self, hits: LiteralHits) -> bool:
+        return any(gate is None or hits.present(gate) for gate in self.gates)
+
+
+class PatternSet(Generic[P]):
+    """An immutable, compiled view of a pattern catalog.
+
+    Disabled patterns are dropped and severity overrides are resolved when the
+    set is built, so callers rebuild it whenever either changes.
+    *use_automaton* selects the literal search backend (default: automaton
+    if ``pyahocorasick`` is installed).
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[P],
+        disabled: Collection[str] = (),
+        severity_overrides: Mapping[str, Severity] | None = None,
+        use_automaton: bool | None = None,
+    ) -> None:
+        overrides = severity_overrides or {}
+        self.patterns: tuple[P, ...] = tuple(p for p in patterns if p.name not in disabled)
+        self.severities: tuple[Severity, ...] = tuple(
+            overrides.get(p.name, p.severity) for p in self.patterns
+        )
+        self.anchors: tuple[Anchor | None, ...] = tuple(
+            extract_anchor(p.pattern) for p in self.patterns
+        )
+
+        # Indexed patterns are matched at anchor hits; the rest run in groups
+        self._by_literal: dict[tuple[str, bool], list[int]] = {}
+        self._folded_indexed: list[int] = []
+        unindexed: list[int] = []
+        gates: list[tuple[str, bool]] = []
+        for i, anchor in enumerate(self.anchors):
+            if anchor is None or not anchor.indexed:
+                unindexed.append(i)
+                if anchor is not None:
+                    gates.extend((lit, anchor.folded) for lit in anchor.literals)
+                continue
+            for lit in anchor.literals:
+                self._by_literal.setdefault((lit, anchor.folded), []).append(i)
+            if anchor.folded:
+                self._folded_indexed.append(i)
+        self._groups = _build_groups(self.patterns, self.anchors, unindexed)
+        self._index = LiteralIndex(self._by_literal, gates, use_automaton=use_automaton)
+        # Indexed anchors for matches starting before ``end`` begin before this much past it
+        self._max_offset = max(
+            (a.offset or 0 for a in self.anchors if a is not None and a.indexed), default=0
+        )
+
+    @property
+    def pass_count(self) -> int:
+        """Most regex passes one scan makes over the whole content."""
+        return len(self._groups)
+
+    def scan(self, content: str) -> list[PatternMatch[P]]:
+        """Return every match, ordered by catalog position and then by offset.
+
+        Each pattern reports the same non-overlapping matches ``finditer``
+        would give it, even where matches of different patterns overlap.
+        """
+        return [
+            PatternMatch(pattern, self.severities[i], start, end)
+            for i, (pattern, found) in enumerate(zip(self.patterns, self.spans(content)))
+            for start, end in found
+        ]
+
+    def spans(
+        self,
+        content: str,
+        start: int = 0,
+        end: int | None = None,
+        only: Collection[int] | None = None,
+    ) -> list[list[tuple[int, int]]]:
+        """Like :meth:`scan`, as ``(start, end)`` lists indexed like ``patterns``.
+
+        With *start* and *end*, each list holds the matches that
+        ``finditer(content, start)`` reports before one starts at *end*.
+        With *only*, patterns at other indices may be left empty.
+        """
+        stop = len(content) if end is None else end
+        hits = self._index.search(content, start, stop + self._max_offset)
+        spans: list[list[tuple[int, int]]] = [[] for _ in self.patterns]
+        for group in self._groups:
+            if not group.live(hits):
+                continue
+            if only is not None and not any(i in only for i in group.members):
+                continue
+            if len(group.members) == 1:
+                bucket = spans[group.members[0]]
+                bucket.extend(m.span() for m in finditer_range(group.regex, content, start, stop))
+            else:
+                self._scan_family(group, content, spans, start, stop)
+
+        limit = _max_candidates(stop - start)
+        for i, starts in self._candidate_starts(hits, start, stop).items():
+            if only is not None and i not in only:
+                continue
+            pattern = self.patterns[i].pattern
+            if starts is None or len(starts) > limit:
+                spans[i].extend(m.span() for m in finditer_range(pattern, content, start, stop))
+                continue
+            resume = 0
+            for pos in sorted(starts):
+                if pos < resume:
+                    continue
+                match = pattern.match(content, pos)
+                if match is not None:
+                    spans[i].append(match.span())
+                    resume = match.end()
+
+        return spans
+
+    def _candidate_starts(
+        self, hits: LiteralHits, start: int, stop: int
+    ) -> dict[int, set[int] | None]:
+        """Map indexed patterns whose anchor occurred to their possible starts.
+
+        None means the starts are unknown and the pattern needs a full pass.
+        """
+        found: dict[int, set[int] | None] = {}
+        if not hits.folded_ok:
+            found.update((i, None) for i in self._folded_indexed)
+        for key, positions in hits.offsets.items():
+            for i in self._by_literal[key]:
+                starts = found.setdefault(i, set())
+                if starts is not None:
+                    offset = self.anchors[i].offset or 0
+                    starts.update(
+                        pos - offset for pos in positions if start <= pos - offset < stop
+                    )
+        return found
+
+    def _scan_family(
+        self,
+        group: _Group,
+        content: str,
+        spans: list[list[tuple[int, int]]],
+        pos: int,
+        stop: int,
+    ) -> None:
+        # The alternation reports one winner per position and consumes its
+        # span, so resume one character later and try the members after the
+        # winner at the same offset; members before it already failed there.
+        members = group.members
+        resume = [0] * len(members)
+        limit = search_limit(group.regex, content, stop)
+        while True:
+            match = group.regex.search(content, pos, limit)
+            if match is None or match.start() >= stop:
+                return
+            start = match.start()
+            winner = group.markers[match.lastgroup or ""]
+            for k in range(winner, len(members)):
+                if start < resume[k]:
+                    continue
+                if k == winner:
+                    end = match.end()
+                else:
+                    other = self.patterns[members[k]].pattern.match(content, start)
+                    if other is None:
+                        continue
+                    end = other.end()
+                spans[members[k]].append((start, end))
+                resume[k] = end
+            pos = start + 1
+
+
+def _max_candidates(length: int) -> int:
+    # Past this many anchor hits one finditer pass is cheaper than per-hit match()
+    return max(64, length // 256)
+
+
+def _build_groups(
+    patterns: Sequence[CatalogPattern],
+    anchors: Sequence[Anchor | None],
+    indices: Sequence[int],
+) -> list[_Group]:
+    families: dict[str, list[int]] = {}
+    groups: list[_Group] = []
+    for i in indices:
+        lead = _leading_literal(patterns[i].pattern)
+        if lead is None:
+            groups.append(_Group(patterns[i].pattern, (i,), {}, (anchors[i],)))
+        else:
+            families.setdefault(lead, []).append(i)
+
+    for members in families.values():
+        gates = tuple(anchors[i] for i in members)
+        if len(members) == 1:
+            groups.append(_Group(patterns[members[0]].pattern, (members[0],), {}, gates))
+            continue
+        # An empty marker group closes last, so ``lastgroup`` names the winner
+        regex = re.compile("|".join(
+            f"(?:{patterns[i].pattern.pattern})(?P<_p{i}>)" for i in members
+        ))
+        markers = {f"_p{i}": k for k, i in enumerate(members)}
+        groups.append(_Group(regex, tuple(members), markers, gates))
+
+    return groups
+
+
+def _leading_literal(pattern: re.Pattern[str]) -> str | None:
+    """Return the character *pattern* must start with, if it is safe to merge."""
+    if pattern.flags != re.UNICODE or pattern.groupindex:
+        return None
+    tree = sre_parse.parse(pattern.pattern)
+    if not tree.data or _has_backrefs(tree):
+        return None
+    op, av = tree.data[0]
+    if op is not sre_constants.LITERAL:
+        return None
+    return chr(av)
+
+
+def _has_backrefs(tree: Any) -> bool:
+    for op, av in tree.data:
+        if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            return True
+        if any(_has_backrefs(sub) for sub in _subpatterns(av)):
+            return True
+    return False
+
+
+def _subpatterns(av: Any) -> Iterator[Any]:
+    if isinstance(av, sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (list, tuple)):
+        for item in av:
+            yield from _subpatterns(item)
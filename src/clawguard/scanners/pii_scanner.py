@@ -1,45 +1,87 @@
 from __future__ import annotations
 
+import re
+from collections.abc import Collection
+
 from clawguard.models.enums import ScannerType, Severity
-from clawguard.scanners.base import BaseScanner, Finding
-from clawguard.scanners.patterns.pii import PII_PATTERNS
+from clawguard.scanners.base import BaseScanner, Finding, FindingBatch, MatchSequences
+from clawguard.scanners.pattern_set import PatternSet
+from clawguard.scanners.patterns.pii import PII_PATTERNS, PIIPattern
 
 
 class PIIScanner(BaseScanner):
     scanner_type = ScannerType.PII
 
     def __init__(self) -> None:
-        self.disabled_patterns: set[str] = set()
-        self.severity_overrides: dict[str, Severity] = {}
+        self._disabled_patterns: set[str] = set()
+        self._severity_overrides: dict[str, Severity] = {}
+        self._pattern_set: PatternSet[PIIPattern] = PatternSet(PII_PATTERNS)
+
+    @property
+    def disabled_patterns(self) -> set[str]:
+        return self._disabled_patterns
+
+    @disabled_patterns.setter
+    def disabled_patterns(self, value: set[str]) -> None:
+        self.configure(value, self._severity_overrides)
+
+    @property
+    def severity_overrides(self) -> dict[str, Severity]:
+        return self._severity_overrides
+
+    @severity_overrides.setter
+    def severity_overrides(self, value: dict[str, Severity]) -> None:
+        self.configure(self._disabled_patterns, value)
+
+    @property
+    def pattern_set(self) -> PatternSet[PIIPattern]:
+        return self._pattern_set
+
+    def configure(self, disabled_patterns: set[str], severity_overrides: dict[str, Severity]) -> None:
+        """Apply policy pattern settings and rebuild the compiled pattern set."""
+        self._disabled_patterns = set(disabled_patterns)
+        self._severity_overrides = dict(severity_overrides)
+        self._pattern_set = PatternSet(
+            PII_PATTERNS, self._disabled_patterns, self._severity_overrides
+        )
 
     def scan(self, content: str) -> list[Finding]:
-        findings: list[Finding] = []
+        return self.scan_batch(content).findings()
+
+    def scan_batch(self, content: str) -> FindingBatch:
+        return self.assemble(content, self.scan_range(content, 0, len(content)))
+
+    def match_patterns(self) -> list[re.Pattern[str]]:
+        return [p.pattern for p in self._pattern_set.patterns]
 
-        for pp in PII_PATTERNS:
-            if pp.name in self.disabled_patterns:
+    def scan_range(
+        self, content: str, start: int, end: int, only: Collection[int] | None = None
+    ) -> MatchSequences:
+        spans = self._pattern_set.spans(content, start, end, only)
+        # Run validator if defined (e.g. Luhn, SSN area-code check)
+        checks: dict[int, list[bool | None]] = {
+            i: [validator(content[s:e]) for s, e in found]
+            for i, (pattern, found) in enumerate(zip(self._pattern_set.patterns, spans))
+            if found and (validator := pattern.validator) is not None
+        }
+        return MatchSequences(spans, checks)
+
+    def assemble(self, content: str, matches: MatchSequences) -> FindingBatch:
+        batch = FindingBatch(content)
+
+        ps = self._pattern_set
+        for i, (pattern, severity, spans) in enumerate(zip(ps.patterns, ps.severities, matches.spans)):
+            if not spans:
                 continue
-            for match in pp.pattern.finditer(content):
-                matched_text = match.group(0)
-
-                # Run validator if defined (e.g. Luhn, SSN area-code check)
-                if pp.validator is not None and not pp.validator(matched_text):
-                    continue
-
-                effective_severity = self.severity_overrides.get(pp.name, pp.severity)
-                findings.append(Finding(
-                    scanner_type=self.scanner_type,
-                    finding_type=pp.name,
-                    severity=effective_severity,
-                    matched_text=matched_text,
-                    start=match.start(),
-                    end=match.end(),
-                    context=_extract_context(content, match.start(), match.end()),
-                ))
-
-        return findings
-
-
-def _extract_context(content: str, start: int, end: int, window: int = 30) -> str:
-    ctx_start = max(0, start - window)
-    ctx_end = min(len(content), end + window)
-    return content[ctx_start:ctx_end]
+            kind_id = batch.kind_id(self.scanner_type, pattern.name)
+            validator = pattern.validator
+            checks = matches.checks.get(i) or [None] * len(spans)
+            for (start, end), valid in zip(spans, checks):
+                if validator is not None:
+                    if valid is None:
+                        valid = validator(content[start:end])
+                    if not valid:
+                        continue
+                batch.append(kind_id, severity, start, end)
+
+        return batch
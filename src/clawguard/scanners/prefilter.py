@@ -0,0 +1,253 @@
+"""Literal-anchor prefilter for the regex pattern catalogs.
+
+Most built-in patterns can only match where some fixed string occurs
+(``AKIA``, ``ghp_``, ``-----BEGIN``, ``://``).  :func:`extract_anchor` pulls
+that string out of a compiled pattern, and :class:`LiteralIndex` looks for all
+anchors at once so :class:`~clawguard.scanners.pattern_set.PatternSet` can skip
+patterns whose anchor is absent and run the rest only where it was seen.
+
+The multi-literal search uses an Aho-Corasick automaton when the optional
+``pyahocorasick`` package is installed and falls back to ``str.find``
+otherwise; both give the same hits.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+try:
+    import ahocorasick
+except ImportError:  # optional dependency
+    ahocorasick = None
+
+# Anchors shorter than this only gate a full pass; longer ones at a fixed
+# offset also pick the positions where the regex is tried.
+MIN_INDEXED_LENGTH = 3
+
+_REPEATS = tuple(
+    op for op in (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        getattr(sre_constants, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+)
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+
+@dataclass(frozen=True)
+class Anchor:
+    """Literals, one of which every match of a pattern must contain."""
+
+    literals: tuple[str, ...]
+    # Distance from the start of a match to the literal; None if it varies
+    offset: int | None
+    # Literals are casefolded and are looked up in casefolded content
+    folded: bool
+
+    @property
+    def indexed(self) -> bool:
+        """Whether candidate match starts can be derived from literal hits."""
+        return self.offset is not None and min(map(len, self.literals)) >= MIN_INDEXED_LENGTH
+
+
+def extract_anchor(pattern: re.Pattern[str]) -> Anchor | None:
+    """Return the most selective literal anchor of *pattern*, or None."""
+    folded = bool(pattern.flags & re.IGNORECASE)
+    tree = sre_parse.parse(pattern.pattern, pattern.flags)
+
+    # Prefer anchors that can pick match positions, then longer literals
+    best: Anchor | None = None
+    best_key: tuple[bool, int, bool] = (False, 0, False)
+    for literals, offset in _candidates(tree, 0):
+        if folded:
+            # Casefolding only mirrors re.IGNORECASE for ASCII literals
+            if not all(lit.isascii() for lit in literals):
+                continue
+            literals = tuple(lit.casefold() for lit in literals)
+        anchor = Anchor(tuple(sorted(set(literals))), offset, folded)
+        key = (anchor.indexed, min(map(len, literals)), offset is not None)
+        if key > best_key:
+            best, best_key = anchor, key
+    return best
+
+
+def _candidates(tree: Any, offset: int | None) -> list[tuple[tuple[str, ...], int | None]]:
+    """Literal runs every match of *tree* contains, with their offsets."""
+    found: list[tuple[tuple[str, ...], int | None]] = []
+    run: list[str] = []
+    run_offset = offset
+    for op, av in tree.data:
+        if op is sre_constants.LITERAL:
+            if not run:
+                run_offset = offset
+            run.append(chr(av))
+        else:
+            if run:
+                found.append((("".join(run),), run_offset))
+                run = []
+            found.extend(_nested_candidates(op, av, offset))
+        lo, hi = sre_parse.SubPattern(tree.state, [(op, av)]).getwidth()
+        offset = offset + lo if offset is not None and lo == hi else None
+    if run:
+        found.append((("".join(run),), run_offset))
+    return found
+
+
+def _nested_candidates(op: Any, av: Any, offset: int | None) -> list[tuple[tuple[str, ...], int | None]]:
+    if op is sre_constants.SUBPATTERN:
+        _group, add_flags, del_flags, sub = av
+        if (add_flags | del_flags) & re.IGNORECASE:
+            return []
+        return _candidates(sub, offset)
+    if _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+        return _candidates(av, offset)
+    if op in _REPEATS:
+        lo, _hi, sub = av
+        # The first repetition starts where the repeat does
+        return _candidates(sub, offset) if lo >= 1 else []
+    if op is sre_constants.BRANCH:
+        prefixes = [_literal_prefix(alt) for alt in av[1]]
+        if all(prefixes):
+            return [(tuple(prefixes), offset)]
+    return []
+
+
+def _literal_prefix(tree: Any) -> str:
+    chars: list[str] = []
+    for op, av in tree.data:
+        if op is not sre_constants.LITERAL:
+            break
+        chars.append(chr(av))
+    return "".join(chars)
+
+
+def fold(content: str) -> str | None:
+    """Casefold *content* for folded-anchor lookups, keeping offsets aligned.
+
+    Returns None when folding changes the length (e.g. ``ß`` -> ``ss``), in
+    which case folded hits cannot be mapped back and callers must not gate.
+    """
+    folded = content.casefold()
+    if len(folded) != len(content):
+        return None
+    # re.IGNORECASE also equates the dotless i with i; casefold() does not
+    return folded.replace("ı", "i")
+
+
+class LiteralHits:
+    """Result of one :meth:`LiteralIndex.search`."""
+
+    def __init__(
+        self,
+        offsets: dict[tuple[str, bool], list[int]],
+        present: set[tuple[str, bool]],
+        folded_ok: bool,
+    ) -> None:
+        # Start offsets of every indexed literal that occurred
+        self.offsets = offsets
+        # False when folded literals could not be looked up (see fold())
+        self.folded_ok = folded_ok
+        self._present = present
+
+    def present(self, anchor: Anchor) -> bool:
+        """Whether any literal of *anchor* occurs in the content."""
+        if anchor.folded and not self.folded_ok:
+            return True
+        return any(
+            (lit, anchor.folded) in self._present or (lit, anchor.folded) in self.offsets
+            for lit in anchor.literals
+        )
+
+
+class LiteralIndex:
+    """Finds a fixed set of literals in content.
+
+    *indexed* literals are reported with every offset they occur at; *gates*
+    only with whether they occur at all.  Each entry is ``(literal, folded)``.
+    """
+
+    def __init__(
+        self,
+        indexed: Iterable[tuple[str, bool]],
+        gates: Iterable[tuple[str, bool]] = (),
+        use_automaton: bool | None = None,
+    ) -> None:
+        if use_automaton is None:
+            use_automaton = ahocorasick is not None
+        if use_automaton and ahocorasick is None:
+            raise RuntimeError("pyahocorasick is not installed")
+
+        self._indexed: dict[bool, list[str]] = {False: [], True: []}
+        for lit, folded in sorted(set(indexed)):
+            self._indexed[folded].append(lit)
+        self._gates: dict[bool, list[str]] = {False: [], True: []}
+        for lit, folded in sorted(set(gates)):
+            self._gates[folded].append(lit)
+
+        self._max_len = {
+            folded: max(map(len, lits), default=0) for folded, lits in self._indexed.items()
+        }
+
+        self._automata: dict[bool, Any] | None = None
+        if use_automaton:
+            self._automata = {
+                folded: _build_automaton(lits) for folded, lits in self._indexed.items() if lits
+            }
+
+    @property
+    def backend(self) -> str:
+        return "automaton" if self._automata is not None else "find"
+
+    def search(self, content: str, start: int = 0, stop: int | None = None) -> LiteralHits:
+        """Look for the literals in ``content[start:]``.
+
+        Indexed literals are reported where they begin before *stop*
+        (default: anywhere); gates wherever they occur after *start*.
+        Offsets are relative to *content*.
+        """
+        texts: dict[bool, str | None] = {False: content}
+        if self._indexed[True] or self._gates[True]:
+            # Folding keeps offsets aligned, so the folded tail is shifted by start
+            texts[True] = fold(content[start:]) if start else fold(content)
+
+        offsets: dict[tuple[str, bool], list[int]] = {}
+        present: set[tuple[str, bool]] = set()
+        for folded, text in texts.items():
+            if text is None:
+                continue
+            shift = start if folded else 0
+            lo = start - shift
+            hi = len(text) if stop is None else min(len(text), stop - shift + self._max_len[folded] - 1)
+            if self._indexed[folded] and lo < hi:
+                if self._automata is not None:
+                    for end, lit in self._automata[folded].iter(text, lo, hi):
+                        offsets.setdefault((lit, folded), []).append(end - len(lit) + 1 + shift)
+                else:
+                    for lit in self._indexed[folded]:
+                        pos = text.find(lit, lo, hi)
+                        while pos != -1:
+                            offsets.setdefault((lit, folded), []).append(pos + shift)
+                            pos = text.find(lit, pos + 1, hi)
+            present.update(
+                (lit, folded) for lit in self._gates[folded] if text.find(lit, lo) != -1
+            )
+
+        return LiteralHits(offsets, present, folded_ok=texts.get(True) is not None)
+
+
+def _build_automaton(literals: list[str]) -> Any:
+    automaton = ahocorasick.Automaton()
+    for lit in literals:
+        automaton.add_word(lit, lit)
+    automaton.make_automaton()
+    return automaton
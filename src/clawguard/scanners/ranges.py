@@ -0,0 +1,121 @@
+"""Exact regex matching over a range of a larger string.
+
+``finditer(content, start)`` stopped at the first match starting at or after
+*end* still searches the rest of the string when no such match exists.
+:func:`finditer_range` bounds that search: every character a pattern can
+consume is derived from its parse tree, and an attempt starting before *end*
+can never look past the first character after it that none of them accepts.
+Searching up to there with ``endpos`` gives exactly the same matches.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+from typing import Any
+
+try:  # Python 3.11+
+    from re import _compiler as sre_compile
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_compile  # type: ignore[no-redef]
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+# Operators that consume exactly one character
+_ATOMS = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.IN, sre_constants.ANY)
+# Every Basic Multilingual Plane character except surrogates
+_PROBE = "".join(map(chr, range(0xD800))) + "".join(map(chr, range(0xE000, 0x10000)))
+_State = getattr(sre_parse, "State", None) or sre_parse.Pattern  # renamed in 3.11
+
+# Compiled stop-character matchers by pattern; None when every character
+# may be consumed and searches cannot be bounded
+_stoppers: dict[tuple[str, int], re.Pattern[str] | None] = {}
+
+
+def finditer_range(
+    pattern: re.Pattern[str], content: str, start: int, end: int
+) -> Iterator[re.Match[str]]:
+    """Matches ``pattern.finditer(content, start)`` reports that start before *end*."""
+    for match in pattern.finditer(content, start, search_limit(pattern, content, end)):
+        if match.start() >= end:
+            return
+        yield match
+
+
+def search_limit(pattern: re.Pattern[str], content: str, end: int) -> int:
+    """An ``endpos`` that leaves every match attempt starting before *end* unchanged."""
+    if end >= len(content):
+        return len(content)
+    stopper = stop_character(pattern)
+    if stopper is None:
+        return len(content)
+    stop = stopper.search(content, max(0, end - 1))
+    if stop is None:
+        return len(content)
+    # Attempts starting at or before the stop character read no further
+    # than it, except ``$`` which also checks whether the next is the end
+    return min(len(content), stop.start() + 2)
+
+
+def stop_character(pattern: re.Pattern[str]) -> re.Pattern[str] | None:
+    """A regex matching one character *pattern* can never consume, or None."""
+    key = (pattern.pattern, pattern.flags)
+    if key not in _stoppers:
+        _stoppers[key] = _stopper(pattern)
+    return _stoppers[key]
+
+
+def _stopper(pattern: re.Pattern[str]) -> re.Pattern[str] | None:
+    """Compile a matcher for single characters *pattern* can never consume."""
+    tree = sre_parse.parse(pattern.pattern, pattern.flags)
+    atoms: list[tuple[Any, Any]] = []
+    if not _collect_atoms(tree, atoms):
+        return None
+    if not atoms:
+        return re.compile(r"[\s\S]")
+
+    # DOTALL widens "." to every character, which only over-approximates
+    flags = tree.state.flags | re.DOTALL
+    state = _State()
+    state.flags = flags
+    alternatives = [sre_parse.SubPattern(state, [atom]) for atom in atoms]
+    consumable = sre_parse.SubPattern(state, [(sre_constants.BRANCH, (None, alternatives))])
+    stopper = sre_parse.SubPattern(state, [
+        (sre_constants.ASSERT_NOT, (1, consumable)),
+        (sre_constants.ANY, None),
+    ])
+    compiled = sre_compile.compile(stopper, flags)
+    # Searching for a stop character that never occurs would cost as much as
+    # the unbounded search itself
+    return None if compiled.search(_PROBE) is None else compiled
+
+
+def _collect_atoms(tree: Any, atoms: list[tuple[Any, Any]]) -> bool:
+    """Gather the one-character operators of *tree*.
+
+    Returns False if the pattern scopes flags to a group, since the atoms
+    would then be compiled with the wrong flags.
+    """
+    for op, av in tree.data:
+        if op in _ATOMS:
+            atoms.append((op, av))
+        elif op is sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                return False
+            if not _collect_atoms(sub, atoms):
+                return False
+        else:
+            for sub in _subpatterns(av):
+                if not _collect_atoms(sub, atoms):
+                    return False
+    return True
+
+
+def _subpatterns(av: Any) -> Iterator[Any]:
+    if isinstance(av, sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (list, tuple)):
+        for item in av:
+            yield from _subpatterns(item)
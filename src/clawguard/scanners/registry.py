@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import TypeVar
+
 from clawguard.models.enums import ScannerType
-from clawguard.scanners.base import BaseScanner, Finding
+from clawguard.scanners.base import BaseScanner, FindingBatch
 from clawguard.scanners.custom_scanner import CustomScanner
+from clawguard.scanners.incremental import IncrementalScanner
+from clawguard.scanners.parallel import ParallelScanner
 from clawguard.scanners.pii_scanner import PIIScanner
 from clawguard.scanners.secret_scanner import SecretScanner
+from clawguard.scanners.stream import DEFAULT_WINDOW, StreamScanner
+
+T = TypeVar("T")
 
 
 class ScannerRegistry:
-    """Discovers, holds, and runs all registered scanners."""
+    """Discovers, holds, and runs all registered scanners.
+
+    Scans may run on several threads.  Changes to the scanners' patterns go
+    through :meth:`reconfigure`; a scan that overlaps one is run again.
+    """
 
     def __init__(self) -> None:
         self._scanners: dict[ScannerType, BaseScanner] = {}
+        self._parallel: ParallelScanner | None = None
+        self._incremental: IncrementalScanner | None = None
+        # Odd while scanners are being reconfigured
+        self._generation = 0
 
     def register(self, scanner: BaseScanner) -> None:
         self._scanners[scanner.scanner_type] = scanner
@@ -23,15 +41,129 @@ class ScannerRegistry:
     def scanner_types(self) -> list[ScannerType]:
         return list(self._scanners.keys())
 
-    def scan_all(self, content: str, only: list[ScannerType] | None = None) -> list[Finding]:
-        """Run all (or selected) scanners and return aggregated findings."""
-        findings: list[Finding] = []
-        for stype, scanner in self._scanners.items():
-            if only is not None and stype not in only:
-                continue
-            findings.extend(scanner.scan(content))
+    def enable_parallel(self, min_size: int, workers: int = 0) -> None:
+        """Scan content of at least *min_size* characters in chunks on a process pool.
+
+        *workers* defaults to the CPU count; results are unchanged.
+        """
+        self.close()
+        self._parallel = ParallelScanner(min_size, workers)
+
+    def enable_incremental(self, min_size: int, max_entries: int = 4096) -> None:
+        """Reuse cached matches of unchanged chunks in content of at least *min_size* characters.
+
+        Up to *max_entries* chunks are kept; results are unchanged.
+        """
+        self._incremental = IncrementalScanner(min_size, max_entries)
+
+    def warm_up(self) -> None:
+        """Start the parallel scan pool with the current scanners compiled in its workers."""
+        if self._parallel is not None:
+            self._parallel.preload(self._selected(None))
+
+    @contextmanager
+    def reconfigure(self) -> Iterator[None]:
+        """Change scanners' patterns inside this block; cached chunks are dropped after."""
+        self._generation += 1
+        try:
+            yield
+        finally:
+            self._generation += 1
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop cached chunk matches; call after changing a scanner's patterns."""
+        if self._incremental is not None:
+            self._incremental.invalidate()
+
+    def chunk_cache_stats(self) -> dict[str, int] | None:
+        """Counters of the chunk cache, or None if incremental scanning is off."""
+        if self._incremental is None:
+            return None
+        return self._incremental.stats()
+
+    def close(self) -> None:
+        """Shut down the parallel scan pool, if one was started."""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    def stream(self, only: list[ScannerType] | None = None, window: int = DEFAULT_WINDOW) -> StreamScanner:
+        """Start an incremental scan with all (or selected) scanners."""
+        return StreamScanner(self._selected(only), window)
+
+    def scan_all(self, content: str, only: list[ScannerType] | None = None) -> FindingBatch:
+        """Run all (or selected) scanners and return aggregated findings.
+
+        The batch is a ``Sequence[Finding]``; ``findings()`` gives a list.
+        """
+        return self._consistent(lambda: self._scan_all(content, only))
+
+    def _scan_all(self, content: str, only: list[ScannerType] | None) -> FindingBatch:
+        scanners = self._selected(only)
+        if self._incremental is not None and self._incremental.applies(content):
+            return self._incremental.scan(content, scanners, self._parallel)
+        if self._parallel is not None and self._parallel.applies(content):
+            return self._parallel.scan(content, scanners)
+
+        findings = FindingBatch(content)
+        for scanner in scanners:
+            findings.extend(scanner.scan_batch(content))
         return findings
 
+    def scan_many(
+        self, items: Sequence[tuple[str, list[ScannerType] | None]]
+    ) -> list[FindingBatch]:
+        """:meth:`scan_all` for several ``(content, only)`` items, in order.
+
+        With parallel scanning enabled, items share the process pool.
+        """
+        return self._consistent(lambda: self._scan_many(items))
+
+    def _scan_many(
+        self, items: Sequence[tuple[str, list[ScannerType] | None]]
+    ) -> list[FindingBatch]:
+        if self._parallel is None:
+            return [self._scan_all(content, only) for content, only in items]
+
+        incremental = self._incremental
+        results: list[FindingBatch | None] = [None] * len(items)
+        pooled: list[int] = []
+        for i, (content, only) in enumerate(items):
+            if incremental is not None and incremental.applies(content):
+                results[i] = self._scan_all(content, only)
+            else:
+                pooled.append(i)
+        scanned = self._parallel.scan_many(
+            [(items[i][0], self._selected(items[i][1])) for i in pooled]
+        )
+        for i, batch in zip(pooled, scanned):
+            results[i] = batch
+        return [batch for batch in results if batch is not None]
+
+    def _consistent(self, scan: Callable[[], T]) -> T:
+        """Run *scan* until no reconfiguration overlapped it."""
+        while True:
+            generation = self._generation
+            if generation % 2:
+                time.sleep(0.001)
+                continue
+            try:
+                result = scan()
+            except Exception:
+                # A scan may trip over patterns being swapped under it
+                if self._generation == generation:
+                    raise
+                continue
+            if self._generation == generation:
+                return result
+
+    def _selected(self, only: list[ScannerType] | None) -> list[BaseScanner]:
+        return [
+            scanner for stype, scanner in self._scanners.items()
+            if only is None or stype in only
+        ]
+
 
 def create_default_registry() -> ScannerRegistry:
     """Create a registry pre-loaded with all built-in scanners."""
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Collection
 
 from clawguard.models.enums import ScannerType, Severity
-from clawguard.scanners.base import BaseScanner, Finding
-from clawguard.scanners.patterns.secrets import SECRET_PATTERNS
-from clawguard.utils.entropy import is_high_entropy
+from clawguard.scanners.base import BaseScanner, Finding, FindingBatch, MatchSequences
+from clawguard.scanners.pattern_set import PatternSet
+from clawguard.scanners.ranges import finditer_range
+from clawguard.scanners.patterns.secrets import SECRET_PATTERNS, SecretPattern
+from clawguard.utils.entropy import batch_is_high_entropy
+from clawguard.utils.intervals import SpanIndex
+
+# Candidate tokens for entropy-based detection
+_ENTROPY_TOKEN = re.compile(r"[A-Za-z0-9+/=_\-]{20,}")
 
 
 class SecretScanner(BaseScanner):
@@ -14,57 +21,103 @@ class SecretScanner(BaseScanner):
     def __init__(self, entropy_threshold: float = 4.5, entropy_min_length: int = 20) -> None:
         self._entropy_threshold = entropy_threshold
         self._entropy_min_length = entropy_min_length
-        self.disabled_patterns: set[str] = set()
-        self.severity_overrides: dict[str, Severity] = {}
+        self._disabled_patterns: set[str] = set()
+        self._severity_overrides: dict[str, Severity] = {}
+        self._pattern_set: PatternSet[SecretPattern] = PatternSet(SECRET_PATTERNS)
+
+    @property
+    def disabled_patterns(self) -> set[str]:
+        return self._disabled_patterns
+
+    @disabled_patterns.setter
+    def disabled_patterns(self, value: set[str]) -> None:
+        self.configure(value, self._severity_overrides)
+
+    @property
+    def severity_overrides(self) -> dict[str, Severity]:
+        return self._severity_overrides
+
+    @severity_overrides.setter
+    def severity_overrides(self, value: dict[str, Severity]) -> None:
+        self.configure(self._disabled_patterns, value)
+
+    @property
+    def pattern_set(self) -> PatternSet[SecretPattern]:
+        return self._pattern_set
+
+    def configure(self, disabled_patterns: set[str], severity_overrides: dict[str, Severity]) -> None:
+        """Apply policy pattern settings and rebuild the compiled pattern set."""
+        self._disabled_patterns = set(disabled_patterns)
+        self._severity_overrides = dict(severity_overrides)
+        self._pattern_set = PatternSet(
+            SECRET_PATTERNS, self._disabled_patterns, self._severity_overrides
+        )
 
     def scan(self, content: str) -> list[Finding]:
-        findings: list[Finding] = []
+        return self.scan_batch(content).findings()
+
+    def scan_batch(self, content: str) -> FindingBatch:
+        return self.assemble(content, self.scan_range(content, 0, len(content)))
+
+    def match_patterns(self) -> list[re.Pattern[str]]:
+        # Catalog patterns, then the entropy candidate tokens
+        return [p.pattern for p in self._pattern_set.patterns] + [_ENTROPY_TOKEN]
+
+    def scan_range(
+        self, content: str, start: int, end: int, only: Collection[int] | None = None
+    ) -> MatchSequences:
+        spans = self._pattern_set.spans(content, start, end, only)
+        tokens: list[tuple[int, int]] = []
+        if only is None or len(spans) in only:
+            tokens = [m.span() for m in finditer_range(_ENTROPY_TOKEN, content, start, end)]
+
+        # Score tokens outside pattern matches in one batch; assemble()
+        # scores any others that turn out to be uncovered
+        covered = SpanIndex(span for found in spans for span in found)
+        uncovered = [span for span in tokens if not covered.covers(*span)]
+        flags = dict(zip(uncovered, batch_is_high_entropy(
+            [content[s:e] for s, e in uncovered],
+            self._entropy_threshold,
+            self._entropy_min_length,
+        )))
+        spans.append(tokens)
+        return MatchSequences(spans, {len(spans) - 1: [flags.get(span) for span in tokens]})
+
+    def assemble(self, content: str, matches: MatchSequences) -> FindingBatch:
+        batch = FindingBatch(content)
         seen_spans: set[tuple[int, int]] = set()
 
         # Pattern-based detection
-        for sp in SECRET_PATTERNS:
-            if sp.name in self.disabled_patterns:
+        ps = self._pattern_set
+        for pattern, severity, spans in zip(ps.patterns, ps.severities, matches.spans):
+            if not spans:
                 continue
-            for match in sp.pattern.finditer(content):
-                span = (match.start(), match.end())
+            kind_id = batch.kind_id(self.scanner_type, pattern.name, pattern.category)
+            for span in spans:
                 if span in seen_spans:
                     continue
                 seen_spans.add(span)
-                effective_severity = self.severity_overrides.get(sp.name, sp.severity)
-                findings.append(Finding(
-                    scanner_type=self.scanner_type,
-                    finding_type=sp.name,
-                    severity=effective_severity,
-                    matched_text=match.group(0),
-                    start=match.start(),
-                    end=match.end(),
-                    context=_extract_context(content, match.start(), match.end()),
-                    metadata={"category": sp.category},
-                ))
+                batch.append(kind_id, severity, *span)
 
         # Entropy-based detection for unmatched high-entropy tokens
-        for match in re.finditer(r"[A-Za-z0-9+/=_\-]{20,}", content):
-            span = (match.start(), match.end())
-            # Skip if already caught by a pattern
-            if any(s[0] <= span[0] and s[1] >= span[1] for s in seen_spans):
-                continue
-            token = match.group(0)
-            if is_high_entropy(token, self._entropy_threshold, self._entropy_min_length):
-                findings.append(Finding(
-                    scanner_type=self.scanner_type,
-                    finding_type="high_entropy_string",
-                    severity=Severity.MEDIUM,
-                    matched_text=token,
-                    start=match.start(),
-                    end=match.end(),
-                    context=_extract_context(content, match.start(), match.end()),
-                    metadata={"category": "entropy"},
-                ))
-
-        return findings
-
-
-def _extract_context(content: str, start: int, end: int, window: int = 30) -> str:
-    ctx_start = max(0, start - window)
-    ctx_end = min(len(content), end + window)
-    return content[ctx_start:ctx_end]
+        tokens = matches.spans[-1]
+        flags = matches.checks.get(len(matches.spans) - 1) or [None] * len(tokens)
+        covered = SpanIndex(seen_spans)
+        # Skip tokens already caught by a pattern
+        candidates = [
+            (span, flag) for span, flag in zip(tokens, flags) if not covered.covers(*span)
+        ]
+        unscored = [span for span, flag in candidates if flag is None]
+        scored = dict(zip(unscored, batch_is_high_entropy(
+            [content[s:e] for s, e in unscored],
+            self._entropy_threshold,
+            self._entropy_min_length,
+        )))
+        entropy_kind = batch.kind_id(self.scanner_type, "high_entropy_string", "entropy")
+        for span, flag in candidates:
+            if flag is None:
+                flag = scored[span]
+            if flag:
+                batch.append(entropy_kind, Severity.MEDIUM, *span)
+
+        return batch
@@ -0,0 +1,165 @@
+"""Incremental scanning of content that arrives in pieces.
+
+:class:`StreamScanner` keeps a bounded buffer of the stream.  Each round
+scans the buffer up to a *frontier* that trails its end: matches starting
+before the frontier are settled and reported, the text after it is carried
+over into the next round so patterns spanning a chunk edge still match.
+Matches that run across the frontier are stitched to the next round exactly
+as chunk boundaries are in :mod:`clawguard.scanners.parallel`.
+
+A frontier is exact for every pattern with a character it can never consume
+(see :mod:`clawguard.scanners.ranges`): the scanner waits until such a
+character follows it.  Patterns without one (e.g. ``[^;]+``) get a lookahead
+of a quarter of the window, and once the buffer reaches the window the
+frontier is forced, so memory stays bounded by the window.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from clawguard.scanners.base import BaseScanner, FindingBatch, MatchSequences
+from clawguard.scanners.parallel import merge_sequences
+from clawguard.scanners.ranges import search_limit, stop_character
+
+# Default stream window (characters buffered at most)
+DEFAULT_WINDOW = 1024 * 1024
+# Characters kept before the frontier for lookbehinds and \b
+HISTORY = 256
+
+
+@dataclass(slots=True)
+class StreamRound:
+    """Findings settled by one round of a :class:`StreamScanner`.
+
+    *findings* are over *text*, the buffer of the round, whose first
+    character is at *base* in the stream.  The round settles
+    ``text[start:end]``: every finding starting there is final, and no later
+    round reports a finding that starts before *end*.
+    """
+
+    text: str
+    base: int
+    start: int
+    end: int
+    findings: FindingBatch
+
+
+class StreamScanner:
+    """Scans a stream with *scanners*, buffering at most about *window* characters.
+
+    Call :meth:`feed` with each piece of text and :meth:`close` at the end of
+    the stream.  The rounds' findings equal a scan of the whole stream, up to
+    matches of unstoppable patterns longer than a quarter of the window.
+    """
+
+    def __init__(self, scanners: Sequence[BaseScanner], window: int = DEFAULT_WINDOW) -> None:
+        self._scanners = list(scanners)
+        self._patterns = [scanner.match_patterns() for scanner in self._scanners]
+        self._window = max(window, 8 * HISTORY)
+        self._lookahead = self._window // 4
+        self._stoppable = [
+            p for patterns in self._patterns if patterns is not None
+            for p in patterns if stop_character(p) is not None
+        ]
+        self._buffer = ""
+        self._base = 0
+        self._settled = 0
+        # Last match of every pattern, in stream offsets, by scanner
+        self._last: list[list[tuple[int, int] | None]] = [
+            [None] * len(patterns) if patterns is not None else [] for patterns in self._patterns
+        ]
+        self._closed = False
+
+    @property
+    def position(self) -> int:
+        """Characters fed so far."""
+        return self._base + len(self._buffer)
+
+    def feed(self, text: str) -> list[StreamRound]:
+        """Add *text* to the stream and return the rounds it settles."""
+        if self._closed:
+            raise ValueError("Stream already closed")
+        rounds: list[StreamRound] = []
+        step = self._window // 2
+        for i in range(0, len(text), step):
+            self._buffer += text[i:i + step]
+            end = len(self._buffer) - self._lookahead
+            if end <= self._settled - self._base:
+                continue
+            if len(self._buffer) >= self._window or self._is_settled(end):
+                rounds.append(self._advance(end))
+        return rounds
+
+    def close(self) -> StreamRound:
+        """Settle the rest of the stream."""
+        if self._closed:
+            raise ValueError("Stream already closed")
+        self._closed = True
+        return self._advance(len(self._buffer))
+
+    def _is_settled(self, end: int) -> bool:
+        # Every stoppable pattern must hit a stop character inside the buffer
+        return all(search_limit(p, self._buffer, end) < len(self._buffer) for p in self._stoppable)
+
+    def _advance(self, end: int) -> StreamRound:
+        text, base = self._buffer, self._base
+        start = self._settled - base
+        batch = FindingBatch(text)
+        for k, scanner in enumerate(self._scanners):
+            patterns = self._patterns[k]
+            if patterns is None:
+                # No range support: keep the buffer's findings that start in range
+                found = scanner.scan_batch(text)
+                batch.extend(FindingBatch.from_findings(
+                    text, [f for f in found if start <= f.start < end]
+                ))
+                continue
+            chunk = self._stitch(k, patterns, text, start, end, scanner.scan_range(text, start, end))
+            found = scanner.assemble(text, chunk)
+            if min(found.starts, default=start) < start:
+                # Carried matches still count for coverage (entropy tokens
+                # inside a secret) but were reported by the previous round
+                found = FindingBatch.from_findings(text, [f for f in found if f.start >= start])
+            batch.extend(found)
+
+        self._settled = base + end
+        self._trim(end)
+        return StreamRound(text, base, start, end, batch)
+
+    def _stitch(
+        self,
+        k: int,
+        patterns: Sequence[re.Pattern[str]],
+        text: str,
+        start: int,
+        end: int,
+        chunk: MatchSequences,
+    ) -> MatchSequences:
+        """Join *chunk* to the previous round's last matches, which it keeps."""
+        base = self._base
+        # Only matches reaching the frontier can shift the next ones
+        carried: list[list[tuple[int, int]]] = []
+        for span in self._last[k]:
+            if span is not None and span[0] >= base and span[1] >= base + start:
+                carried.append([(span[0] - base, span[1] - base)])
+            else:
+                carried.append([])
+        merged = merge_sequences(text, patterns, [(0, start), (start, end)], [MatchSequences(carried), chunk])
+        for i, spans in enumerate(merged.spans):
+            if spans:
+                self._last[k][i] = (spans[-1][0] + base, spans[-1][1] + base)
+        return merged
+
+    def _trim(self, end: int) -> None:
+        # Keep history before the frontier and the start of any match that
+        # runs across it, but never more than the window
+        keep = end - HISTORY
+        for last in self._last:
+            for span in last:
+                if span is not None and span[1] - self._base >= end:
+                    keep = min(keep, span[0] - self._base)
+        keep = max(0, keep, len(self._buffer) - self._window)
+        self._buffer = self._buffer[keep:]
+        self._base += keep
@@ -0,0 +1,148 @@
+"""Multi-process serving: ``python -m clawguard`` with ``workers > 1``.
+
+The supervisor compiles the scanners' patterns, starts the audit writer
+(:mod:`clawguard.db.audit_writer`), binds the listening socket and forks
+``workers`` server processes that accept on it.  Each server builds its own
+:class:`~clawguard.dependencies.ServiceContainer`; its ``re.compile`` calls
+hit the regex cache inherited from the supervisor, so the compiled patterns
+are shared copy-on-write.  Server processes that exit are replaced; SIGINT
+or SIGTERM stops the servers first and the audit writer last.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from multiprocessing.connection import Connection
+from types import FrameType
+
+import uvicorn
+
+from clawguard.app import create_app
+from clawguard.config import Settings
+from clawguard.db.audit_writer import run_audit_writer, send_connection
+from clawguard.db.session import reset_globals
+from clawguard.dependencies import ServiceContainer
+from clawguard.scanners.ranges import stop_character
+from clawguard.utils.ids import MAX_NODES
+
+# Seconds to wait for the audit writer to create the tables, and for
+# processes to exit once asked to
+STARTUP_TIMEOUT = 30.0
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def serve(settings: Settings) -> None:
+    """Serve the app on ``settings.workers`` processes until SIGINT or SIGTERM."""
+    # Processes are forked, so the supervisor must not start any threads
+    ctx = multiprocessing.get_context("fork")
+    # Servers take scan ID nodes node_id + index, the audit writer the next
+    if settings.node_id + settings.workers >= MAX_NODES:
+        raise ValueError(f"node_id + workers must be below {MAX_NODES}")
+    if settings.audit_log_path:
+        raise ValueError("The segment-log audit backend (audit_log_path) serves a single process")
+    if settings.parallel_scan_workers == 0:
+        # Share the cores between the servers' scan pools
+        workers = max(1, (os.cpu_count() or 1) // settings.workers)
+        settings = settings.model_copy(update={"parallel_scan_workers": workers})
+    _compile_patterns(settings)
+
+    pipes = [ctx.Pipe() for _ in range(settings.workers)]
+    control, writer_control = ctx.Pipe()
+    ready = ctx.Event()
+    writer = ctx.Process(
+        target=run_audit_writer,
+        args=(
+            settings.model_copy(update={"node_id": settings.node_id + settings.workers}),
+            [ours for ours, _ in pipes],
+            ready,
+            writer_control,
+        ),
+        name="clawguard-audit-writer",
+    )
+    writer.start()
+    if not ready.wait(STARTUP_TIMEOUT):
+        writer.terminate()
+        raise RuntimeError("audit writer did not start")
+
+    sock = _bind(settings.host, settings.port)
+    stopping = False
+
+    def stop(signum: int, frame: FrameType | None) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    def start(index: int, connection: Connection) -> multiprocessing.process.BaseProcess:
+        process = ctx.Process(
+            target=_run_server,
+            args=(settings.model_copy(update={"node_id": settings.node_id + index}), sock, connection),
+            name=f"clawguard-server-{index}",
+        )
+        process.start()
+        return process
+
+    def restart(index: int) -> multiprocessing.process.BaseProcess:
+        # A fresh pipe: the old one may hold answers to the dead process or
+        # part of a request it was sending
+        ours, theirs = ctx.Pipe()
+        send_connection(control, index, ours)
+        process = start(index, theirs)
+        ours.close()
+        theirs.close()
+        return process
+
+    servers = [start(i, pipes[i][1]) for i in range(settings.workers)]
+    try:
+        while not stopping and writer.is_alive():
+            for i, process in enumerate(servers):
+                if not process.is_alive():
+                    servers[i] = restart(i)
+            time.sleep(0.2)
+    finally:
+        for process in servers:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        for process in servers:
+            process.join(SHUTDOWN_TIMEOUT)
+        sock.close()
+        if writer.is_alive():
+            os.kill(writer.pid, signal.SIGTERM)
+        writer.join(SHUTDOWN_TIMEOUT)
+
+
+def _compile_patterns(settings: Settings) -> None:
+    """Build the scanners as a server would, filling the regex caches the
+    servers inherit."""
+    container = ServiceContainer(settings)
+    registry = container.registry
+    for scanner_type in registry.scanner_types:
+        for pattern in registry.get(scanner_type).match_patterns() or []:
+            stop_character(pattern)
+    container.close()
+    # Each server creates its own engine
+    reset_globals()
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_server(settings: Settings, sock: socket.socket, connection: Connection) -> None:
+    """Process target: serve the app on *sock*, logging through *connection*."""
+    # The supervisor's handlers are replaced by uvicorn's
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    app = create_app(settings, audit_connection=connection)
+    config = uvicorn.Config(app, log_level=settings.log_level.lower())
+    uvicorn.Server(config).run(sockets=[sock])
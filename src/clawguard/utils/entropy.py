@@ -1,7 +1,20 @@
 from __future__ import annotations
 
 import math
+import threading
 from collections import Counter
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# Batch scores this close to the threshold are rechecked with shannon_entropy,
+# so batch and scalar results agree despite different rounding.
+_TOLERANCE = 1e-9
+# Tokens per NumPy histogram block (block x 128 counts)
+_BLOCK = 4096
 
 
 def shannon_entropy(data: str) -> float:
@@ -30,3 +43,99 @@ def is_high_entropy(data: str, threshold: float = 4.5, min_length: int = 20) ->
     if len(data) < min_length:
         return False
     return shannon_entropy(data) > threshold
+
+
+def batch_shannon_entropy(tokens: Sequence[str], use_numpy: bool | None = None) -> list[float]:
+    """Shannon entropy of every token, in order.
+
+    Agrees with :func:`shannon_entropy` up to floating-point rounding.
+    Repeated tokens are scored once.  *use_numpy* selects the backend
+    (default: NumPy byte histograms if ``numpy`` is installed).
+    """
+    unique = list(dict.fromkeys(tokens))
+    scores = dict(zip(unique, _scores(unique, _want_numpy(use_numpy))))
+    return [scores[token] for token in tokens]
+
+
+def batch_is_high_entropy(
+    tokens: Sequence[str],
+    threshold: float = 4.5,
+    min_length: int = 20,
+    use_numpy: bool | None = None,
+) -> list[bool]:
+    """:func:`is_high_entropy` for every token, in order, with identical results."""
+    numpy_ok = _want_numpy(use_numpy)
+    candidates = [token for token in dict.fromkeys(tokens) if len(token) >= min_length]
+    if not numpy_ok:
+        # k distinct characters carry at most log2(k) bits, so hex and other
+        # small-alphabet tokens are ruled out without counting them
+        candidates = [
+            token for token in candidates if _max_entropy(token) >= threshold - _TOLERANCE
+        ]
+
+    flagged: set[str] = set()
+    for token, score in zip(candidates, _scores(candidates, numpy_ok)):
+        if abs(score - threshold) <= _TOLERANCE:
+            score = shannon_entropy(token)
+        if score > threshold:
+            flagged.add(token)
+    return [token in flagged for token in tokens]
+
+
+def _max_entropy(data: str) -> float:
+    distinct = len(set(data))
+    return math.log2(distinct) if distinct else 0.0
+
+
+def _want_numpy(use_numpy: bool | None) -> bool:
+    if use_numpy is None:
+        return np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("numpy is not installed")
+    return use_numpy
+
+
+def _scores(tokens: list[str], use_numpy: bool) -> list[float]:
+    if use_numpy and all(token.isascii() for token in tokens):
+        scores: list[float] = []
+        for i in range(0, len(tokens), _BLOCK):
+            scores.extend(_numpy_scores(tokens[i:i + _BLOCK]))
+        return scores
+    return [_counted_entropy(token) for token in tokens]
+
+
+def _counted_entropy(data: str) -> float:
+    # H = log2(n) - sum(c * log2(c)) / n, with c * log2(c) from a table
+    length = len(data)
+    if not length:
+        return 0.0
+    table = _clog_table(length)
+    return math.log2(length) - sum(map(table.__getitem__, Counter(data).values())) / length
+
+
+_CLOG: list[float] = [0.0]
+_CLOG_LOCK = threading.Lock()
+
+
+def _clog_table(length: int) -> list[float]:
+    """``c * log2(c)`` for every count up to *length* (grown on demand)."""
+    if len(_CLOG) <= length:
+        with _CLOG_LOCK:
+            for count in range(len(_CLOG), length + 1):
+                _CLOG.append(count * math.log2(count))
+    return _CLOG
+
+
+def _numpy_scores(tokens: list[str]) -> list[float]:
+    # One byte histogram per token, built from the concatenated buffer
+    n = len(tokens)
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+    if not n or not lengths.any():
+        return [0.0] * n
+    buf = np.frombuffer("".join(tokens).encode("ascii"), dtype=np.uint8)
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    hist = np.bincount(rows * 128 + buf, minlength=n * 128).reshape(n, 128)
+    clog = np.asarray(_clog_table(int(lengths.max())))
+    safe = np.maximum(lengths, 1)
+    scores = np.log2(safe) - clog[hist].sum(axis=1) / safe
+    return np.where(lengths > 0, scores, 0.0).tolist()
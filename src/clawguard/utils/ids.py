@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import datetime
+import threading
+import time
+from collections.abc import Callable
+
+# Scan IDs are 53-bit integers, exact as JSON numbers in JavaScript:
+# milliseconds since EPOCH, then the node, then a per-millisecond sequence
+EPOCH = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+NODE_BITS = 6
+SEQUENCE_BITS = 6
+MAX_NODES = 1 << NODE_BITS
+
+_EPOCH_MS = int(EPOCH.timestamp() * 1000)
+
+
+class ScanIdGenerator:
+    """Time-ordered scan IDs, unique across the processes given distinct *node* numbers.
+
+    IDs generated by one generator strictly increase, even if the clock steps
+    back; when the sequence of a millisecond runs out, the next one is borrowed.
+    """
+
+    def __init__(self, node: int = 0, clock: Callable[[], float] = time.time) -> None:
+        if not 0 <= node < MAX_NODES:
+            raise ValueError(f"node must be in [0, {MAX_NODES})")
+        self.node = node
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last = -1
+
+    def next_id(self) -> int:
+        with self._lock:
+            now = (int(self._clock() * 1000) - _EPOCH_MS) << SEQUENCE_BITS
+            # Within the millisecond of the last ID (or behind it), take the next sequence number
+            self._last = max(now, self._last + 1)
+            ms, sequence = divmod(self._last, 1 << SEQUENCE_BITS)
+            return (ms << (NODE_BITS + SEQUENCE_BITS)) | (self.node << SEQUENCE_BITS) | sequence
+
+
+def scan_id_time(scan_id: int) -> datetime.datetime:
+    """When *scan_id* was generated (UTC)."""
+    ms = scan_id >> (NODE_BITS + SEQUENCE_BITS)
+    return EPOCH + datetime.timedelta(milliseconds=ms)
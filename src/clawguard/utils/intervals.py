@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable
+
+
+class SpanIndex:
+    """Sorted index of ``(start, end)`` spans for coverage queries.
+
+    Spans are kept sorted by start alongside a running maximum of their ends,
+    so whether any indexed span contains a query span is one bisect.  Spans
+    may be added at any time; the index is re-sorted on the next query.
+    """
+
+    def __init__(self, spans: Iterable[tuple[int, int]] = ()) -> None:
+        self._spans: list[tuple[int, int]] = list(spans)
+        self._starts: list[int] = []
+        self._max_ends: list[int] = []
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def add(self, start: int, end: int) -> None:
+        self._spans.append((start, end))
+        self._dirty = True
+
+    def covers(self, start: int, end: int) -> bool:
+        """Whether some indexed span contains ``[start, end)``."""
+        if self._dirty:
+            self._rebuild()
+        # Of the spans starting at or before *start*, the one reaching
+        # furthest decides
+        i = bisect_right(self._starts, start) - 1
+        return i >= 0 and self._max_ends[i] >= end
+
+    def _rebuild(self) -> None:
+        self._spans.sort()
+        self._starts = [start for start, _ in self._spans]
+        self._max_ends = []
+        reach = -1
+        for _, end in self._spans:
+            reach = max(reach, end)
+            self._max_ends.append(reach)
+        self._dirty = False
@@ -28,6 +28,7 @@ def settings(tmp_path):
     return Settings(
         database_url=f"sqlite+aiosqlite:///{db_path}",
         policy_path=policy_path,
+        audit_journal_path=str(tmp_path / "journal"),
         host="127.0.0.1",
         port=0,
     )
@@ -56,13 +57,17 @@ async def client(settings):
 
     # Initialize the container and DB before running tests
     container = init_container(settings)
-    await init_db(container.engine)
+    if container.engine is not None:
+        await init_db(container.engine)
 
     app = create_app(settings)
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as c:
         yield c
 
-    await close_db(container.engine)
+    await container.audit_repo.close()
+    for engine in (container.read_engine, container.engine):
+        if engine is not None:
+            await close_db(engine)
     deps._container = None
     reset_globals()
@@ -14,3 +14,15 @@ async def test_health_ok(client):
     assert "PII" in data["scanners"]
     assert "CUSTOM" in data["scanners"]
     assert data["policy_loaded"] is True
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_audit_queue(client):
+    await client.post("/api/v1/scan", json={"content": "ssn: 123-45-6789"})
+    # Reading the audit log waits for the queued event to be written
+    assert len((await client.get("/api/v1/audit")).json()) == 1
+    queue = (await client.get("/api/v1/metrics")).json()["audit_queue"]
+    assert queue["depth"] == 0
+    assert queue["written"] == 1
+    assert queue["batches"] == 1
+    assert queue["max_depth"] == 10_000
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def server(settings):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = {
+        **os.environ,
+        "CLAWGUARD_WORKERS": "2",
+        "CLAWGUARD_HOST": "127.0.0.1",
+        "CLAWGUARD_PORT": str(port),
+        "CLAWGUARD_DATABASE_URL": settings.database_url,
+        "CLAWGUARD_POLICY_PATH": settings.policy_path,
+        "CLAWGUARD_LOG_LEVEL": "WARNING",
+    }
+    process = subprocess.Popen([sys.executable, "-m", "clawguard"], env=env)
+    base_url = f"http://127.0.0.1:{port}/api/v1"
+    try:
+        for _ in range(300):
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(60) == 0
+
+
+def test_workers_share_audit_log_and_policy(server):
+    body = {"content": "ssn: 123-45-6789", "agent_id": "workers"}
+    # A fresh connection per request spreads them over the workers
+    ids = [httpx.post(f"{server}/scan", json=body).json()["scan_id"] for _ in range(8)]
+    assert len(set(ids)) == 8
+    events = httpx.get(f"{server}/audit", params={"agent_id": "workers"}).json()
+    assert sorted(e["id"] for e in events) == sorted(ids)
+
+    policy = httpx.get(f"{server}/policy").json()
+    policy["disabled_patterns"] = ["ssn"]
+    assert httpx.put(f"{server}/policy", json=policy).status_code == 200
+    time.sleep(0.5)
+    for _ in range(8):
+        assert httpx.post(f"{server}/scan", json=body).json()["findings_count"] == 0
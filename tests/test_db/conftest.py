@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+from sqlalchemy import text
+
+from clawguard.scanners.base import FindingBatch
+
+TIMESTAMP = datetime.datetime(2026, 3, 1, 12, 0, 0)
+
+FINDING = {
+    "scanner_type": "PII",
+    "finding_type": "ssn",
+    "severity": "CRITICAL",
+    "start_offset": 5,
+    "end_offset": 16,
+    "redacted_snippet": "123-***6789",
+}
+
+# The audit tables of databases from before the compact schema
+LEGACY_TABLES = (
+    "CREATE TABLE scan_events (id INTEGER NOT NULL PRIMARY KEY, timestamp DATETIME NOT NULL,"
+    " agent_id VARCHAR(255), destination VARCHAR(1024), content_hash VARCHAR(64) NOT NULL,"
+    " action VARCHAR(10) NOT NULL, findings_count INTEGER NOT NULL, duration_ms FLOAT NOT NULL)",
+    "CREATE TABLE findings (id INTEGER NOT NULL PRIMARY KEY, scan_event_id INTEGER NOT NULL"
+    " REFERENCES scan_events (id), scanner_type VARCHAR(20) NOT NULL, finding_type VARCHAR(100) NOT NULL,"
+    " severity VARCHAR(10) NOT NULL, start_offset INTEGER NOT NULL, end_offset INTEGER NOT NULL,"
+    " redacted_snippet TEXT)",
+)
+
+
+def _audit_event(event_id=None, timestamp=TIMESTAMP, *, findings=(), **fields):
+    """An audit event with *fields* over the defaults, and *findings*: dicts
+    of fields over :data:`FINDING`, or a scanner's :class:`FindingBatch`.
+
+    With an *event_id* it is a row as ``write_events`` and the journal take
+    it, with its ID and *timestamp* and finding rows; without, an event as
+    ``log_scan`` takes it.
+    """
+    if not isinstance(findings, FindingBatch):
+        findings = [{**FINDING, **finding} for finding in findings]
+    event = {
+        "agent_id": "agent",
+        "destination": None,
+        "content_hash": "abc",
+        "action": "REDACT" if findings else "ALLOW",
+        "findings_count": len(findings),
+        "duration_ms": 1.0,
+        **fields,
+        "findings": findings,
+    }
+    if event_id is not None:
+        event = {"id": event_id, "timestamp": timestamp, **event}
+        for finding in event["findings"]:
+            finding["scan_event_id"] = event_id
+    return event
+
+
+async def _legacy_database(engine, events):
+    """Replace the audit tables of *engine* with those from before the
+    compact schema, holding the event rows *events*."""
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE findings"))
+        await conn.execute(text("DROP TABLE scan_events"))
+        for statement in LEGACY_TABLES:
+            await conn.execute(text(statement))
+        await conn.execute(
+            text("INSERT INTO scan_events VALUES (:id, :timestamp, :agent_id, :destination, :content_hash,"
+                 " :action, :findings_count, :duration_ms)"),
+            [{k: v for k, v in event.items() if k != "findings"} for event in events],
+        )
+        findings = [finding for event in events for finding in event["findings"]]
+        if findings:
+            await conn.execute(
+                text("INSERT INTO findings (scan_event_id, scanner_type, finding_type, severity, start_offset,"
+                     " end_offset, redacted_snippet) VALUES (:scan_event_id, :scanner_type, :finding_type,"
+                     " :severity, :start_offset, :end_offset, :redacted_snippet)"),
+                findings,
+            )
+
+
+@pytest.fixture
+def audit_event():
+    return _audit_event
+
+
+@pytest.fixture
+def legacy_database():
+    return _legacy_database
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import datetime
+
 import pytest
 import pytest_asyncio
+from sqlalchemy import event, text
 
 from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.repository import encode_cursor
 
 
 @pytest_asyncio.fixture
@@ -121,3 +125,138 @@ async def test_filter_by_action(repo):
     results = await repo.query_events(action="ALLOW")
     assert len(results) == 1
     assert results[0]["action"] == "ALLOW"
+
+
+@pytest.mark.asyncio
+async def test_log_scans_in_order(repo, audit_event):
+    ids = await repo.log_scans([
+        audit_event(agent_id=f"batch-{i}", content_hash=f"h{i}", findings=[{}]) for i in range(3)
+    ])
+    assert len(ids) == 3 and ids == sorted(ids)
+    for i, event_id in enumerate(ids):
+        event = await repo.get_event(event_id)
+        assert event["agent_id"] == f"batch-{i}"
+        assert len(event["findings"]) == 1
+    assert await repo.log_scans([]) == []
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages(repo, audit_event):
+    # Pairs of events share a timestamp; the ID breaks the tie
+    base = datetime.datetime(2026, 3, 1, 12, 0, 0, 500)
+    await repo.write_events([audit_event(i, base + datetime.timedelta(seconds=i // 2)) for i in range(1, 8)])
+
+    seen, cursor = [], None
+    while True:
+        page = await repo.query_events(limit=3, cursor=cursor)
+        seen += [e["id"] for e in page]
+        if len(page) < 3:
+            break
+        cursor = encode_cursor(page[-1])
+        # Events logged after the first page do not shift the next ones
+        await repo.write_events([audit_event(100 + len(seen), base + datetime.timedelta(hours=1))])
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_time_range(repo, audit_event):
+    base = datetime.datetime(2026, 3, 1)
+    await repo.write_events([audit_event(i, base + datetime.timedelta(hours=i)) for i in range(1, 6)])
+    events = await repo.query_events(
+        since=base + datetime.timedelta(hours=2),
+        until=(base + datetime.timedelta(hours=4)).replace(tzinfo=datetime.timezone.utc),
+    )
+    assert [e["id"] for e in events] == [3, 2]
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(repo):
+    with pytest.raises(ValueError):
+        await repo.query_events(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_export_events(repo, audit_event):
+    base = datetime.datetime(2026, 3, 1)
+    events = [audit_event(i, base + datetime.timedelta(minutes=i)) for i in range(1, 6)]
+    events[2] = audit_event(3, base + datetime.timedelta(minutes=3), action="BLOCK", findings=[{
+        "scanner_type": "SECRET", "finding_type": "aws_access_key_id", "start_offset": 0, "end_offset": 20,
+        "redacted_snippet": None,
+    }])
+    await repo.write_events(events)
+
+    batches = [batch async for batch in repo.export_events(batch_size=2)]
+    assert [[e["id"] for e in batch] for batch in batches] == [[1, 2], [3, 4], [5]]
+    exported = [e for batch in batches for e in batch]
+    assert exported[2]["findings"][0]["finding_type"] == "aws_access_key_id"
+    assert [e["findings"] for e in exported[:2]] == [[], []]
+    # Exported entries are the ones query_events returns
+    assert exported == list(reversed(await repo.query_events()))
+
+    batches = [batch async for batch in repo.export_events(
+        action="ALLOW", since=base + datetime.timedelta(minutes=2), until=base + datetime.timedelta(minutes=5),
+    )]
+    assert [[e["id"] for e in batch] for batch in batches] == [[2, 4]]
+
+
+@pytest.mark.asyncio
+async def test_compact_storage(repo, session_factory, engine, audit_event):
+    digest = "3f" * 32
+    finding = {"scanner_type": "SECRET", "finding_type": "aws_key", "severity": "CRITICAL",
+               "start_offset": 4, "end_offset": 24, "redacted_snippet": "AKIA****"}
+    for agent_id in ("agent-a", "agent-a", "agent-b"):
+        await repo.log_scan(audit_event(
+            agent_id=agent_id, destination="api.example.com", content_hash=digest, action="BLOCK", findings=[finding],
+        ))
+
+    async with engine.connect() as conn:
+        row = (await conn.execute(text(
+            "SELECT timestamp, agent_ref, content_hash, action FROM scan_events ORDER BY id LIMIT 1"
+        ))).one()
+        assert isinstance(row.timestamp, int) and isinstance(row.agent_ref, int)
+        assert row.content_hash == bytes.fromhex(digest) and row.action == 1
+        severity, = (await conn.execute(text("SELECT DISTINCT severity FROM findings"))).one()
+        assert severity == 3
+        for table, count in (("agents", 2), ("destinations", 1), ("finding_types", 1)):
+            assert (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar() == count
+
+    # Read back as logged, also by a repository with nothing cached
+    for reader in (repo, SQLAlchemyAuditRepository(session_factory)):
+        entries = await reader.query_events(agent_id="agent-a")
+        assert [e["agent_id"] for e in entries] == ["agent-a", "agent-a"]
+        assert entries[0]["content_hash"] == digest
+        assert entries[0]["destination"] == "api.example.com"
+        assert {k: v for k, v in entries[0]["findings"][0].items() if k != "id"} == finding
+    assert await repo.query_events(action="NOT-AN-ACTION") == []
+    assert await repo.query_events(destination="unknown.example.com") == []
+
+
+@pytest.mark.asyncio
+async def test_audit_queries_use_indexes(repo, engine, audit_event):
+    await repo.log_scan(audit_event(
+        agent_id="a", destination="d", action="ALLOW", findings=[{"severity": "LOW", "redacted_snippet": None}],
+    ))
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await repo.query_events()
+        for column in ("agent_id", "destination", "action"):
+            await repo.query_events(**{column: "x"})
+        await repo.get_stats()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = [row[-1] for row in await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            # Every table is read through an index or by key, never sorted by timestamp
+            assert all(
+                "INDEX" in step or "PRIMARY KEY" in step for step in plan if step.startswith(("SCAN", "SEARCH"))
+            ), (statement, plan)
+            if "ORDER BY scan_events.timestamp" in statement:
+                assert not any("TEMP B-TREE" in step for step in plan), (statement, plan)
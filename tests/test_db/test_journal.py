@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+import pytest
+import pytest_asyncio
+
+from clawguard.db import write_behind
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.journal import AuditJournal
+from clawguard.db.write_behind import WriteBehindAuditRepository
+from clawguard.utils.ids import ScanIdGenerator
+
+TIMESTAMP = datetime.datetime(2026, 3, 1, 12, 0, 0, 123456)
+
+
+@pytest_asyncio.fixture
+async def repo(session_factory):
+    return SQLAlchemyAuditRepository(session_factory)
+
+
+def test_records_round_trip(tmp_path, audit_event):
+    journal = AuditJournal(tmp_path / "journal")
+    rows = [audit_event(event_id, TIMESTAMP, findings=[{}]) for event_id in (1, 2, 3)]
+    journal.append(rows[:2])
+    journal.append(rows[2:])
+    [segment] = journal.sealed()
+    assert list(journal.read(segment)) == rows
+    assert journal.size() == segment.stat().st_size
+
+
+def test_torn_record_ends_segment(tmp_path, audit_event):
+    journal = AuditJournal(tmp_path / "journal")
+    journal.append([audit_event(event_id, TIMESTAMP, findings=[{}]) for event_id in (1, 2)])
+    [segment] = journal.sealed()
+    data = segment.read_bytes()
+    segment.write_bytes(data[:-3])
+    assert [event["id"] for event in journal.read(segment)] == [1]
+
+    # A flipped byte fails the CRC
+    corrupted = bytearray(data)
+    corrupted[12] ^= 0xFF
+    segment.write_bytes(bytes(corrupted))
+    assert list(journal.read(segment)) == []
+
+
+def test_sealed_segments_take_no_more_appends(tmp_path, audit_event):
+    journal = AuditJournal(tmp_path / "journal", segment_size=1)
+    journal.append([audit_event(1, TIMESTAMP)])
+    journal.append([audit_event(2, TIMESTAMP)])
+    sealed = journal.sealed()
+    assert len(sealed) == 2
+    journal.append([audit_event(3, TIMESTAMP)])
+    assert [s for s in journal.sealed() if s not in sealed]
+    journal.remove(sealed[0])
+    assert len(journal.sealed()) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_spill_and_replay(repo, tmp_path, audit_event):
+    write_events = repo.write_events
+    down = True
+
+    async def unavailable(events, skip_existing=False):
+        if down:
+            raise OSError("database is locked")
+        return await write_events(events, skip_existing)
+
+    repo.write_events = unavailable
+    journal = AuditJournal(tmp_path / "journal")
+    queue = WriteBehindAuditRepository(repo, journal=journal, replay_interval=0.01)
+    try:
+        ids = await queue.log_scans([audit_event(findings=[{}]) for _ in range(5)])
+        await queue.flush()
+        stats = queue.stats()
+        assert stats["spilled"] == 5
+        assert stats["journal_bytes"] > 0
+        assert stats["dropped"] == 0
+
+        down = False
+        for _ in range(200):
+            if queue.stats()["replayed"] == 5:
+                break
+            await asyncio.sleep(0.01)
+        assert sorted(e["id"] for e in await queue.query_events()) == sorted(ids)
+        assert journal.size() == 0
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_broken_journal_does_not_stop_writer(repo, tmp_path, monkeypatch, audit_event):
+    monkeypatch.setattr(write_behind, "RETRY_DELAY", 0)
+    write_events = repo.write_events
+    down = True
+
+    async def unavailable(events, skip_existing=False):
+        if down:
+            raise OSError("database is locked")
+        return await write_events(events, skip_existing)
+
+    repo.write_events = unavailable
+    # The journal directory cannot be created where a file is
+    (tmp_path / "journal").write_text("")
+    queue = WriteBehindAuditRepository(repo, journal=AuditJournal(tmp_path / "journal"), replay_interval=0.01)
+    try:
+        await queue.log_scans([audit_event(findings=[{}]) for _ in range(3)])
+        await asyncio.wait_for(queue.flush(), 5)
+        stats = queue.stats()
+        assert stats["spilled"] == 0
+        assert stats["dropped"] == 3
+
+        # The writer goes on with the next batch
+        down = False
+        event_id = await queue.log_scan(audit_event(agent_id="later", findings=[{}]))
+        assert await asyncio.wait_for(queue.get_event(event_id), 5) is not None
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_stalled_write_spills_without_duplicates(repo, tmp_path, audit_event):
+    write_events = repo.write_events
+    stalled = True
+
+    async def commit_then_stall(events, skip_existing=False):
+        written = await write_events(events, skip_existing)
+        if stalled:
+            await asyncio.sleep(10)
+        return written
+
+    repo.write_events = commit_then_stall
+    queue = WriteBehindAuditRepository(
+        repo, journal=AuditJournal(tmp_path / "journal"), spill_after=0.05, replay_interval=0.01,
+    )
+    try:
+        await queue.log_scans([audit_event(findings=[{}]) for _ in range(3)])
+        await queue.flush()
+        assert queue.stats()["spilled"] == 3
+        stalled = False
+        for _ in range(200):
+            if queue.journal.size() == 0:
+                break
+            await asyncio.sleep(0.01)
+        # The write committed before it was given up on; the replay skips it
+        assert queue.stats()["replayed"] == 0
+        assert len(await queue.query_events()) == 3
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_after_crash_skips_written_events(repo, tmp_path, audit_event):
+    ids = ScanIdGenerator()
+    rows = [audit_event(ids.next_id(), TIMESTAMP, findings=[{}]) for _ in range(4)]
+    journal = AuditJournal(tmp_path / "journal")
+    journal.append(rows)
+    # The previous run wrote half of the segment before it crashed
+    await repo.write_events(rows[:2])
+
+    queue = WriteBehindAuditRepository(repo, journal=journal)
+    queue.start()
+    try:
+        for _ in range(200):
+            if journal.size() == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert queue.stats()["replayed"] == 2
+        events = await repo.query_events()
+        assert sorted(e["id"] for e in events) == sorted(r["id"] for r in rows)
+        assert sum(len(e["findings"]) for e in events) == 4
+    finally:
+        await queue.close()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.migrations import MIGRATIONS, schema_version
+from clawguard.db.models import FindingRecord, ScanEvent
+from clawguard.db.session import init_db
+
+
+async def _indexes(engine, table):
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda c: {i["name"] for i in inspect(c).get_indexes(table)})
+
+
+async def _version(engine):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(schema_version.c.version))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_new_database_is_at_latest_version(engine):
+    await init_db(engine)
+    assert await _version(engine) == len(MIGRATIONS)
+    assert "ix_scan_events_agent_ref_timestamp" in await _indexes(engine, "scan_events")
+
+
+def test_scan_ids_are_64_bit():
+    # PostgreSQL's INTEGER would overflow on 53-bit scan IDs; SQLite's id
+    # stays the rowid
+    events = str(CreateTable(ScanEvent.__table__).compile(dialect=postgresql.dialect()))
+    findings = str(CreateTable(FindingRecord.__table__).compile(dialect=postgresql.dialect()))
+    assert "id BIGSERIAL NOT NULL" in events
+    assert "scan_event_id BIGINT NOT NULL" in findings
+    assert "id INTEGER NOT NULL" in str(CreateTable(ScanEvent.__table__).compile(dialect=sqlite.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_existing_database_gets_indexes(engine):
+    # A database from before the indexes, without a schema version
+    async with engine.begin() as conn:
+        for table in ("scan_events", "findings"):
+            for name in await conn.run_sync(lambda c: [i["name"] for i in inspect(c).get_indexes(table)]):
+                await conn.execute(text(f"DROP INDEX {name}"))
+    assert await _indexes(engine, "findings") == set()
+
+    await init_db(engine)
+    assert await _indexes(engine, "scan_events") == {
+        "ix_scan_events_timestamp",
+        "ix_scan_events_agent_ref_timestamp",
+        "ix_scan_events_destination_ref_timestamp",
+        "ix_scan_events_action_timestamp",
+    }
+    assert await _indexes(engine, "findings") == {
+        "ix_findings_scan_event_id", "ix_findings_severity", "ix_findings_finding_type_ref",
+    }
+    assert await _version(engine) == len(MIGRATIONS)
+
+    # Migrated databases are left alone
+    await init_db(engine)
+    assert await _version(engine) == len(MIGRATIONS)
+
+
+@pytest.mark.asyncio
+async def test_existing_database_is_compacted(engine, session_factory, audit_event, legacy_database):
+    hashes = ["ab" * 32, "not a digest"]
+    events = [
+        audit_event(
+            event_id, f"2026-03-01 12:00:0{event_id}", agent_id=agent_id,
+            destination="api.example.com" if event_id % 2 else None, content_hash=hashes[event_id % 2],
+            action=action, duration_ms=1.5,
+            findings=[
+                {"scanner_type": "SECRET", "finding_type": "aws_key", "severity": severity,
+                 "start_offset": 0, "end_offset": 20, "redacted_snippet": "AKIA****"}
+                for severity in severities
+            ],
+        )
+        for event_id, agent_id, action, severities in [
+            (1, "agent-a", "BLOCK", ("CRITICAL", "HIGH")),
+            (2, None, "ALLOW", ()),
+            (3, "agent-b", "REDACT", ("LOW",)),
+        ]
+    ]
+    await legacy_database(engine, events)
+
+    await init_db(engine)
+    assert await _version(engine) == len(MIGRATIONS)
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(lambda c: {col["name"] for col in inspect(c).get_columns("scan_events")})
+        tables = await conn.run_sync(lambda c: set(inspect(c).get_table_names()))
+    assert {"agent_ref", "destination_ref"} <= columns and "agent_id" not in columns
+    assert not {"scan_events_legacy", "findings_legacy"} & tables
+    assert await _indexes(engine, "scan_events") == {
+        "ix_scan_events_timestamp",
+        "ix_scan_events_agent_ref_timestamp",
+        "ix_scan_events_destination_ref_timestamp",
+        "ix_scan_events_action_timestamp",
+    }
+
+    # Entries read back as they were, IDs included
+    repo = SQLAlchemyAuditRepository(session_factory)
+    entries = await repo.query_events()
+    assert [e["id"] for e in entries] == [3, 2, 1]
+    for entry, event in zip(entries, reversed(events)):
+        assert entry["timestamp"] == event["timestamp"].replace(" ", "T")
+        for key in ("agent_id", "destination", "content_hash", "action", "findings_count"):
+            assert entry[key] == event[key]
+        assert [
+            (f["scanner_type"], f["finding_type"], f["severity"], f["redacted_snippet"]) for f in entry["findings"]
+        ] == [
+            (f["scanner_type"], f["finding_type"], f["severity"], f["redacted_snippet"]) for f in event["findings"]
+        ]
+    assert [e["id"] for e in await repo.query_events(agent_id="agent-b")] == [3]
+    assert (await repo.get_stats())["total_scans"] == 3
+
+    # New events reuse the dictionary rows, and get IDs past the copied ones
+    await repo.log_scan(audit_event(
+        agent_id="agent-a", destination="api.example.com", content_hash="cd" * 32,
+        findings=[{"scanner_type": "SECRET", "finding_type": "aws_key", "severity": "HIGH",
+                   "start_offset": 0, "end_offset": 20, "redacted_snippet": None}],
+    ))
+    newest = (await repo.query_events(agent_id="agent-a"))[0]
+    assert newest["id"] == 4 and newest["findings"][0]["id"] == 4
+    async with engine.connect() as conn:
+        for table, count in (("agents", 2), ("destinations", 1), ("finding_types", 1)):
+            assert (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar() == count
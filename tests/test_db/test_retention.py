@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from clawguard.__main__ import run_retention
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.models import FindingRecord, StatsRollup
+from clawguard.db.retention import RetentionJob
+from clawguard.db.session import close_db, get_engine, get_session_factory, init_db, reset_globals, sqlite_pragmas
+
+NOW = datetime.datetime(2026, 3, 10, 12, 0, 0)
+HASH = "0" * 64
+# Long snippets, so that deleting findings frees whole pages
+FINDING = {"severity": "HIGH", "redacted_snippet": "123-***6789" * 20}
+
+
+@pytest_asyncio.fixture
+async def db(settings):
+    reset_globals()
+    engine = get_engine(settings.database_url, sqlite_pragmas(settings), settings.db_write_pool_size)
+    await init_db(engine)
+    yield engine, SQLAlchemyAuditRepository(get_session_factory(engine))
+    await close_db(engine)
+    reset_globals()
+
+
+async def _count(engine, table):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(table))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_retention_deletes_in_batches(db, settings, audit_event):
+    engine, repo = db
+    old = [
+        audit_event(i, NOW - datetime.timedelta(days=40, minutes=i), content_hash=HASH, findings=[FINDING])
+        for i in range(1, 2001)
+    ]
+    await repo.write_events(old)
+    await repo.write_events([
+        audit_event(3001, NOW - datetime.timedelta(days=1), content_hash=HASH, findings=[FINDING]),
+        audit_event(3002, NOW - datetime.timedelta(hours=3), content_hash=HASH),
+        audit_event(3003, NOW - datetime.timedelta(minutes=5), content_hash=HASH),
+    ])
+
+    settings.audit_retention_days = 30
+    settings.audit_allow_retention_hours = 1
+    settings.retention_batch_size = 500
+    settings.retention_batch_pause = 0
+    report = await RetentionJob(engine, settings, clock=lambda: NOW).run()
+
+    assert report.events_deleted == 2001
+    assert report.findings_deleted == 2000
+    assert report.batches == 5
+    assert [e["id"] for e in await repo.query_events()] == [3003, 3001]
+    assert await _count(engine, FindingRecord) == 1
+    # Freed pages went back to the file system
+    assert report.bytes_reclaimed > 0
+    assert report.free_bytes == 0
+    # Stats still count the deleted events
+    assert (await repo.get_stats())["total_scans"] == 2003
+
+    # Nothing left to delete
+    report = await RetentionJob(engine, settings, clock=lambda: NOW).run()
+    assert (report.events_deleted, report.batches) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_retention_prunes_minute_rollups(db, settings, audit_event):
+    engine, repo = db
+    await repo.write_events([
+        audit_event(i, NOW - datetime.timedelta(days=days), findings=[FINDING]) for i, days in enumerate((1, 3, 4))
+    ])
+    minute_rows = select(func.count()).select_from(StatsRollup).where(StatsRollup.granularity == "minute")
+    async with engine.connect() as conn:
+        before = (await conn.execute(minute_rows)).scalar()
+
+    settings.rollup_minute_retention_days = 2
+    settings.retention_batch_pause = 0
+    report = await RetentionJob(engine, settings, clock=lambda: NOW).run()
+
+    assert report.events_deleted == 0
+    async with engine.connect() as conn:
+        assert (await conn.execute(minute_rows)).scalar() == before - report.rollups_deleted
+    # The events of 3 and 4 days ago are no longer in minute buckets, only in hours
+    series = await repo.get_timeseries(
+        "scans", bucket="minute", since=NOW - datetime.timedelta(days=4, minutes=1), until=NOW,
+    )
+    assert sum(series["series"][0]["values"]) == 1
+    series = await repo.get_timeseries("scans", bucket="day", since=NOW - datetime.timedelta(days=5), until=NOW)
+    assert sum(series["series"][0]["values"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_retention_command(settings):
+    settings.audit_retention_days = 30
+    report = await run_retention(settings, vacuum=True)
+    assert report["events_deleted"] == 0
+    assert report["database_bytes"] > 0
+    reset_globals()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.models import StatsRollup
+from clawguard.db.rollups import ALL_TIME, rollup_rows
+from clawguard.db.session import init_db
+
+BASE = datetime.datetime(2026, 3, 1, 12, 0, 30)
+
+
+@pytest_asyncio.fixture
+async def repo(session_factory):
+    return SQLAlchemyAuditRepository(session_factory)
+
+
+def _at(minutes):
+    return BASE + datetime.timedelta(minutes=minutes)
+
+
+def _findings(*severities):
+    return [
+        {"severity": severity, "finding_type": f"type-{severity}", "start_offset": 0, "end_offset": 5,
+         "redacted_snippet": None}
+        for severity in severities
+    ]
+
+
+def test_rollup_rows(audit_event):
+    rows = rollup_rows([
+        audit_event(1, _at(0), action="BLOCK", duration_ms=2.0, findings=_findings("HIGH", "LOW")),
+        audit_event(2, _at(0.2), duration_ms=2.0, findings=_findings("HIGH")),
+        audit_event(3, _at(75), agent_id=None, action="REDACT"),
+    ])
+    by_key = {(r["granularity"], r["dimension"], r["bucket"], r["value"]): r for r in rows}
+
+    minute = by_key["minute", "total", BASE.replace(second=0), ""]
+    assert (minute["count"], minute["findings"], minute["blocked"], minute["duration_ms"]) == (2, 3, 1, 4.0)
+    assert by_key["hour", "total", BASE.replace(minute=0, second=0), ""]["count"] == 2
+    assert by_key["hour", "agent", datetime.datetime(2026, 3, 1, 13), ""]["count"] == 1
+    everything = by_key["all", "total", ALL_TIME, ""]
+    assert (everything["count"], everything["findings"], everything["blocked"]) == (3, 3, 1)
+    assert by_key["all", "severity", ALL_TIME, "HIGH"]["count"] == 2
+    assert by_key["all", "action", ALL_TIME, "REDACT"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_writes(repo, audit_event):
+    await repo.write_events([
+        audit_event(1, _at(0), action="BLOCK", findings=_findings("HIGH")),
+        audit_event(2, _at(1), findings=_findings("HIGH", "LOW")),
+    ])
+    # A replayed batch adds only the events not written yet
+    await repo.write_events(
+        [audit_event(2, _at(1), findings=_findings("HIGH")), audit_event(3, _at(2))], skip_existing=True,
+    )
+    await repo.log_scan(audit_event(agent_id="other", destination="api.example.com", findings=_findings("LOW")))
+
+    stats = await repo.get_stats()
+    assert stats["total_scans"] == 4
+    assert {c["action"]: c["count"] for c in stats["action_counts"]} == {"BLOCK": 1, "REDACT": 2, "ALLOW": 1}
+    assert {c["severity"]: c["count"] for c in stats["severity_counts"]} == {"HIGH": 2, "LOW": 2}
+    assert stats["top_finding_types"] == [
+        {"finding_type": "type-HIGH", "count": 2}, {"finding_type": "type-LOW", "count": 2},
+    ]
+    assert len(stats["recent_scans"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_migration_backfills_rollups(engine, session_factory, repo, audit_event, legacy_database):
+    # Events written before the rollups existed
+    await legacy_database(engine, [
+        audit_event(i, _at(i), action="BLOCK" if i % 3 == 0 else "REDACT", findings=_findings("HIGH"))
+        for i in range(1, 8)
+    ])
+
+    await init_db(engine)
+    stats = await repo.get_stats()
+    assert stats["total_scans"] == 7
+    assert {c["action"]: c["count"] for c in stats["action_counts"]} == {"BLOCK": 2, "REDACT": 5}
+    async with session_factory() as session:
+        minutes = await session.execute(
+            select(func.count()).select_from(StatsRollup)
+            .where(StatsRollup.granularity == "minute", StatsRollup.dimension == "total")
+        )
+        assert minutes.scalar() == 7
+
+    # Rollups are backfilled once
+    await init_db(engine)
+    assert (await repo.get_stats())["total_scans"] == 7
+
+
+@pytest.mark.asyncio
+async def test_timeseries(repo, audit_event):
+    await repo.write_events([
+        audit_event(1, _at(0), action="BLOCK", duration_ms=2.0, findings=_findings("HIGH")),
+        audit_event(2, _at(30), findings=_findings("HIGH", "LOW")),
+        audit_event(3, _at(70), action="BLOCK"),
+        audit_event(4, _at(24 * 60), findings=_findings("LOW")),
+    ])
+    day = BASE.replace(hour=0, minute=0, second=0)
+
+    hours = await repo.get_timeseries(
+        "block_rate", bucket="hour", since=BASE, until=BASE.replace(minute=0, second=0) + datetime.timedelta(hours=3),
+    )
+    assert hours["timestamps"] == [
+        (BASE.replace(minute=0, second=0) + datetime.timedelta(hours=n)).isoformat() for n in range(3)
+    ]
+    assert hours["series"] == [{"key": "", "values": [0.5, 1.0, None]}]
+
+    days = await repo.get_timeseries(
+        "findings", group_by="severity", bucket="day", since=day, until=day + datetime.timedelta(days=2),
+    )
+    assert days["series"] == [{"key": "HIGH", "values": [2, 0]}, {"key": "LOW", "values": [1, 1]}]
+
+    minutes = await repo.get_timeseries(
+        "duration_ms", group_by="agent", bucket="minute", since=BASE, until=BASE.replace(second=0) + datetime.timedelta(minutes=2),
+    )
+    assert minutes["series"] == [{"key": "agent", "values": [2.0, None]}]
+
+    with pytest.raises(ValueError):
+        await repo.get_timeseries("blocked", group_by="finding_type")
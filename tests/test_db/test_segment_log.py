@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+import pytest_asyncio
+
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.repository import encode_cursor
+from clawguard.db.segment_log import SegmentLogAuditRepository
+
+BASE = datetime.datetime(2026, 3, 1, 12, 0)
+
+
+def _events(count: int) -> list[dict]:
+    events = []
+    for i in range(count):
+        blocked = i % 4 == 0
+        events.append({
+            "id": 1000 + i,
+            "timestamp": BASE + datetime.timedelta(seconds=17 * i),
+            "agent_id": f"agent-{i % 3}",
+            "destination": "api.example.com" if i % 2 else None,
+            "content_hash": f"{i:064x}",
+            "action": "BLOCK" if blocked else "ALLOW",
+            "findings_count": 2 if blocked else 0,
+            "duration_ms": 1.25 * i,
+            "findings": [
+                {
+                    "scanner_type": "SECRET", "finding_type": "aws_access_key_id", "severity": "CRITICAL",
+                    "start_offset": 0, "end_offset": 20, "redacted_snippet": "AKIA****",
+                },
+                {
+                    "scanner_type": "PII", "finding_type": "ssn", "severity": "HIGH",
+                    "start_offset": 30, "end_offset": 41, "redacted_snippet": None,
+                },
+            ] if blocked else [],
+        })
+    return events
+
+
+@pytest_asyncio.fixture
+async def log(tmp_path):
+    repo = SegmentLogAuditRepository(tmp_path / "audit-log", segment_size=4096)
+    yield repo
+    await repo.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_match_the_database(log, session_factory):
+    sql = SQLAlchemyAuditRepository(session_factory)
+    for batch in (_events(300)[:120], _events(300)[120:]):
+        await sql.log_scans([dict(event) for event in batch])
+        await log.log_scans([dict(event) for event in batch])
+    assert log.stats()["segments"] > 1
+
+    for filters in (
+        {},
+        {"agent_id": "agent-1"},
+        {"destination": "api.example.com", "action": "BLOCK"},
+        {"since": BASE + datetime.timedelta(minutes=20), "until": BASE + datetime.timedelta(minutes=40)},
+        {"limit": 7, "offset": 100},
+    ):
+        assert await log.query_events(**filters) == await sql.query_events(**filters)
+
+    page = await log.query_events(limit=25)
+    cursor = encode_cursor(page[-1])
+    assert await log.query_events(limit=25, cursor=cursor) == await sql.query_events(limit=25, cursor=cursor)
+    assert await log.get_event(1004) == await sql.get_event(1004)
+    assert await log.get_event(5) is None
+    assert await log.get_stats() == await sql.get_stats()
+
+    for args in ({"bucket": "minute", "group_by": "action"}, {"metric": "findings", "group_by": "severity"}):
+        args = {**args, "since": BASE, "until": BASE + datetime.timedelta(hours=2)}
+        assert await log.get_timeseries(**args) == await sql.get_timeseries(**args)
+
+    exported = [batch async for batch in log.export_events(action="BLOCK", batch_size=20)]
+    assert [len(batch) for batch in exported] == [20, 20, 20, 15]
+    assert [e for batch in exported for e in batch] == list(reversed(await sql.query_events(action="BLOCK", limit=100)))
+
+
+@pytest.mark.asyncio
+async def test_reopen_uses_index_and_recovers_torn_tail(tmp_path):
+    path = tmp_path / "audit-log"
+    log = SegmentLogAuditRepository(path, segment_size=4096)
+    await log.log_scans(_events(100))
+    await log.close()
+    # Sealed segments have their index written next to them
+    assert len(list(path.glob("*.index"))) == log.stats()["segments"]
+
+    log = SegmentLogAuditRepository(path, segment_size=4096)
+    before = await log.query_events(limit=100)
+    assert len(before) == 100
+    await log.log_scans(_events(101)[100:])
+    # A crash while appending leaves a partial record at the end
+    segment = sorted(path.glob("*.segment"))[-1]
+    with open(segment, "ab") as f:
+        f.write(b"\x50\x00\x00\x00torn")
+
+    log = SegmentLogAuditRepository(path, segment_size=4096)
+    try:
+        events = await log.query_events(limit=200)
+        assert [e["id"] for e in events] == [1100] + [e["id"] for e in before]
+        assert (await log.get_stats())["total_scans"] == 101
+        # Appends continue after the last whole record, with later timestamps and finding IDs
+        [event_id] = await log.log_scans([{**_events(1)[0], "id": None, "timestamp": BASE}])
+        event = await log.get_event(event_id)
+        assert event["timestamp"] == events[0]["timestamp"]
+        assert event["findings"][0]["id"] > max(f["id"] for e in events for f in e["findings"])
+    finally:
+        await log.close()
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(log):
+    with pytest.raises(ValueError):
+        await log.query_events(cursor="not-a-cursor")
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from clawguard.db.session import (
+    close_db,
+    get_engine,
+    get_read_engine,
+    init_db,
+    reset_globals,
+    sqlite_pragmas,
+)
+
+
+@pytest.fixture
+async def engines(settings):
+    reset_globals()
+    pragmas = sqlite_pragmas(settings)
+    engine = get_engine(settings.database_url, pragmas, settings.db_write_pool_size)
+    read_engine = get_read_engine(settings.database_url, pragmas, settings.db_read_pool_size)
+    await init_db(engine)
+    yield engine, read_engine
+    await close_db(read_engine)
+    await close_db(engine)
+    reset_globals()
+
+
+async def _pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_connections_use_sqlite_profile(engines):
+    engine, read_engine = engines
+    for eng in (engine, read_engine):
+        assert await _pragma(eng, "journal_mode") == "wal"
+        assert await _pragma(eng, "synchronous") == 1  # NORMAL
+        assert await _pragma(eng, "cache_size") == -65_536
+        assert await _pragma(eng, "busy_timeout") == 5_000
+        assert await _pragma(eng, "temp_store") == 2  # MEMORY
+    assert engine.pool.size() == 1
+    assert read_engine.pool.size() == 4
+
+
+@pytest.mark.asyncio
+async def test_read_engine_is_read_only(engines):
+    engine, read_engine = engines
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO scan_events (id, timestamp, content_hash, action, findings_count, duration_ms) "
+                                "VALUES (1, '2026-01-01 00:00:00', 'abc', 'ALLOW', 0, 1.0)"))
+    async with read_engine.connect() as conn:
+        assert (await conn.execute(text("SELECT count(*) FROM scan_events"))).scalar() == 1
+        with pytest.raises(OperationalError):
+            await conn.execute(text("DELETE FROM scan_events"))
+
+
+def test_in_memory_database_shares_write_engine():
+    reset_globals()
+    url = "sqlite+aiosqlite:///:memory:"
+    assert get_read_engine(url) is get_engine(url)
+    reset_globals()
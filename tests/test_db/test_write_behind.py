@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from clawguard.db import write_behind
+from clawguard.db.audit_repository import SQLAlchemyAuditRepository
+from clawguard.db.write_behind import WriteBehindAuditRepository
+
+
+@pytest_asyncio.fixture
+async def repo(session_factory):
+    return SQLAlchemyAuditRepository(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_events_written_in_batches(repo, audit_event):
+    first = await repo.log_scan(audit_event())
+    queue = WriteBehindAuditRepository(repo, batch_size=4, flush_interval=0.01)
+    try:
+        ids = await queue.log_scans([audit_event(findings=[{}]) for _ in range(10)])
+        assert ids == sorted(set(ids))
+        assert ids[0] > first
+
+        # Reads see every event queued before them
+        event = await queue.get_event(ids[-1])
+        assert event["findings"][0]["redacted_snippet"] == "123-***6789"
+        assert event["timestamp"] is not None
+        assert len(await queue.query_events(limit=100)) == 11
+
+        stats = queue.stats()
+        assert stats["depth"] == 0
+        assert stats["written"] == 10
+        assert stats["batches"] >= 3
+        assert stats["max_flush_ms"] > 0
+
+        await queue.log_scan(audit_event())
+        assert sum([len(batch) async for batch in queue.export_events()]) == 12
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_written_after_flush_interval(repo, audit_event):
+    queue = WriteBehindAuditRepository(repo, batch_size=100, flush_interval=0.01)
+    try:
+        # No reader ends the batch early: it is written once the interval is up
+        await queue.log_scans([audit_event() for _ in range(3)])
+        for _ in range(200):
+            if queue.stats()["written"] == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert queue.stats()["written"] == 3
+        assert not queue._tasks[0].done()
+        assert len(await repo.query_events()) == 3
+
+        # The writer goes on with the next batch
+        await queue.log_scan(audit_event())
+        assert len(await queue.query_events()) == 4
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure(repo, audit_event):
+    release = asyncio.Event()
+    write_events = repo.write_events
+
+    async def slow_write(events):
+        await release.wait()
+        await write_events(events)
+
+    repo.write_events = slow_write
+    queue = WriteBehindAuditRepository(repo, max_pending=2, batch_size=1, flush_interval=0)
+    # One event is being written, two fill the queue
+    await queue.log_scans([audit_event() for _ in range(3)])
+    await asyncio.sleep(0.01)
+    blocked = asyncio.ensure_future(queue.log_scan(audit_event(agent_id="late")))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    assert queue.stats()["depth"] == 2
+
+    release.set()
+    await blocked
+    await queue.close()
+    assert queue.stats()["written"] == 4
+    assert len(await repo.query_events(agent_id="late")) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_write_retried(repo, audit_event, monkeypatch):
+    monkeypatch.setattr(write_behind, "RETRY_DELAY", 0)
+    write_events = repo.write_events
+    calls = []
+
+    async def flaky_write(events):
+        calls.append(len(events))
+        if len(calls) == 1:
+            raise OSError("database is locked")
+        await write_events(events)
+
+    repo.write_events = flaky_write
+    queue = WriteBehindAuditRepository(repo)
+    event_id = await queue.log_scan(audit_event())
+    assert await queue.get_event(event_id) is not None
+    assert queue.stats()["failed_writes"] == 1
+    assert queue.stats()["dropped"] == 0
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_close_writes_queued_events(repo, audit_event):
+    queue = WriteBehindAuditRepository(repo, flush_interval=10)
+    await queue.log_scans([audit_event() for _ in range(5)])
+    await queue.close()
+    assert len(await repo.query_events()) == 5
@@ -10,7 +10,7 @@ from clawguard.models.policy import (
     PolicyConfig,
     SeverityOverride,
 )
-from clawguard.scanners.base import Finding
+from clawguard.scanners.base import Finding, FindingBatch
 
 
 def _make_finding(severity: Severity = Severity.HIGH, scanner_type=ScannerType.SECRET) -> Finding:
@@ -165,3 +165,46 @@ class TestLoadFromFile:
         engine = PolicyEngine()
         engine.load_from_file(tmp_path / "nonexistent.yaml")
         assert engine.policy.default_action == Action.BLOCK  # default
+
+
+class TestFindingBatches:
+    def test_severity_override_reads_batch(self):
+        policy = PolicyConfig(
+            default_action=Action.REDACT,
+            severity_overrides=[SeverityOverride(severity=Severity.CRITICAL, action=Action.BLOCK)],
+            prompt_threshold=Severity.HIGH,
+        )
+        engine = PolicyEngine(policy)
+        findings = [_make_finding(Severity.MEDIUM), _make_finding(Severity.CRITICAL)]
+        batch = FindingBatch.from_findings("secret", findings)
+        assert engine.evaluate(batch) == engine.evaluate(findings) == Action.BLOCK
+        assert engine.evaluate(FindingBatch("")) == Action.ALLOW
+
+        low = FindingBatch.from_findings("secret", [_make_finding(Severity.HIGH)])
+        assert engine.evaluate_with_prompt(low).action == Action.PROMPT
+
+
+class TestEvaluateMany:
+    def test_matches_single_evaluation(self):
+        policy = PolicyConfig(
+            default_action=Action.REDACT,
+            destination_blocklist=["*.evil.com"],
+            agent_rules=[AgentRule(agent_id="trusted", action=Action.ALLOW)],
+            prompt_threshold=Severity.HIGH,
+        )
+        engine = PolicyEngine(policy)
+        items = [
+            (findings, destination, agent_id)
+            for findings in ([], [_make_finding(Severity.LOW)], [_make_finding(Severity.CRITICAL)])
+            for destination in (None, "api.evil.com", "api.example.com")
+            for agent_id in (None, "trusted")
+        ]
+        assert engine.evaluate_many(items) == [engine.evaluate_with_prompt(*item) for item in items]
+
+    def test_shares_decisions(self):
+        engine = PolicyEngine(PolicyConfig(default_action=Action.REDACT))
+        one, two = engine.evaluate_many([
+            ([_make_finding(Severity.LOW)], "a.com", "agent"),
+            (FindingBatch.from_findings("secret", [_make_finding(Severity.LOW)]), "a.com", "agent"),
+        ])
+        assert one is two
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from clawguard.models.enums import ScannerType, Severity
+from clawguard.scanners.base import FindingBatch
+from clawguard.scanners.cache import ScanCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _batch(content: str) -> FindingBatch:
+    batch = FindingBatch(content)
+    batch.append(batch.kind_id(ScannerType.SECRET, "test"), Severity.HIGH, 4, 10)
+    return batch
+
+
+class TestScanCache:
+    def test_hit_returns_copy_over_new_content(self):
+        cache = ScanCache()
+        key = cache.key("h", None)
+        assert cache.get(key, "abc secret def") is None
+        cache.put(key, _batch("abc secret def"))
+
+        found = cache.get(key, "abc secret def")
+        assert found is not None
+        assert found[0].matched_text == "secret"
+        found.append(found.kind_id(ScannerType.PII, "email"), Severity.LOW, 0, 3)
+        assert len(cache.get(key, "abc secret def")) == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_entries_do_not_keep_content(self):
+        cache = ScanCache()
+        key = cache.key("h", None)
+        cache.put(key, _batch("abc secret def"))
+        assert all(entry.source == "" for _, entry in cache._entries.values())
+
+    def test_key_includes_scanners(self):
+        cache = ScanCache()
+        cache.put(cache.key("h", [ScannerType.SECRET]), _batch("abc secret def"))
+        assert cache.get(cache.key("h", None), "abc secret def") is None
+        assert cache.get(cache.key("h", [ScannerType.PII]), "abc secret def") is None
+        assert cache.get(cache.key("h", [ScannerType.SECRET]), "abc secret def") is not None
+
+    def test_lru_eviction(self):
+        cache = ScanCache(max_entries=2)
+        for h in "abc":
+            cache.put(cache.key(h, None), _batch("abc secret def"))
+            cache.get(cache.key("a", None), "abc secret def")
+        assert cache.get(cache.key("b", None), "abc secret def") is None
+        assert cache.get(cache.key("a", None), "abc secret def") is not None
+        assert cache.get(cache.key("c", None), "abc secret def") is not None
+        assert cache.evictions == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ScanCache(ttl=10, clock=clock)
+        key = cache.key("h", None)
+        cache.put(key, _batch("abc secret def"))
+        clock.now = 9.9
+        assert cache.get(key, "abc secret def") is not None
+        clock.now = 10
+        assert cache.get(key, "abc secret def") is None
+        assert cache.expirations == 1
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_drops_entries_and_stale_results(self):
+        cache = ScanCache()
+        key = cache.key("h", None)
+        cache.put(key, _batch("abc secret def"))
+        stale = cache.key("other", None)
+        cache.invalidate()
+
+        assert cache.get(cache.key("h", None), "abc secret def") is None
+        # A scan that started before the invalidation is not stored
+        cache.put(stale, _batch("abc secret def"))
+        assert cache.stats()["entries"] == 0
+
+    def test_disabled(self):
+        cache = ScanCache(max_entries=0)
+        key = cache.key("h", None)
+        cache.put(key, _batch("abc secret def"))
+        assert cache.get(key, "abc secret def") is None
+        assert cache.stats()["misses"] == 0
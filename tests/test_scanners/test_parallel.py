@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from clawguard.models.enums import Severity
+from clawguard.scanners import parallel
+from clawguard.scanners.custom_scanner import CustomPattern, CustomScanner
+from clawguard.scanners.parallel import ParallelScanner, merge_sequences, split_ranges
+from clawguard.scanners.pii_scanner import PIIScanner
+from clawguard.scanners.registry import create_default_registry
+from clawguard.scanners.secret_scanner import SecretScanner
+
+from tests.test_scanners.test_pattern_set import CORPUS
+
+# Boundary-crossing matches are likely at every split size below
+CONTENT = "\n".join(CORPUS * 3) + (
+    " contact john.doe@example.com or 4111 1111 1111 1111, SSN 123-45-6789 "
+    + "Q" * 40 + " zAb3Kp9Xq2Lm7Nw4Rt8Yv1Uc6Ho5Gj0Fd "
+) * 4
+
+SCANNERS = [
+    SecretScanner(),
+    PIIScanner(),
+    CustomScanner(patterns=[
+        CustomPattern(name="run", regex=r"Q+", severity=Severity.LOW),
+        CustomPattern(name="word_end", regex=r"\w+\b", severity=Severity.LOW),
+    ]),
+]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 1)
+
+
+def test_split_ranges_cover_content(small_chunks):
+    ranges = split_ranges(100, 7)
+    assert len(ranges) == 7
+    assert ranges[0][0] == 0 and ranges[-1][1] == 100
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_split_ranges_respect_min_chunk():
+    assert split_ranges(parallel.MIN_CHUNK_SIZE * 2, 8) == [
+        (0, parallel.MIN_CHUNK_SIZE), (parallel.MIN_CHUNK_SIZE, parallel.MIN_CHUNK_SIZE * 2),
+    ]
+
+
+@pytest.mark.usefixtures("small_chunks")
+@pytest.mark.parametrize("parts", [2, 3, 7, 31, 97])
+@pytest.mark.parametrize("scanner", SCANNERS, ids=lambda s: type(s).__name__)
+def test_merged_chunks_equal_serial_scan(scanner, parts):
+    ranges = split_ranges(len(CONTENT), parts)
+    chunks = [scanner.scan_range(CONTENT, start, end) for start, end in ranges]
+    merged = merge_sequences(CONTENT, scanner.match_patterns(), ranges, chunks)
+    assert scanner.assemble(CONTENT, merged).findings() == scanner.scan(CONTENT)
+
+
+def test_pool_scan_equals_serial_scan(small_chunks):
+    registry = create_default_registry()
+    scanners = [registry.get(t) for t in registry.scanner_types]
+    pool = ParallelScanner(min_size=0, workers=2)
+    try:
+        assert pool.applies(CONTENT)
+        assert pool.scan(CONTENT, scanners).findings() == registry.scan_all(CONTENT).findings()
+    finally:
+        pool.close()
+
+
+def test_registry_parallel_threshold():
+    registry = create_default_registry()
+    registry.enable_parallel(min_size=1_000, workers=2)
+    try:
+        assert not registry._parallel.applies("short")
+        assert registry._parallel.applies("x" * 1_000)
+    finally:
+        registry.close()
+    assert registry._parallel is None
+
+
+def test_single_worker_scans_whole_content():
+    registry = create_default_registry()
+    scanners = [registry.get(t) for t in registry.scanner_types]
+    pool = ParallelScanner(min_size=0, workers=1)
+    try:
+        pool.preload(scanners)
+        assert pool.applies(CONTENT)
+        assert pool.scan(CONTENT, scanners).findings() == registry.scan_all(CONTENT).findings()
+    finally:
+        pool.close()
+
+
+def test_scan_many_equals_scan_all():
+    registry = create_default_registry()
+    secret_only = [registry.get(t) for t in registry.scanner_types][:1]
+    everything = [registry.get(t) for t in registry.scanner_types]
+    items = [(CONTENT[i * 500:(i + 1) * 500], secret_only if i % 2 else everything) for i in range(6)]
+    pool = ParallelScanner(min_size=0, workers=2)
+    try:
+        batches = pool.scan_many(items)
+    finally:
+        pool.close()
+    for (content, scanners), batch in zip(items, batches):
+        expected = [f for s in scanners for f in s.scan(content)]
+        assert batch.source == content
+        assert batch.findings() == expected
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from clawguard.scanners.patterns.pii import PII_PATTERNS
+from clawguard.scanners.patterns.secrets import SECRET_PATTERNS
+from clawguard.scanners.ranges import finditer_range, search_limit
+
+from tests.test_scanners.test_pattern_set import CORPUS
+
+CONTENT = "\n".join(CORPUS) + " john.doe@example.com 4111 1111 1111 1111 (555) 123-4567 $"
+PATTERNS = [p.pattern for p in SECRET_PATTERNS] + [p.pattern for p in PII_PATTERNS] + [
+    re.compile(r"\w+$"),
+    re.compile(r"(?m)^\S+"),
+    re.compile(r"x*"),
+    re.compile(r"(?<=@)[a-z.]+(?=\.com)"),
+    re.compile(r"[A-Za-z0-9+/=_\-]{20,}"),
+]
+
+
+def _reference(pattern: re.Pattern[str], content: str, start: int, end: int) -> list[tuple[int, int]]:
+    spans = []
+    for match in pattern.finditer(content, start):
+        if match.start() >= end:
+            break
+        spans.append(match.span())
+    return spans
+
+
+@pytest.mark.parametrize("pattern", PATTERNS, ids=lambda p: p.pattern[:30])
+def test_matches_unbounded_search(pattern):
+    n = len(CONTENT)
+    for start in range(0, n, 7):
+        for end in (start + 1, start + 13, start + 50, n):
+            got = [m.span() for m in finditer_range(pattern, CONTENT, start, end)]
+            assert got == _reference(pattern, CONTENT, start, end), (start, end)
+
+
+def test_search_stops_after_range():
+    content = "token abcdefghijklmnopqrstuvwxyz0123 " + "x" * 10_000
+    pattern = re.compile(r"[a-z0-9]{20,}")
+    assert search_limit(pattern, content, 10) < 100
+
+
+def test_scoped_flags_search_to_end():
+    content = "a b " * 100
+    assert search_limit(re.compile(r"(?i:A)\w"), content, 10) == len(content)
+
+
+def test_consume_anything_searches_to_end():
+    content = "a b\n" * 100
+    assert search_limit(re.compile(r"(?s)x.*y"), content, 10) == len(content)
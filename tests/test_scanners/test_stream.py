@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from clawguard.models.enums import Severity
+from clawguard.scanners.base import BaseScanner, Finding
+from clawguard.scanners.custom_scanner import CustomPattern, CustomScanner
+from clawguard.scanners.registry import create_default_registry
+from clawguard.scanners.stream import StreamScanner
+
+from tests.test_scanners.test_parallel import CONTENT
+
+
+def _stream(scanners, content: str, window: int, seed: int = 0) -> list[tuple[str, int, int]]:
+    rnd = random.Random(seed)
+    stream = StreamScanner(scanners, window)
+    rounds, pos = [], 0
+    while pos < len(content):
+        size = rnd.randint(1, 700)
+        rounds += stream.feed(content[pos:pos + size])
+        pos += size
+    rounds.append(stream.close())
+    return sorted(
+        (f.finding_type, r.base + f.start, r.base + f.end) for r in rounds for f in r.findings
+    )
+
+
+def _serial(scanners, content: str) -> list[tuple[str, int, int]]:
+    return sorted(
+        (f.finding_type, f.start, f.end) for s in scanners for f in s.scan(content)
+    )
+
+
+@pytest.fixture
+def scanners():
+    registry = create_default_registry()
+    registry.register(CustomScanner(patterns=[
+        CustomPattern(name="run", regex=r"Q+", severity=Severity.LOW),
+    ]))
+    return [registry.get(t) for t in registry.scanner_types]
+
+
+@pytest.mark.parametrize("window", [2048, 4096, 1 << 20])
+def test_stream_equals_whole_scan(scanners, window):
+    content = CONTENT * 6
+    assert _stream(scanners, content, window, seed=window) == _serial(scanners, content)
+
+
+def test_buffer_stays_bounded(scanners):
+    stream = StreamScanner(scanners, window=4096)
+    for _ in range(200):
+        stream.feed(CONTENT[:500])
+        assert len(stream._buffer) <= 4096 + 500
+    assert stream.position == 200 * 500
+
+
+def test_rounds_cover_stream_once(scanners):
+    stream = StreamScanner(scanners, window=2048)
+    rounds = stream.feed(CONTENT * 3)
+    rounds.append(stream.close())
+    settled = [(r.base + r.start, r.base + r.end) for r in rounds]
+    assert settled[0][0] == 0 and settled[-1][1] == len(CONTENT) * 3
+    assert all(a[1] == b[0] for a, b in zip(settled, settled[1:]))
+
+
+def test_scanner_without_range_support():
+    class Words(BaseScanner):
+        scanner_type = CustomScanner.scanner_type
+
+        def scan(self, content: str) -> list[Finding]:
+            return [
+                Finding(self.scanner_type, "word", Severity.LOW, "needle", i, i + 6)
+                for i in range(len(content)) if content.startswith("needle", i)
+            ]
+
+    content = ("hay " * 300 + "needle ") * 20
+    assert _stream([Words()], content, 2048) == _serial([Words()], content)
+
+
+def test_closed_stream_rejects_input(scanners):
+    stream = StreamScanner(scanners)
+    stream.close()
+    with pytest.raises(ValueError):
+        stream.feed("more")
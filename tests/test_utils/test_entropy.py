@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import random
+import string
+
+import pytest
+
+from clawguard.utils import entropy
+from clawguard.utils.entropy import (
+    batch_is_high_entropy,
+    batch_shannon_entropy,
+    is_high_entropy,
+    shannon_entropy,
+)
+
+BACKENDS = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(
+        entropy.np is None, reason="numpy not installed",
+    )),
+]
+
+_B64 = string.ascii_letters + string.digits + "+/"
+
+
+def _tokens() -> list[str]:
+    rng = random.Random(7)
+    tokens = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 120)))
+        for alphabet in (_B64, string.hexdigits.lower(), "ab", _B64[:23])
+        for _ in range(200)
+    ]
+    # Repeats, edge lengths and non-ASCII content
+    return tokens + tokens[:50] + ["", "a", "a" * 40, "päßwörd-ÄÖÜ-ñ-" * 3, _B64]
+
+
+class TestBatchShannonEntropy:
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_matches_scalar(self, use_numpy):
+        tokens = _tokens()
+        scores = batch_shannon_entropy(tokens, use_numpy=use_numpy)
+        assert scores == pytest.approx([shannon_entropy(t) for t in tokens], abs=1e-12)
+
+    def test_empty_batch(self):
+        assert batch_shannon_entropy([]) == []
+
+
+class TestBatchIsHighEntropy:
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    @pytest.mark.parametrize("threshold", [0.0, 1.0, 3.5, 4.0, 4.5, 5.0])
+    def test_matches_scalar(self, use_numpy, threshold):
+        tokens = _tokens()
+        flags = batch_is_high_entropy(tokens, threshold, 20, use_numpy=use_numpy)
+        assert flags == [is_high_entropy(t, threshold, 20) for t in tokens]
+
+    @pytest.mark.parametrize("use_numpy", BACKENDS)
+    def test_threshold_equal_to_score(self, use_numpy):
+        # 16 distinct characters used equally: exactly 4 bits per character
+        token = string.hexdigits[:16] * 2
+        assert shannon_entropy(token) == 4.0
+        assert batch_is_high_entropy([token], 4.0, 20, use_numpy=use_numpy) == [False]
+
+    def test_min_length(self):
+        token = _B64[:30]
+        assert batch_is_high_entropy([token], 4.5, 31) == [False]
+        assert batch_is_high_entropy([token], 4.5, 30) == [True]
+
+    def test_numpy_required_but_missing(self, monkeypatch):
+        monkeypatch.setattr(entropy, "np", None)
+        with pytest.raises(RuntimeError):
+            batch_is_high_entropy(["x" * 20], use_numpy=True)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from clawguard.utils.ids import EPOCH, MAX_NODES, ScanIdGenerator, scan_id_time
+
+NOW = datetime.datetime(2026, 3, 1, 12, 0, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_ids_increase_within_a_millisecond():
+    ids = ScanIdGenerator(clock=lambda: NOW)
+    generated = [ids.next_id() for _ in range(500)]
+    assert generated == sorted(set(generated))
+
+
+def test_ids_increase_when_clock_steps_back():
+    times = iter([NOW, NOW - 5, NOW - 5, NOW + 1])
+    ids = ScanIdGenerator(clock=lambda: next(times))
+    generated = [ids.next_id() for _ in range(4)]
+    assert generated == sorted(set(generated))
+
+
+def test_nodes_never_collide():
+    a = ScanIdGenerator(node=1, clock=lambda: NOW)
+    b = ScanIdGenerator(node=2, clock=lambda: NOW)
+    first = {a.next_id() for _ in range(200)}
+    second = {b.next_id() for _ in range(200)}
+    assert not first & second
+
+
+def test_ids_are_time_ordered_and_safe_in_javascript():
+    ids = ScanIdGenerator(node=MAX_NODES - 1, clock=lambda: NOW)
+    scan_id = ids.next_id()
+    assert scan_id < 2 ** 53
+    assert scan_id_time(scan_id) == datetime.datetime.fromtimestamp(NOW, datetime.timezone.utc)
+    later = ScanIdGenerator(node=0, clock=lambda: NOW + 0.001).next_id()
+    assert later > scan_id
+    assert scan_id_time(0) == EPOCH
+
+
+def test_node_out_of_range():
+    with pytest.raises(ValueError):
+        ScanIdGenerator(node=MAX_NODES)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import random
+
+from clawguard.utils.intervals import SpanIndex
+
+
+def _brute_force(spans, start, end) -> bool:
+    return any(s <= start and e >= end for s, e in spans)
+
+
+def test_empty_index_covers_nothing():
+    assert not SpanIndex().covers(0, 0)
+
+
+def test_containment():
+    index = SpanIndex([(10, 20), (30, 50)])
+    assert index.covers(10, 20)
+    assert index.covers(12, 18)
+    assert index.covers(30, 50)
+    assert not index.covers(5, 15)
+    assert not index.covers(15, 35)
+    assert not index.covers(45, 55)
+
+
+def test_long_span_behind_short_ones():
+    # A long early span must still cover queries past later, shorter spans
+    index = SpanIndex([(0, 100), (10, 12), (20, 22)])
+    assert index.covers(50, 60)
+    assert not index.covers(90, 110)
+
+
+def test_add_after_query():
+    index = SpanIndex([(0, 5)])
+    assert not index.covers(10, 15)
+    index.add(8, 20)
+    assert index.covers(10, 15)
+    assert len(index) == 2
+
+
+def test_matches_brute_force():
+    rng = random.Random(3)
+    spans = []
+    for _ in range(300):
+        start = rng.randint(0, 2000)
+        spans.append((start, start + rng.randint(0, 80)))
+    index = SpanIndex(spans)
+    for _ in range(2000):
+        start = rng.randint(0, 2100)
+        end = start + rng.randint(0, 60)
+        assert index.covers(start, end) == _brute_force(spans, start, end)